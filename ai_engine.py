@@ -1,11 +1,85 @@
+import asyncio
 import importlib
 import importlib.util
 import json
 import re
 import os
 import time
+import types
+from collections import namedtuple
 from pathlib import Path
 
+from llm_async import LLMGovernor, get_llm_loop
+from llm_cache import LLMResponseCache, get_default_cache
+from llm_endpoints import get_endpoint_pool
+from llm_prefix import get_prefix_tracker
+from llm_stream import read_json_stream, stream_stats
+from prescreen import get_prescreen_engine
+
+# Bump a template's version whenever its prompt wording or output handling changes
+# so cached responses produced by the old prompt stop matching.
+_PROMPT_VERSIONS = {
+    "analyze_jd": "1",
+    "analyze_resume": "1",
+    "evaluate_standard": "1",
+    "evaluate_standard_batch": "1",
+    "evaluate_criterion": "2",
+    "evaluate_bulk_criteria": "2",
+}
+
+# Calls whose answer is a single JSON object; in streaming mode these are cut off
+# as soon as that object is complete.
+_STREAM_JSON_TAGS = {"analyze_jd", "analyze_resume", "evaluate_standard", "evaluate_criterion"}
+
+_VERDICTS = ("Met", "Partial", "Missing")
+
+# What _endpoint_completion hands the governor: it settles TPM from `.usage`.
+_Completion = namedtuple("_Completion", ["content", "usage"])
+
+
+def _rows(parsed, *keys):
+    if isinstance(parsed, dict):
+        for key in keys:
+            if isinstance(parsed.get(key), list):
+                return parsed[key]
+    return parsed if isinstance(parsed, list) else None
+
+
+def _cacheable_response(tag, parsed):
+    """
+    Whether a parsed completion is a usable answer for its template. Only these
+    are written to the response cache; a malformed-but-parseable reply would
+    otherwise be replayed forever instead of retried.
+    """
+    if parsed is None:
+        return False
+    if tag == "analyze_jd":
+        return isinstance(parsed, dict) and not parsed.get("error") and any(
+            isinstance(parsed.get(k), list) for k in ("must_have_skills", "nice_to_have_skills", "key_responsibilities")
+        )
+    if tag == "analyze_resume":
+        return isinstance(parsed, dict) and not parsed.get("error_flag") and (
+            "candidate_name" in parsed or "extracted_skills" in parsed
+        )
+    if tag == "evaluate_standard":
+        if not isinstance(parsed, dict):
+            return False
+        try:
+            int(parsed.get("match_score"))
+        except (TypeError, ValueError):
+            return False
+        return True
+    if tag == "evaluate_standard_batch":
+        rows = _rows(parsed, "results", "candidates")
+        return bool(rows) and all(isinstance(r, dict) and "match_score" in r for r in rows)
+    if tag == "evaluate_criterion":
+        return isinstance(parsed, dict) and parsed.get("status") in _VERDICTS
+    if tag == "evaluate_bulk_criteria":
+        rows = _rows(parsed, "results")
+        return bool(rows) and all(isinstance(r, dict) and r.get("status") in _VERDICTS for r in rows)
+    return True
+
+
 class AIEngine:
     def __init__(
         self,
@@ -15,6 +89,11 @@ class AIEngine:
         bulk_timeout_sec=None,
         bulk_resume_chars=None,
         preferred_model=None,
+        response_cache=None,
+        llm_loop=None,
+        prefix_tracker=None,
+        stream_json=None,
+        prescreen=None,
     ):
         self.base_url = base_url
         self.api_key = api_key
@@ -45,6 +124,11 @@ class AIEngine:
             "yes",
             "on",
         )
+        self.stream_json = bool(
+            stream_json
+            if stream_json is not None
+            else str(os.getenv("RESUME_MATCHER_LLM_STREAM_JSON", "")).strip().lower() in ("1", "true", "yes", "on")
+        )
         self._resolved_chat_model = None
 
         if not self.use_mock:
@@ -53,7 +137,141 @@ class AIEngine:
                     "openai is not installed. Install it or use base_url='mock://local' for the mock API."
                 )
             openai_module = importlib.import_module("openai")
-            self.client = openai_module.OpenAI(base_url=base_url, api_key=api_key)
+            # base_url may name a weighted pool of servers; see llm_endpoints.parse_endpoint_spec.
+            self.endpoints = get_endpoint_pool(base_url, api_key, openai_module)
+            self.client = self.endpoints.primary.client
+        self.llm_loop = llm_loop if llm_loop is not None else get_llm_loop()
+        self.response_cache = response_cache if response_cache is not None else (
+            None if self.use_mock else get_default_cache()
+        )
+        self.prefix_tracker = prefix_tracker if prefix_tracker is not None else get_prefix_tracker()
+        self.prescreen = prescreen if prescreen is not None else get_prescreen_engine()
+
+    def governor_stats(self):
+        return self.llm_loop.stats()
+
+    def cache_stats(self):
+        if self.response_cache is None:
+            return {"enabled": False}
+        return self.response_cache.stats()
+
+    def _chat_completion(self, tag, messages, temperature, timeout, max_tokens=None, use_cache=True):
+        """Blocking wrapper over _achat_completion for the thread-based callers."""
+        return self.llm_loop.run(
+            self._achat_completion(
+                tag,
+                messages=messages,
+                temperature=temperature,
+                timeout=timeout,
+                max_tokens=max_tokens,
+                use_cache=use_cache,
+                model=self._chat_model(),
+            )
+        )
+
+    async def _achat_completion(self, tag, messages, temperature, timeout, max_tokens=None, use_cache=True, model=None):
+        """
+        Run one chat completion and return the message text.
+
+        Responses that parse into a valid answer for `tag` are stored in the
+        response cache; a repeat of
+        the exact same request (model, template version, messages, sampling) is
+        served from it. `use_cache=False` forces a fresh call and skips the write.
+        Identical requests already in flight are joined instead of sent again, and
+        network calls are admitted by the shared LLM loop's governor.
+        """
+        model = model or self._chat_model()
+        cache = self.response_cache if (self.response_cache is not None and self.response_cache.enabled) else None
+        key = LLMResponseCache.make_key(
+            model,
+            f"{tag}:{_PROMPT_VERSIONS.get(tag, '0')}",
+            {"messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        )
+        loop = asyncio.get_running_loop()
+        if cache is not None:
+            if use_cache:
+                # The cache is blocking SQLite; keep it off the shared loop thread.
+                cached = await loop.run_in_executor(None, cache.get, key)
+                if cached is not None:
+                    return cached
+            else:
+                cache.record_bypass()
+        kwargs = {"model": model, "messages": messages, "temperature": temperature, "timeout": timeout}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+
+        stream = self.stream_json and tag in _STREAM_JSON_TAGS
+
+        async def _fetch():
+            completion = await self.llm_loop.governor.run(
+                lambda: self._endpoint_completion(kwargs, tag=tag, stream=stream),
+                est_tokens=self.llm_loop.governor.estimate_tokens(messages, max_tokens),
+            )
+            content = completion.content
+            if (
+                cache is not None
+                and use_cache
+                and content
+                and _cacheable_response(tag, self._document_utils().clean_json_response(content))
+            ):
+                await loop.run_in_executor(None, lambda: cache.put(key, content, model=model, tag=tag))
+            return content
+
+        # Engines for different servers share the loop, so the flight key includes base_url.
+        return await self.llm_loop.single_flight.do((self.base_url, key), _fetch)
+
+    async def _endpoint_completion(self, kwargs, tag=None, stream=False):
+        """
+        Send one completion to a pool endpoint and return a _Completion (message
+        text plus the server's token usage); a 5xx/connection error fails over
+        once. With `stream`, the response is read incrementally and closed once
+        the first complete JSON value has arrived.
+        """
+        tried = None
+        while True:
+            endpoint = self.endpoints.acquire(exclude=tried)
+            # Each server keeps its own prefix cache, so reuse is measured per endpoint.
+            self.prefix_tracker.record(endpoint.url, tag, kwargs["messages"])
+            started = time.monotonic()
+            try:
+                if stream:
+                    response = await endpoint.async_client.chat.completions.create(
+                        **kwargs, stream=True, stream_options={"include_usage": True}
+                    )
+                    content, _, usage = await read_json_stream(response)
+                    if usage is None:
+                        # Closed before the usage chunk: settle on what was actually
+                        # sent and received rather than the max_tokens reservation.
+                        usage = types.SimpleNamespace(
+                            total_tokens=LLMGovernor.estimate_used_tokens(kwargs["messages"], content)
+                        )
+                else:
+                    resp = await endpoint.async_client.chat.completions.create(**kwargs)
+                    content = resp.choices[0].message.content
+                    usage = getattr(resp, "usage", None)
+            except BaseException as exc:
+                outcome = LLMGovernor.classify_error(exc)
+                self.endpoints.release(endpoint, outcome, time.monotonic() - started, error=exc)
+                if outcome == "server_error" and tried is None and len(self.endpoints.endpoints) > 1:
+                    tried = endpoint
+                    continue
+                raise
+            self.endpoints.release(endpoint, "ok", time.monotonic() - started)
+            return _Completion(content, usage)
+
+    def coalescing_stats(self):
+        return self.llm_loop.single_flight.stats()
+
+    def prefix_stats(self):
+        return self.prefix_tracker.stats()
+
+    def stream_stats(self):
+        return {"enabled": self.stream_json, **stream_stats()}
+
+    def endpoint_stats(self):
+        if self.use_mock:
+            return []
+        return self.endpoints.stats()
 
     def _chat_model(self):
         if self.use_mock:
@@ -92,7 +310,11 @@ class AIEngine:
         # Last fallback for OpenAI-compatible local gateways.
         return "local-model"
 
-    def analyze_jd(self, text):
+    def model_name(self):
+        """Model id used for chat completions; callers key derived caches on it."""
+        return self._chat_model()
+
+    def analyze_jd(self, text, use_cache=True):
         if self.use_mock:
             return self._normalize_jd_schema(self._mock_analyze_jd(text), text)
         document_utils = self._document_utils()
@@ -121,18 +343,19 @@ class AIEngine:
         {text[:15000]}
         """
         try:
-            resp = self.client.chat.completions.create(
-                model=self._chat_model(),
+            content = self._chat_completion(
+                "analyze_jd",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.0,
                 timeout=self.request_timeout_sec,
+                use_cache=use_cache,
             )
-            raw = document_utils.clean_json_response(resp.choices[0].message.content)
+            raw = document_utils.clean_json_response(content)
             return self._normalize_jd_schema(raw, text)
         except Exception as e:
             return {"error": str(e)}
 
-    def analyze_resume(self, text):
+    def analyze_resume(self, text, use_cache=True):
         """
         Extracts structured profile from Resume.
         Enforces strict JSON formatting (Double Quotes).
@@ -186,8 +409,8 @@ class AIEngine:
         {text[:15000]}
         """
         try:
-            resp = self.client.chat.completions.create(
-                model=self._chat_model(),
+            raw_content = self._chat_completion(
+                "analyze_resume",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -195,9 +418,9 @@ class AIEngine:
                 temperature=0.0,
                 max_tokens=1500,  # Strict limit to prevent infinite generation
                 timeout=self.request_timeout_sec,
+                use_cache=use_cache,
             )
             # If null, return a fallback object to prevent app crash
-            raw_content = resp.choices[0].message.content
             result = document_utils.clean_json_response(raw_content)
             if not result:
                  self._log_parse_failure(raw_content, reason="clean_json_response returned None")
@@ -260,7 +483,7 @@ class AIEngine:
         except Exception:
             pass
 
-    def evaluate_standard(self, resume_text, jd_criteria, resume_profile):
+    def evaluate_standard(self, resume_text, jd_criteria, resume_profile, use_cache=True):
         if self.use_mock:
             return self._mock_evaluate_standard(resume_text, jd_criteria)
         document_utils = self._document_utils()
@@ -299,6 +522,7 @@ class AIEngine:
         jd_str = jd_str[:max_jd]
         profile_str = profile_str[:max_profile]
         resume_str = resume_text[:max_resume] if isinstance(resume_text, str) else str(resume_text)[:max_resume]
+        # Keep JD -> profile -> resume order: the JD block is a shared prefix across resumes.
         user_prompt = f"JD CRITERIA:\n{jd_str}\n\nRESUME PROFILE:\n{profile_str}\n\nRESUME TEXT:\n{resume_str}"
         if len(user_prompt) > max_total:
             overflow = len(user_prompt) - max_total
@@ -323,33 +547,6 @@ class AIEngine:
                 "missing_skills": [],
             }
 
-        def _normalize(data):
-            if not isinstance(data, dict):
-                return None
-            try:
-                score = int(data.get("match_score", 0) or 0)
-            except Exception:
-                score = 0
-            score = max(0, min(100, score))
-            decision = str(data.get("decision") or "").strip() or ("Reject" if score < 60 else "Review")
-            reasoning = data.get("reasoning", "")
-            if isinstance(reasoning, list):
-                reasoning = "\n".join([str(x) for x in reasoning if str(x).strip()])
-            reasoning = str(reasoning or "").strip() or "No reasoning returned by model."
-            missing = data.get("missing_skills", [])
-            if isinstance(missing, str):
-                missing = [x.strip() for x in missing.split(",") if x.strip()]
-            if not isinstance(missing, list):
-                missing = []
-            candidate = str(data.get("candidate_name") or "").strip() or "Unknown Candidate"
-            return {
-                "candidate_name": candidate,
-                "match_score": score,
-                "decision": decision,
-                "reasoning": reasoning,
-                "missing_skills": [str(x) for x in missing],
-            }
-
         def _recover_from_text(raw_text: str):
             txt = str(raw_text or "").strip()
             if not txt:
@@ -361,7 +558,7 @@ class AIEngine:
 
             # Try JSON extraction again after stripping think block.
             recovered_json = document_utils.clean_json_response(txt)
-            norm = _normalize(recovered_json)
+            norm = self._normalize_standard(recovered_json)
             if norm is not None:
                 return norm
 
@@ -409,7 +606,7 @@ class AIEngine:
             if not reasoning:
                 reasoning = "Recovered standard evaluation from non-JSON model output."
 
-            return _normalize(
+            return self._normalize_standard(
                 {
                     "candidate_name": "Unknown Candidate",
                     "match_score": score,
@@ -422,16 +619,16 @@ class AIEngine:
         last_error = "unknown"
         for attempt in range(2):
             try:
-                resp = self.client.chat.completions.create(
-                    model=self._chat_model(),
+                raw = self._chat_completion(
+                    "evaluate_standard",
                     messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
                     temperature=0.0 if attempt else 0.1,
                     max_tokens=1024,
                     timeout=self.request_timeout_sec,
+                    use_cache=use_cache,
                 )
-                raw = resp.choices[0].message.content
                 data = document_utils.clean_json_response(raw)
-                norm = _normalize(data)
+                norm = self._normalize_standard(data)
                 if norm is not None:
                     return norm
                 recovered = _recover_from_text(raw)
@@ -444,94 +641,245 @@ class AIEngine:
                 self._log_parse_failure(f"[EXCEPTION] {e}", reason=f"evaluate_standard attempt={attempt + 1} exception")
         return _fallback(last_error)
 
-    def evaluate_criterion(self, resume_text, category, value):
-        if self.use_mock:
-            return self._mock_evaluate_criterion(resume_text, category, value)
-        document_utils = self._document_utils()
-        # Heuristic: allow partial match for India HR ops/statutory compliance when resume shows payroll/HR policies
+    @staticmethod
+    def _normalize_standard(data):
+        if not isinstance(data, dict):
+            return None
         try:
-            cat = str(category or "").lower()
-            req = str(value or "").lower()
-            resume_l = str(resume_text or "").lower()
-            # Deterministic gate for stack-specific MUST-HAVE requirements:
-            # do not infer from adjacent tools; require explicit token overlap.
-            if cat == "must_have_skills":
-                tech_terms = [
-                    "react", "python", "fastapi", "pydantic", "sqlmodel", "async",
-                    "vite", "bun", "react-query", "react query", "react-table", "react table",
-                    "grpc", "protobuf", "kubernetes", "docker"
-                ]
-                req_terms = [t for t in tech_terms if t in req]
-                if len(req_terms) >= 2:
-                    matched = []
-                    for t in req_terms:
-                        # normalize dashed/spaced variants for react-query/react-table
-                        variants = {t, t.replace("-", " "), t.replace(" ", "-")}
-                        if any(v in resume_l for v in variants):
-                            matched.append(t)
-                    if not matched:
-                        return {"requirement": value, "status": "Missing", "evidence": "None"}
-                    if len(matched) < len(set(req_terms)):
-                        return {
-                            "requirement": value,
-                            "status": "Partial",
-                            "evidence": f"Explicitly matched: {', '.join(sorted(set(matched)))}"
-                        }
-                    return {
-                        "requirement": value,
-                        "status": "Met",
-                        "evidence": f"Explicitly matched: {', '.join(sorted(set(matched)))}"
-                    }
-            # Heuristic: experience requirement like "Minimum X years"
-            if cat == "experience" and ("minimum" in req and "years" in req):
-                m = re.search(r"(\\d{1,2})\\s*\\+?\\s*years?", req)
-                if m:
-                    required = int(m.group(1))
-                    # Find explicit years in resume text (e.g., "11 years", "10+ years", "10 yrs")
-                    years = [int(x) for x in re.findall(r"\\b(\\d{1,2})\\s*\\+?\\s*(?:years?|yrs?)\\b", resume_l)]
-                    # If we included RESUME_PROFILE, use years_experience as a signal too
-                    if "years_experience" in resume_l and not years:
-                        m2 = re.search(r"years_experience[^0-9]*(\\d{1,2})", resume_l)
-                        if m2:
-                            years = [int(m2.group(1))]
-                    if years:
-                        if max(years) >= required:
-                            return {"requirement": value, "status": "Met", "evidence": f"Explicit years in resume: {max(years)}"}
-                        return {"requirement": value, "status": "Partial", "evidence": f"Explicit years in resume: {max(years)} (below {required})"}
-            if cat == "domain_knowledge" and ("statutory compliance" in req or "india hr operations" in req or "labor laws" in req):
-                signals = []
-                for kw in ["payroll", "hr policies", "employee relations", "compensation", "benefits"]:
-                    if kw in resume_l:
-                        signals.append(kw)
-                if signals:
-                    return {
-                        "requirement": value,
-                        "status": "Partial",
-                        "evidence": f"Matched keywords in resume: {', '.join(signals[:4])}"
-                    }
+            score = int(data.get("match_score", 0) or 0)
         except Exception:
-            pass
-        system_prompt = f"""
-        Verify if resume meets this {category} requirement: "{value}".
+            score = 0
+        score = max(0, min(100, score))
+        decision = str(data.get("decision") or "").strip() or ("Reject" if score < 60 else "Review")
+        reasoning = data.get("reasoning", "")
+        if isinstance(reasoning, list):
+            reasoning = "\n".join([str(x) for x in reasoning if str(x).strip()])
+        reasoning = str(reasoning or "").strip() or "No reasoning returned by model."
+        missing = data.get("missing_skills", [])
+        if isinstance(missing, str):
+            missing = [x.strip() for x in missing.split(",") if x.strip()]
+        if not isinstance(missing, list):
+            missing = []
+        candidate = str(data.get("candidate_name") or "").strip() or "Unknown Candidate"
+        return {
+            "candidate_name": candidate,
+            "match_score": score,
+            "decision": decision,
+            "reasoning": reasoning,
+            "missing_skills": [str(x) for x in missing],
+        }
+
+    def evaluate_standard_batch(self, jd_criteria, candidates, use_cache=True):
+        """
+        Pass 1 for several resumes against one JD in a single request.
+
+        `candidates` is a list of {"candidate_id", "profile", "resume_text"}. Returns
+        {candidate_id: normalized standard result} for the candidates the model
+        answered unambiguously; callers score any missing ones individually.
+        """
+        candidates = [c for c in (candidates or []) if c.get("candidate_id") is not None]
+        if not candidates:
+            return {}
+        if self.use_mock:
+            return {
+                c["candidate_id"]: self._mock_evaluate_standard(str(c.get("resume_text") or ""), jd_criteria)
+                for c in candidates
+            }
+        document_utils = self._document_utils()
+        system_prompt = """
+        You are a very strict Technical Recruiter screening SEVERAL candidates against ONE job.
+        Score every candidate independently; never compare candidates with each other.
+
+        STRICT SCORING RULES (0-100):
+        1. CRITICAL: If the candidate lacks "Must Have" skills, the score MUST be below 50.
+        2. EXPERIENCE: If the candidate has significantly fewer years of experience than required, deduct 20 points immediately.
+        3. DEPTH: Mentioning a keyword is not enough. Look for evidence of usage in Work History.
+
+        SCORING TIERS:
+        - 0-59: Reject. Missing key skills or experience.
+        - 60-79: Review. Has most skills, but maybe lacks depth or specific domain knowledge.
+        - 80-100: Strong Match. Exceeds requirements.
+
         NORMALIZATION RULES:
         - Degree equivalence: B.Tech/BTech/B.E./BE/B.S./BS/B.Sc counts as Bachelor's. M.Tech/MTech/M.E./ME/M.S./MS/M.Sc counts as Master's.
         - Cloud platforms: AWS, Azure, GCP, Google Cloud count as cloud platform experience.
-        Return JSON: {{ "requirement": "{value}", "status": "Met" | "Partial" | "Missing", "evidence": "Quote or 'None'" }}
+
+        CRITICAL OUTPUT REQUIREMENTS (STRICT):
+        - Return ONLY a JSON ARRAY with EXACTLY one object per candidate, in input order.
+        - Echo the exact candidate_id for each row.
+        - No markdown, no <think> blocks, no explanations outside JSON.
+
+        [
+            { "candidate_id": "c1", "candidate_name": "...", "match_score": 0, "decision": "Reject/Review/Move Forward", "reasoning": "...", "missing_skills": [] },
+            ...
+        ]
         """
-        user_prompt = f"TEXT:\n{resume_text[:15000]}"
+        jd_str = jd_criteria if isinstance(jd_criteria, str) else json.dumps(jd_criteria, indent=2)
+        blocks = []
+        for c in candidates:
+            profile = c.get("profile")
+            profile_str = profile if isinstance(profile, str) else json.dumps(profile or {}, separators=(",", ":"))
+            blocks.append(
+                f"### CANDIDATE candidate_id={c['candidate_id']}\n"
+                f"PROFILE: {profile_str[:1500]}\n"
+                f"RESUME EXCERPT:\n{str(c.get('resume_text') or '')[:1500]}"
+            )
+        user_prompt = (
+            f"JD CRITERIA:\n{jd_str[:3500]}\n\n"
+            f"CANDIDATES COUNT: {len(candidates)}\n\n" + "\n\n".join(blocks)
+        )
         try:
-            resp = self.client.chat.completions.create(
-                model=self._chat_model(),
+            raw = self._chat_completion(
+                "evaluate_standard_batch",
                 messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
                 temperature=0.0,
+                max_tokens=min(8000, 350 * len(candidates)),
+                timeout=max(self.request_timeout_sec, self.bulk_timeout_sec),
+                use_cache=use_cache,
+            )
+        except Exception as e:
+            self._log_parse_failure(f"[EXCEPTION] {e}", reason="evaluate_standard_batch exception")
+            return {}
+        data = document_utils.clean_json_response(raw)
+        if isinstance(data, dict):
+            data = data.get("results") or data.get("candidates") or [data]
+        if not isinstance(data, list):
+            self._log_parse_failure(raw, reason="evaluate_standard_batch non-list output")
+            return {}
+
+        by_id = {str(c["candidate_id"]).strip().lower(): c["candidate_id"] for c in candidates}
+        resolved = {}
+        leftovers = []
+        # Pass 0: exact candidate_id echo.
+        for row in data:
+            if not isinstance(row, dict):
+                continue
+            cid = by_id.get(str(row.get("candidate_id") or "").strip().lower())
+            norm = self._normalize_standard(row)
+            if cid is not None and cid not in resolved and norm is not None:
+                resolved[cid] = norm
+            else:
+                leftovers.append(row)
+        # Pass 1: candidate name, only when it identifies exactly one unresolved candidate.
+        if leftovers:
+            names = {}
+            for c in candidates:
+                if c["candidate_id"] in resolved:
+                    continue
+                profile = c.get("profile") if isinstance(c.get("profile"), dict) else {}
+                name = str(profile.get("candidate_name") or "").strip().lower()
+                if name:
+                    names.setdefault(name, []).append(c["candidate_id"])
+            for row in leftovers:
+                hits = names.get(str(row.get("candidate_name") or "").strip().lower()) or []
+                norm = self._normalize_standard(row)
+                if len(hits) == 1 and hits[0] not in resolved and norm is not None:
+                    resolved[hits[0]] = norm
+        # NOTE: no positional fill; unmatched candidates fall back to single scoring.
+        if len(resolved) < len(candidates):
+            self._log_parse_failure(
+                f"[standard-batch] expected={len(candidates)} resolved={len(resolved)}\n{raw}",
+                reason="evaluate_standard_batch incomplete rows",
+            )
+        return resolved
+
+    def evaluate_criterion(self, resume_text, category, value, use_cache=True):
+        if self.use_mock:
+            return self._mock_evaluate_criterion(resume_text, category, value)
+        shortcut = self._criterion_shortcut(resume_text, category, value)
+        if shortcut is not None:
+            return shortcut
+        try:
+            content = self._chat_completion(
+                "evaluate_criterion",
+                messages=self._criterion_messages(resume_text, category, value),
+                temperature=0.0,
                 timeout=self.request_timeout_sec,
+                use_cache=use_cache,
             )
-            data = document_utils.clean_json_response(resp.choices[0].message.content)
-            if data: data['category'] = category
-            return data
+            return self._parse_criterion(content, category, value)
         except: return None
 
-    def evaluate_bulk_criteria(self, resume_text, criteria_list, debug_context=None):
+    async def aevaluate_criterion(self, resume_text, category, value, use_cache=True, model=None):
+        """Coroutine twin of evaluate_criterion; runs on the shared LLM loop."""
+        if self.use_mock:
+            return self._mock_evaluate_criterion(resume_text, category, value)
+        shortcut = self._criterion_shortcut(resume_text, category, value)
+        if shortcut is not None:
+            return shortcut
+        try:
+            content = await self._achat_completion(
+                "evaluate_criterion",
+                messages=self._criterion_messages(resume_text, category, value),
+                temperature=0.0,
+                timeout=self.request_timeout_sec,
+                use_cache=use_cache,
+                model=model,
+            )
+            return self._parse_criterion(content, category, value)
+        except Exception:
+            return None
+
+    def submit_criteria(self, resume_text, items, concurrency=None, use_cache=True):
+        """
+        Fan out evaluate_criterion over [(category, value), ...] as tasks on the LLM
+        loop and return one concurrent.futures.Future per item, in input order.
+        `concurrency` caps this batch; the loop's global limit still applies on top.
+        """
+        items = list(items or [])
+        model = None if self.use_mock else self._chat_model()
+        batch_limit = asyncio.Semaphore(max(1, int(concurrency or len(items) or 1)))
+
+        async def _one(category, value):
+            async with batch_limit:
+                return await self.aevaluate_criterion(resume_text, category, value, use_cache=use_cache, model=model)
+
+        return [self.llm_loop.submit(_one(category, value)) for category, value in items]
+
+    def _criterion_shortcut(self, resume_text, category, value):
+        """Deterministic verdicts that don't need the model; None means ask the model."""
+        return self.prescreen.evaluate(resume_text, category, value)
+
+    def prescreen_criteria(self, resume_text, criteria_list):
+        """
+        Pre-screen [(category, value), ...] before a bulk request; returns one
+        result dict or None per item. Mock mode never pre-screens, matching
+        evaluate_criterion.
+        """
+        if self.use_mock:
+            return [None] * len(criteria_list)
+        return [self._criterion_shortcut(resume_text, cat, val) for cat, val in criteria_list]
+
+    def prescreen_stats(self):
+        return self.prescreen.stats()
+
+    def _criterion_messages(self, resume_text, category, value):
+        # Static instructions, then the resume, then the one requirement: every call
+        # for the same resume shares everything up to the requirement line, so a
+        # server with prefix caching only has to prefill the short tail.
+        system_prompt = """
+        Verify if the resume meets the requirement given after the resume text.
+        NORMALIZATION RULES:
+        - Degree equivalence: B.Tech/BTech/B.E./BE/B.S./BS/B.Sc counts as Bachelor's. M.Tech/MTech/M.E./ME/M.S./MS/M.Sc counts as Master's.
+        - Cloud platforms: AWS, Azure, GCP, Google Cloud count as cloud platform experience.
+        Return JSON: { "requirement": "exact requirement text", "status": "Met" | "Partial" | "Missing", "evidence": "Quote or 'None'" }
+        """
+        user_prompt = (
+            f"RESUME TEXT:\n{resume_text[:15000]}\n\n"
+            f"REQUIREMENT ({category}): \"{value}\""
+        )
+        return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
+    def _parse_criterion(self, content, category, value):
+        # The requirement now trails the resume in the prompt, so the model's echo
+        # of it is unreliable; callers key verdicts on the text they asked about.
+        data = self._document_utils().clean_json_response(content)
+        if data:
+            data['category'] = category
+            data['requirement'] = value
+        return data
+
+    def evaluate_bulk_criteria(self, resume_text, criteria_list, debug_context=None, use_cache=True):
         if self.use_mock:
             return [self._mock_evaluate_criterion(resume_text, cat, val) for cat, val in criteria_list]
         document_utils = self._document_utils()
@@ -574,22 +922,24 @@ class AIEngine:
         ]
         """
         resume_snippet = str(resume_text or "")[: max(1000, int(self.bulk_resume_chars))]
+        # Requirements (JD) before the resume and the count after the list, so calls
+        # for the same JD share the longest possible prompt prefix.
         user_prompt = (
-            f"REQUIREMENTS COUNT: {expected_len}\n"
-            f"REQUIREMENTS (ordered JSON):\n{reqs_json}\n\n"
+            f"REQUIREMENTS (ordered JSON):\n{reqs_json}\n"
+            f"REQUIREMENTS COUNT: {expected_len}\n\n"
             f"RESUME TEXT:\n{resume_snippet}"
         )
 
         try:
             # Attempt 1: full bulk window with longer timeout.
-            resp = self.client.chat.completions.create(
-                model=self._chat_model(),
+            raw_content = self._chat_completion(
+                "evaluate_bulk_criteria",
                 messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
                 temperature=0.0,
                 max_tokens=3500,
                 timeout=max(self.request_timeout_sec, self.bulk_timeout_sec),
+                use_cache=use_cache,
             )
-            raw_content = resp.choices[0].message.content
             self._debug_bulk_dump(
                 stage="attempt1_raw",
                 raw_content=raw_content,
@@ -665,18 +1015,18 @@ class AIEngine:
             try:
                 reduced_resume = str(resume_snippet)[: max(1500, int(len(resume_snippet) * 0.55))]
                 retry_prompt = (
-                    f"REQUIREMENTS COUNT: {expected_len}\n"
-                    f"REQUIREMENTS (ordered JSON):\n{reqs_json}\n\n"
+                    f"REQUIREMENTS (ordered JSON):\n{reqs_json}\n"
+                    f"REQUIREMENTS COUNT: {expected_len}\n\n"
                     f"RESUME TEXT:\n{reduced_resume}"
                 )
-                resp = self.client.chat.completions.create(
-                    model=self._chat_model(),
+                raw_content = self._chat_completion(
+                    "evaluate_bulk_criteria",
                     messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": retry_prompt}],
                     temperature=0.0,
                     max_tokens=2500,
                     timeout=max(self.request_timeout_sec, int(self.bulk_timeout_sec * 0.75)),
+                    use_cache=use_cache,
                 )
-                raw_content = resp.choices[0].message.content
                 self._debug_bulk_dump(
                     stage="attempt2_raw",
                     raw_content=raw_content,
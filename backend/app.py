@@ -1,19 +1,26 @@
+import asyncio
 import os
 import threading
 import urllib.request
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from openai import OpenAI
 
 from ai_engine import AIEngine
 from database import DBManager
+from llm_endpoints import parse_endpoint_spec
 
 from .config import settings
 from .schemas import (
+    BatchOut,
     HealthResponse,
     JobIn,
     JobOut,
     MatchOut,
+    MatrixRunOut,
+    MatrixRunRequest,
+    RunBatchRequest,
     RunLogOut,
     RunOut,
     RunRequest,
@@ -25,6 +32,7 @@ from .services.analysis import AnalysisService
 from .services.github_sync_service import GitHubSyncService
 from .services.job_runner import JobRunner
 from .services.repository import Repository
+from .services.run_events import format_sse
 from .web_console import render_console
 
 
@@ -68,6 +76,9 @@ def create_app() -> FastAPI:
     llm_bulk_resume_chars = _env_int("RESUME_MATCHER_LLM_BULK_RESUME_CHARS", 10000, min_value=1000)
     ai_concurrency = _env_int("RESUME_MATCHER_AI_CONCURRENCY", 1, min_value=1)
     job_concurrency = _env_int("RESUME_MATCHER_JOB_CONCURRENCY", 1, min_value=1)
+    llm_max_inflight = _env_int("RESUME_MATCHER_LLM_MAX_INFLIGHT", 8, min_value=1)
+    llm_rpm = _env_int("RESUME_MATCHER_LLM_RPM", 0, min_value=0)
+    llm_tpm = _env_int("RESUME_MATCHER_LLM_TPM", 0, min_value=0)
     runtime_settings = {
         "lm_base_url": lm_base_url,
         "lm_api_key": lm_api_key,
@@ -77,6 +88,9 @@ def create_app() -> FastAPI:
         "llm_bulk_resume_chars": llm_bulk_resume_chars,
         "ai_concurrency": ai_concurrency,
         "job_concurrency": job_concurrency,
+        "llm_max_inflight": llm_max_inflight,
+        "llm_rpm": llm_rpm,
+        "llm_tpm": llm_tpm,
         "ocr_enabled": True,
         "local_lm_available": local_lm_available,
         "write_mode": False,
@@ -110,8 +124,10 @@ def create_app() -> FastAPI:
         bulk_resume_chars=runtime_settings["llm_bulk_resume_chars"],
         preferred_model=runtime_settings["lm_model"],
     )
+    # The governor is process-wide (shared by every AIEngine instance).
+    llm.llm_loop.governor.configure(max_concurrency=llm_max_inflight, rpm=llm_rpm, tpm=llm_tpm)
     analysis = AnalysisService(repo=repo, llm=llm)
-    gh_sync = GitHubSyncService(db_path=settings.db_path)
+    gh_sync = GitHubSyncService(db_path=settings.db_path, close_pool=db.close_pool)
 
     def _write_mode_getter() -> bool:
         return bool(rs_get("write_mode"))
@@ -128,6 +144,9 @@ def create_app() -> FastAPI:
     def _recompute_run_queue_paused() -> bool:
         paused = runner.recompute_paused()
         rs_set("run_queue_paused", paused)
+        if not paused:
+            # Idle workers skip claiming while paused; wake them once it lifts.
+            repo.queue_signal.notify_all()
         return paused
 
     def _pull_if_behind(reason: str) -> tuple[bool, str, bool]:
@@ -137,6 +156,8 @@ def create_app() -> FastAPI:
         ok, msg, pulled = gh_sync.pull_if_behind()
         print(f"[sync] precheck pull ({reason}): {'ok' if ok else 'failed'}: {msg}")
         if ok and pulled:
+            # Pooled connections still reference the replaced DB file contents.
+            db.close_pool()
             # Ensure migrations are present if pulled snapshot is older schema.
             db._init_db()
         return ok, msg, pulled
@@ -157,6 +178,8 @@ def create_app() -> FastAPI:
             if token and repo_name:
                 ok, msg = gh_sync.pull_db()
                 print(f"[startup] DB pull {'ok' if ok else 'failed'}: {msg}")
+                if ok:
+                    db.close_pool()
             else:
                 print("[startup] DB pull skipped: GitHub credentials not configured.")
         elif auto_pull_mode in ("if_behind", "behind"):
@@ -171,6 +194,8 @@ def create_app() -> FastAPI:
                 if token and repo_name:
                     ok, msg = gh_sync.pull_db()
                     print(f"[startup] DB pull {'ok' if ok else 'failed'}: {msg}")
+                    if ok:
+                        db.close_pool()
                 else:
                     print("[startup] DB pull skipped: GitHub credentials not configured.")
         else:
@@ -189,6 +214,7 @@ def create_app() -> FastAPI:
     @app.on_event("shutdown")
     def _shutdown() -> None:
         runner.stop()
+        db.close_pool()
 
     @app.get("/")
     def console():
@@ -349,6 +375,104 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=500, detail="Failed to enqueue run")
         return RunOut(**row)
 
+    @app.post("/v1/runs/batch", response_model=MatrixRunOut)
+    def create_run_batch(payload: RunBatchRequest) -> MatrixRunOut:
+        # Uploads go through a batch so its counters (skipped duplicates, ETA) cover
+        # the whole selection; score_match batches come from /v1/runs/matrix.
+        allowed = {"ingest_job", "ingest_job_file", "ingest_resume", "ingest_resume_file", "ingest_auto_file"}
+        if payload.job_type not in allowed:
+            raise HTTPException(status_code=400, detail=f"job_type must be one of {sorted(allowed)}")
+        if not payload.payloads:
+            raise HTTPException(status_code=400, detail="payloads must not be empty")
+        label = payload.label or f"Upload {len(payload.payloads)} file(s)"
+        batch_id, run_ids = repo.enqueue_run_batch(payload.job_type, payload.payloads, label=label)
+        return MatrixRunOut(batch_id=batch_id, run_ids=run_ids, queued=len(run_ids))
+
+    def _select_matrix_ids(kind: str, rows: dict[int, dict], ids: list[int], tags: list[str]) -> list[int]:
+        if ids:
+            selected = list(dict.fromkeys(int(i) for i in ids))
+            missing = [i for i in selected if i not in rows]
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Unknown {kind} id(s): {missing}")
+            return selected
+        wanted = {str(t).strip() for t in tags if str(t).strip()}
+        if not wanted:
+            raise HTTPException(status_code=400, detail=f"Provide {kind}_ids, {kind}_tags or pairs")
+        return sorted(rid for rid, row in rows.items() if wanted.intersection(row.get("tags") or []))
+
+    @app.post("/v1/runs/matrix", response_model=MatrixRunOut)
+    def create_matrix_runs(payload: MatrixRunRequest) -> MatrixRunOut:
+        jobs = {int(row["id"]): row for row in repo.list_jobs()}
+        resumes = {int(row["id"]): row for row in repo.list_resumes()}
+        if payload.pairs:
+            pairs = list(dict.fromkeys((int(j), int(r)) for j, r in payload.pairs))
+            missing_jobs = sorted({j for j, _ in pairs if j not in jobs})
+            missing_resumes = sorted({r for _, r in pairs if r not in resumes})
+            if missing_jobs or missing_resumes:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Unknown job id(s): {missing_jobs}, resume id(s): {missing_resumes}",
+                )
+        else:
+            job_ids = _select_matrix_ids("job", jobs, payload.job_ids, payload.job_tags)
+            resume_ids = _select_matrix_ids("resume", resumes, payload.resume_ids, payload.resume_tags)
+            pairs = [(j, r) for j in job_ids for r in resume_ids]
+        if payload.match_tags:
+            def _shares_tag(job_id: int, resume_id: int) -> bool:
+                jd_tags = {str(t).strip() for t in (jobs[job_id].get("tags") or []) if str(t).strip()}
+                rs_tags = {str(t).strip() for t in (resumes[resume_id].get("tags") or [])}
+                return not jd_tags or bool(jd_tags & rs_tags)
+
+            pairs = [(j, r) for j, r in pairs if _shares_tag(j, r)]
+        if not pairs:
+            raise HTTPException(status_code=400, detail="No job/resume pairs matched the request")
+
+        per_job_total: dict[int, int] = {}
+        for job_id, _ in pairs:
+            per_job_total[job_id] = per_job_total.get(job_id, 0) + 1
+        deep_cap = int(payload.max_deep_scans_per_jd)
+        run_payloads = []
+        for job_id, resume_id in pairs:
+            legacy_run_id = int(payload.legacy_run_ids.get(job_id) or payload.legacy_run_id or 0) or None
+            # Same two-phase deep-cap wiring the console used per POST /v1/runs.
+            use_deep_cap = bool(payload.auto_deep and deep_cap > 0 and not payload.force_rerun_deep and legacy_run_id)
+            item = {
+                "job_id": job_id,
+                "resume_id": resume_id,
+                "threshold": int(payload.threshold),
+                "auto_deep": False if use_deep_cap else bool(payload.auto_deep),
+                "run_name": payload.run_name or None,
+                "legacy_run_id": legacy_run_id,
+                "force_rerun_pass1": bool(payload.force_rerun_pass1),
+                "force_rerun_deep": bool(payload.force_rerun_deep),
+                "deep_single_prompt": bool(payload.deep_single_prompt),
+                "debug_bulk_log": bool(payload.debug_bulk_log),
+                "max_deep_scans_per_jd": deep_cap,
+                "ai_concurrency": int(payload.ai_concurrency),
+                "pass1_batch_size": int(payload.pass1_batch_size),
+            }
+            if legacy_run_id:
+                item.update(
+                    {
+                        "deep_cap_batch_mode": use_deep_cap,
+                        "batch_group_key": f"legacy:{legacy_run_id}:job:{job_id}:cap:{deep_cap}",
+                        "batch_total_for_job": per_job_total[job_id],
+                        "batch_deep_cap": deep_cap,
+                    }
+                )
+            run_payloads.append(item)
+
+        label = payload.run_name or f"Matrix {len(per_job_total)} JD x {len({r for _, r in pairs})} resume(s)"
+        batch_id, run_ids = repo.enqueue_run_batch("score_match", run_payloads, label=label)
+        return MatrixRunOut(batch_id=batch_id, run_ids=run_ids, queued=len(run_ids))
+
+    @app.get("/v1/batches/{batch_id}", response_model=BatchOut)
+    def get_batch(batch_id: int) -> BatchOut:
+        row = repo.get_batch(batch_id)
+        if not row:
+            raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+        return BatchOut(**row)
+
     @app.get("/v1/runs", response_model=list[RunOut])
     def list_runs() -> list[RunOut]:
         rows = repo.list_runs(limit=500)
@@ -627,12 +751,63 @@ def create_app() -> FastAPI:
             "cleared_requests": cleared,
         }
 
+    @app.get("/v1/events")
+    async def stream_events(
+        request: Request,
+        log_run_id: int | None = None,
+        last_event_id: int | None = None,
+        max_seconds: float = 600.0,
+    ) -> StreamingResponse:
+        """
+        Server-sent events: "run" state/progress changes, "log" lines (optionally only
+        for log_run_id), "batch" enqueues, and "resync" when the client fell behind.
+        Streams are recycled after max_seconds; EventSource reconnects with
+        Last-Event-ID and replays what it missed.
+        """
+        header_id = str(request.headers.get("last-event-id") or "").strip()
+        if header_id.isdigit():
+            last_event_id = int(header_id)
+        sub = repo.events.subscribe(last_event_id=last_event_id, log_run_id=log_run_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.1, float(max_seconds))
+
+        async def _stream():
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0 or await request.is_disconnected():
+                        break
+                    event = await sub.get(timeout=min(15.0, remaining))
+                    # Comment lines keep idle connections open through proxies.
+                    yield format_sse(event) if event else ": ping\n\n"
+            finally:
+                repo.events.unsubscribe(sub)
+
+        return StreamingResponse(
+            _stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.get("/v1/runs/{run_id}/logs", response_model=list[RunLogOut])
-    def get_run_logs(run_id: int) -> list[RunLogOut]:
+    def get_run_logs(
+        run_id: int,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        limit: int = 500,
+    ) -> list[RunLogOut]:
+        """
+        Ascending log lines. after_id returns only lines newer than the client's last
+        id (tailing); before_id pages back through older history. Without either,
+        the newest `limit` lines.
+        """
         row = repo.get_run(run_id)
         if not row:
             raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
-        return [RunLogOut(**log) for log in repo.list_run_logs(run_id=run_id, limit=500)]
+        limit = max(1, min(int(limit), 2000))
+        logs = repo.list_run_logs(run_id=run_id, limit=limit, after_id=after_id, before_id=before_id)
+        return [RunLogOut(**log) for log in logs]
 
     @app.get("/v1/dashboard")
     def dashboard() -> dict:
@@ -667,6 +842,10 @@ def create_app() -> FastAPI:
         _after_db_write(f"delete_tag:{name}")
         return {"ok": True}
 
+    @app.get("/v1/prescreen/report")
+    def prescreen_report(sample: int = 500) -> dict:
+        return analysis.prescreen_report(sample_size=max(1, min(int(sample), 5000)))
+
     @app.get("/v1/settings/state")
     def get_settings_state() -> dict:
         snap = rs_snapshot()
@@ -683,11 +862,23 @@ def create_app() -> FastAPI:
             "llm_bulk_resume_chars": int(snap["llm_bulk_resume_chars"]),
             "ai_concurrency": int(snap["ai_concurrency"]),
             "job_concurrency": int(snap["job_concurrency"]),
+            "llm_max_inflight": int(snap["llm_max_inflight"]),
+            "llm_rpm": int(snap["llm_rpm"]),
+            "llm_tpm": int(snap["llm_tpm"]),
             "ocr_enabled": bool(snap["ocr_enabled"]),
             "local_lm_available": bool(snap["local_lm_available"]),
             "write_mode": bool(snap["write_mode"]),
             "write_mode_locked": bool(snap["write_mode_locked"]),
             "run_queue_paused": bool(snap.get("run_queue_paused")),
+            "queue_normalization": repo.queue_normalization_stats(),
+            "llm_cache": analysis.llm.cache_stats(),
+            "llm_governor": analysis.llm.governor_stats(),
+            "llm_endpoints": analysis.llm.endpoint_stats(),
+            "llm_coalescing": analysis.llm.coalescing_stats(),
+            "llm_prefix_reuse": analysis.llm.prefix_stats(),
+            "llm_streaming": analysis.llm.stream_stats(),
+            "text_cache": runner.text_cache.stats(),
+            "prescreen": analysis.llm.prescreen_stats(),
             "writer_default_name": writer_cfg.get("default_name", ""),
             "writer_users": writer_users,
             "lock_timeout_hours": lock_timeout,
@@ -756,8 +947,15 @@ def create_app() -> FastAPI:
             if "job_concurrency" in payload:
                 try:
                     runtime_settings["job_concurrency"] = max(1, int(payload.get("job_concurrency")))
+                    repo.queue_signal.notify_all()
                 except Exception:
                     pass
+            for key, min_value in (("llm_max_inflight", 1), ("llm_rpm", 0), ("llm_tpm", 0)):
+                if key in payload:
+                    try:
+                        runtime_settings[key] = max(min_value, int(payload.get(key)))
+                    except Exception:
+                        pass
             if "ocr_enabled" in payload:
                 runtime_settings["ocr_enabled"] = bool(payload.get("ocr_enabled"))
             analysis.llm = AIEngine(
@@ -768,37 +966,59 @@ def create_app() -> FastAPI:
                 bulk_resume_chars=runtime_settings["llm_bulk_resume_chars"],
                 preferred_model=runtime_settings["lm_model"],
             )
+            analysis.llm.llm_loop.governor.configure(
+                max_concurrency=runtime_settings["llm_max_inflight"],
+                rpm=runtime_settings["llm_rpm"],
+                tpm=runtime_settings["llm_tpm"],
+            )
         return {"ok": True}
 
     @app.post("/v1/settings/test-connection")
     def test_connection(payload: dict | None = None) -> dict:
         p = payload or {}
-        url = str(p.get("lm_base_url") or rs_get("lm_base_url"))
+        spec = str(p.get("lm_base_url") or rs_get("lm_base_url"))
         key = str(p.get("lm_api_key") or rs_get("lm_api_key"))
-        try:
-            client = OpenAI(base_url=url, api_key=key)
-            models = client.models.list()
-            count = len(getattr(models, "data", []) or [])
-            return {"ok": True, "message": f"Connected to model server. Found {count} model(s)."}
-        except Exception as exc:
-            return {"ok": False, "message": f"Connection failed: {exc}"}
+        endpoints = parse_endpoint_spec(spec) or [(spec, 1.0)]
+        results = []
+        for url, _weight in endpoints:
+            try:
+                client = OpenAI(base_url=url, api_key=key)
+                models = client.models.list()
+                count = len(getattr(models, "data", []) or [])
+                results.append({"url": url, "ok": True, "message": f"Found {count} model(s)."})
+            except Exception as exc:
+                results.append({"url": url, "ok": False, "message": f"Connection failed: {exc}"})
+        if len(results) == 1:
+            r = results[0]
+            message = f"Connected to model server. {r['message']}" if r["ok"] else r["message"]
+            return {"ok": r["ok"], "message": message, "endpoints": results}
+        ok_count = sum(1 for r in results if r["ok"])
+        return {
+            "ok": ok_count == len(results),
+            "message": f"Connected to {ok_count}/{len(results)} model servers.",
+            "endpoints": results,
+        }
 
     @app.post("/v1/settings/models")
     def list_models(payload: dict | None = None) -> dict:
         p = payload or {}
-        url = str(p.get("lm_base_url") or rs_get("lm_base_url"))
+        spec = str(p.get("lm_base_url") or rs_get("lm_base_url"))
         key = str(p.get("lm_api_key") or rs_get("lm_api_key"))
-        try:
-            client = OpenAI(base_url=url, api_key=key)
-            models = client.models.list()
-            data = list(getattr(models, "data", []) or [])
-            ids = [str(getattr(m, "id", "") or "").strip() for m in data]
-            ids = [m for m in ids if m]
-            # Prefer non-embedding chat-capable model IDs first.
-            ids = sorted(ids, key=lambda x: ("embed" in x.lower(), x.lower()))
-            return {"ok": True, "models": ids}
-        except Exception as exc:
-            return {"ok": False, "models": [], "message": f"Model list failed: {exc}"}
+        # Pool members are expected to serve the same models; ask the first that answers.
+        last_exc = None
+        for url, _weight in parse_endpoint_spec(spec) or [(spec, 1.0)]:
+            try:
+                client = OpenAI(base_url=url, api_key=key)
+                models = client.models.list()
+                data = list(getattr(models, "data", []) or [])
+                ids = [str(getattr(m, "id", "") or "").strip() for m in data]
+                ids = [m for m in ids if m]
+                # Prefer non-embedding chat-capable model IDs first.
+                ids = sorted(ids, key=lambda x: ("embed" in x.lower(), x.lower()))
+                return {"ok": True, "models": ids}
+            except Exception as exc:
+                last_exc = exc
+        return {"ok": False, "models": [], "message": f"Model list failed: {last_exc}"}
 
     @app.post("/v1/settings/write-mode/enable")
     def enable_write_mode(payload: dict) -> dict:
@@ -856,6 +1076,8 @@ def create_app() -> FastAPI:
         ok, msg = gh_sync.pull_db()
         if not ok:
             raise HTTPException(status_code=400, detail=msg)
+        db.close_pool()
+        db._init_db()
         return {"ok": True, "message": msg}
 
     @app.post("/v1/settings/reset-db")
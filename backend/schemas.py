@@ -47,6 +47,61 @@ class ScoreMatchRequest(BaseModel):
     ai_concurrency: int = Field(default=1, ge=1, le=32)
 
 
+class MatrixRunRequest(BaseModel):
+    """Queue score_match runs for every JD x resume pair (or the explicit ``pairs``)."""
+
+    job_ids: list[int] = Field(default_factory=list)
+    resume_ids: list[int] = Field(default_factory=list)
+    # Tag filters apply only when the matching id list is empty.
+    job_tags: list[str] = Field(default_factory=list)
+    resume_tags: list[str] = Field(default_factory=list)
+    pairs: list[tuple[int, int]] = Field(default_factory=list)
+    # Keep only resumes sharing a tag with the JD (JDs without tags keep every resume).
+    match_tags: bool = False
+    legacy_run_id: int | None = None
+    legacy_run_ids: dict[int, int] = Field(default_factory=dict)
+    run_name: str | None = None
+    threshold: int = 50
+    auto_deep: bool = False
+    force_rerun_pass1: bool = False
+    force_rerun_deep: bool = False
+    deep_single_prompt: bool = False
+    debug_bulk_log: bool = False
+    max_deep_scans_per_jd: int = Field(default=0, ge=0)
+    ai_concurrency: int = Field(default=1, ge=1, le=32)
+    # >1 packs this many resumes of one JD into each Pass 1 request.
+    pass1_batch_size: int = Field(default=1, ge=1, le=20)
+
+
+class MatrixRunOut(BaseModel):
+    batch_id: int
+    run_ids: list[int] = Field(default_factory=list)
+    queued: int = 0
+
+
+class BatchOut(BaseModel):
+    id: int
+    label: str | None = None
+    job_type: str | None = None
+    status: str
+    total: int = 0
+    queued: int = 0
+    running: int = 0
+    paused: int = 0
+    completed: int = 0
+    failed: int = 0
+    canceled: int = 0
+    skipped: int = 0
+    done: int = 0
+    progress: int = 0
+    created_at: str | None = None
+    started_at: str | None = None
+    last_finished_at: str | None = None
+    elapsed_seconds: int = 0
+    throughput_per_min: float = 0.0
+    eta_seconds: int | None = None
+
+
 class MatchOut(BaseModel):
     id: int
     job_id: int
@@ -67,6 +122,14 @@ class RunRequest(BaseModel):
     payload: dict[str, Any] = Field(default_factory=dict)
 
 
+class RunBatchRequest(BaseModel):
+    """Queue one upload run per payload as a single batch (ingest job types only)."""
+
+    job_type: str
+    payloads: list[dict[str, Any]] = Field(default_factory=list)
+    label: str | None = None
+
+
 class RunOut(BaseModel):
     id: int
     job_type: str
@@ -1,7 +1,10 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+import hashlib
 import json
+import os
 import re
+import threading
 
 from ai_engine import AIEngine
 
@@ -12,6 +15,14 @@ from .repository import Repository
 class AnalysisService:
     repo: Repository
     llm: AIEngine
+    # Reuse deep-scan verdicts for the same resume text + requirement across JDs.
+    evidence_cache_enabled: bool = field(
+        default_factory=lambda: str(os.getenv("RESUME_MATCHER_EVIDENCE_CACHE", "on")).strip().lower()
+        not in ("0", "false", "no", "off")
+    )
+    # (job_id, resume_id) pairs currently being scored inside someone's batched Pass 1.
+    _pass1_claims: dict = field(default_factory=dict, repr=False)
+    _pass1_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
     # ── Deep-scan helper sections ──────────────────────────────────────────
 
@@ -118,6 +129,62 @@ class AnalysisService:
             return overlap >= 2 or ratio >= 0.22
         return overlap >= 1 or ratio >= 0.12
 
+    # ── Requirement evidence cache ─────────────────────────────────────────
+
+    @staticmethod
+    def _evidence_key(category: str, requirement: str) -> tuple[str, str]:
+        req = re.sub(r"\s+", " ", str(requirement or "")).strip().lower().rstrip(" .;,:")
+        return (AnalysisService._norm_cat(category), req)
+
+    def _load_cached_evidence(
+        self, resume_content: str, items: list[tuple[str, str]], use_cache: bool = True
+    ) -> tuple[dict[int, dict], tuple[str, str] | None]:
+        """
+        Look up cached verdicts for *items*. Returns ({rel_idx: evaluation}, scope);
+        scope is None when caching is off, unavailable or bypassed (forced rerun)
+        and is passed back to _save_evidence unchanged, so nothing is saved either.
+        """
+        if not use_cache or not self.evidence_cache_enabled or not items:
+            return {}, None
+        try:
+            resume_hash = hashlib.sha256(str(resume_content or "").encode("utf-8")).hexdigest()
+            scope = (resume_hash, str(self.llm.model_name()))
+            keys = [self._evidence_key(cat, val) for cat, val in items]
+            found = self.repo.get_requirement_evidence(scope[0], scope[1], keys)
+        except Exception:
+            return {}, None
+        cached: dict[int, dict] = {}
+        for rel_idx, ((category, value), key) in enumerate(zip(items, keys)):
+            hit = found.get(key)
+            if hit:
+                cached[rel_idx] = {
+                    "requirement": value,
+                    "category": category,
+                    "status": str(hit.get("status") or "Missing"),
+                    "evidence": str(hit.get("evidence") or "None"),
+                }
+        return cached, scope
+
+    def _save_evidence(self, scope: tuple[str, str] | None, entries: list[tuple[str, str, dict]]) -> None:
+        """Store [(category, requirement, evaluation), ...]; keyed on the JD's wording, not the model's echo."""
+        if scope is None or not entries:
+            return
+        rows = []
+        for category, value, evaluation in entries:
+            if evaluation.get("prescreen"):
+                # Rule verdicts are cheap to recompute and would skew the LLM-labeled sample.
+                continue
+            status = str(evaluation.get("status") or "Missing")
+            if status not in ("Met", "Partial", "Missing"):
+                continue
+            cat, req = self._evidence_key(category, value)
+            rows.append((cat, req, status, str(evaluation.get("evidence") or "None")))
+        try:
+            self.repo.save_requirement_evidence(scope[0], scope[1], rows)
+        except Exception:
+            # The cache is an optimization only; never fail a scan over it.
+            pass
+
     # ── Bulk deep-scan orchestration ───────────────────────────────────────
 
     def _run_bulk_deep_scan(
@@ -135,8 +202,13 @@ class AnalysisService:
         resume_id: int,
         log_fn,
         progress_fn,
+        use_cache: bool = True,
     ) -> list[dict]:
-        """Run bulk evaluation and return ordered evaluations for *remaining_items*."""
+        """
+        Run bulk evaluation and return ordered evaluations for *remaining_items*.
+        `use_cache=False` (forced deep reruns) skips both the evidence cache and
+        the LLM response cache, so every requirement is asked again.
+        """
         bulk_resolved: dict[int, dict] = {}
 
         def _bulk_fill_missing(missing_rel_indices: list[int], attempt_no: int) -> int:
@@ -159,6 +231,7 @@ class AnalysisService:
                     "subset_size": len(subset),
                     "debug_bulk_log": bool(debug_bulk_log),
                 },
+                use_cache=use_cache,
             )
             rows = raw_bulk if isinstance(raw_bulk, list) else []
             if callable(log_fn):
@@ -169,10 +242,11 @@ class AnalysisService:
             assigned = 0
             by_key: dict[tuple[str, str], int] = {}
             by_id: dict[int, int] = {}
-            for rel_idx in missing_rel_indices:
+            # evaluate_bulk_criteria numbers the subset 1..N, so ids map by position.
+            for pos, rel_idx in enumerate(missing_rel_indices, start=1):
                 cat, req = remaining_items[rel_idx]
                 by_key[self._norm_key(cat, req)] = rel_idx
-                by_id[rel_idx + 1] = rel_idx
+                by_id[pos] = rel_idx
 
             unmatched_rows: list[dict] = []
             unmatched_rel = set(missing_rel_indices)
@@ -272,10 +346,33 @@ class AnalysisService:
             # NOTE: Intentionally NO positional fill here.
             return assigned
 
+        # ── Cached verdicts first; only the rest goes to the model ──
+        cached_rel, evidence_scope = self._load_cached_evidence(
+            resume_content, remaining_items, use_cache=use_cache
+        )
+        bulk_resolved.update(cached_rel)
+        if cached_rel and callable(log_fn):
+            log_fn(
+                f"Deep Scan evidence cache: reused {len(cached_rel)}/{len(remaining_items)} requirement verdict(s)."
+            )
+
+        # ── Deterministic pre-screen: decided requirements never reach the model ──
+        missing_rel = [i for i in range(len(remaining_items)) if i not in bulk_resolved]
+        prescreened = 0
+        for rel_idx, verdict in zip(
+            missing_rel, self.llm.prescreen_criteria(resume_content, [remaining_items[i] for i in missing_rel])
+        ):
+            if verdict:
+                bulk_resolved[rel_idx] = verdict
+                prescreened += 1
+        if prescreened and callable(log_fn):
+            log_fn(f"Deep Scan pre-screen: decided {prescreened}/{len(missing_rel)} requirement(s) without the model.")
+
         # ── Bulk fill passes ──
-        missing_rel = list(range(len(remaining_items)))
-        assigned_1 = _bulk_fill_missing(missing_rel, 1)
         missing_rel = [i for i in range(len(remaining_items)) if i not in bulk_resolved]
+        assigned_1 = _bulk_fill_missing(missing_rel, 1) if missing_rel else 0
+        missing_rel = [i for i in range(len(remaining_items)) if i not in bulk_resolved]
+        failed_rel: set[int] = set()
 
         if missing_rel and assigned_1 > 0:
             assigned_2 = _bulk_fill_missing(missing_rel, 2)
@@ -295,43 +392,51 @@ class AnalysisService:
         if deep_ai_concurrency > 1 and len(missing_rel) > 1:
             if callable(log_fn):
                 log_fn(
-                    f"Deep Scan fallback running concurrently with {min(deep_ai_concurrency, len(missing_rel))} worker(s)."
+                    f"Deep Scan fallback running concurrently with up to {min(deep_ai_concurrency, len(missing_rel))} request(s) in flight."
                 )
-            with ThreadPoolExecutor(max_workers=min(deep_ai_concurrency, len(missing_rel))) as pool:
-                futures = {}
-                for rel_idx in missing_rel:
-                    idx = resume_from + rel_idx + 1
-                    category, value = remaining_items[rel_idx]
-                    if callable(log_fn):
-                        log_fn(f"Deep Scan fallback {idx}/{total_reqs}: [{category}] {value}")
-                    fut = pool.submit(self.llm.evaluate_criterion, resume_content, category, value)
-                    futures[fut] = (rel_idx, idx, category, value)
-                for fut in as_completed(futures):
-                    rel_idx, idx, category, value = futures[fut]
-                    try:
-                        raw_eval = fut.result()
-                    except Exception:
-                        raw_eval = None
-                    evaluation = self._normalize_deep_eval(raw_eval, category, value)
-                    bulk_resolved[rel_idx] = evaluation
-                    fallback_logged_rel.add(rel_idx)
-                    if callable(log_fn):
-                        status = str(evaluation.get("status") or "Missing")
-                        icon = "✅" if status == "Met" else "⚠️" if status == "Partial" else "❌"
-                        log_fn(f"  ↳ {icon} {status} — {evaluation.get('requirement')}")
-                    if callable(progress_fn):
-                        ordered_partial = []
-                        for i in range(len(remaining_items)):
-                            if i in bulk_resolved:
-                                ordered_partial.append(bulk_resolved[i])
-                        progress_fn(idx, total_reqs, deep_details + ordered_partial)
+            submitted = self.llm.submit_criteria(
+                resume_content,
+                [remaining_items[i] for i in missing_rel],
+                concurrency=deep_ai_concurrency,
+                use_cache=use_cache,
+            )
+            futures = {}
+            for rel_idx, fut in zip(missing_rel, submitted):
+                idx = resume_from + rel_idx + 1
+                category, value = remaining_items[rel_idx]
+                if callable(log_fn):
+                    log_fn(f"Deep Scan fallback {idx}/{total_reqs}: [{category}] {value}")
+                futures[fut] = (rel_idx, idx, category, value)
+            for fut in as_completed(futures):
+                rel_idx, idx, category, value = futures[fut]
+                try:
+                    raw_eval = fut.result()
+                except Exception:
+                    raw_eval = None
+                if not raw_eval:
+                    failed_rel.add(rel_idx)
+                evaluation = self._normalize_deep_eval(raw_eval, category, value)
+                bulk_resolved[rel_idx] = evaluation
+                fallback_logged_rel.add(rel_idx)
+                if callable(log_fn):
+                    status = str(evaluation.get("status") or "Missing")
+                    icon = "✅" if status == "Met" else "⚠️" if status == "Partial" else "❌"
+                    log_fn(f"  ↳ {icon} {status} — {evaluation.get('requirement')}")
+                if callable(progress_fn):
+                    ordered_partial = []
+                    for i in range(len(remaining_items)):
+                        if i in bulk_resolved:
+                            ordered_partial.append(bulk_resolved[i])
+                    progress_fn(idx, total_reqs, deep_details + ordered_partial)
         else:
             for rel_idx in missing_rel:
                 idx = resume_from + rel_idx + 1
                 category, value = remaining_items[rel_idx]
                 if callable(log_fn):
                     log_fn(f"Deep Scan fallback {idx}/{total_reqs}: [{category}] {value}")
-                raw_eval = self.llm.evaluate_criterion(resume_content, category, value)
+                raw_eval = self.llm.evaluate_criterion(resume_content, category, value, use_cache=use_cache)
+                if not raw_eval:
+                    failed_rel.add(rel_idx)
                 evaluation = self._normalize_deep_eval(raw_eval, category, value)
                 bulk_resolved[rel_idx] = evaluation
                 fallback_logged_rel.add(rel_idx)
@@ -346,6 +451,15 @@ class AnalysisService:
                             ordered_partial.append(bulk_resolved[i])
                     progress_fn(idx, total_reqs, deep_details + ordered_partial)
 
+        self._save_evidence(
+            evidence_scope,
+            [
+                (*remaining_items[rel_idx], evaluation)
+                for rel_idx, evaluation in bulk_resolved.items()
+                if rel_idx not in cached_rel and rel_idx not in failed_rel
+            ],
+        )
+
         # ── Append in original requirement order ──
         new_details: list[dict] = []
         for rel_idx, (category, value) in enumerate(remaining_items):
@@ -380,49 +494,73 @@ class AnalysisService:
         deep_ai_concurrency: int,
         log_fn,
         progress_fn,
+        use_cache: bool = True,
     ) -> list[dict]:
-        """Run per-requirement evaluation and return ordered evaluations for *remaining_items*."""
+        """
+        Run per-requirement evaluation and return ordered evaluations for *remaining_items*.
+        `use_cache` works as in _run_bulk_deep_scan.
+        """
         new_details: list[dict] = []
-        if deep_ai_concurrency > 1 and len(remaining_items) > 1:
+        cached_rel, evidence_scope = self._load_cached_evidence(
+            resume_content, remaining_items, use_cache=use_cache
+        )
+        if cached_rel and callable(log_fn):
+            log_fn(
+                f"Deep Scan evidence cache: reused {len(cached_rel)}/{len(remaining_items)} requirement verdict(s)."
+            )
+        pending_rel = [i for i in range(len(remaining_items)) if i not in cached_rel]
+        if deep_ai_concurrency > 1 and len(pending_rel) > 1:
             if callable(log_fn):
                 log_fn(
-                    f"Deep Scan per-requirement mode running concurrently with {min(deep_ai_concurrency, len(remaining_items))} worker(s)."
+                    f"Deep Scan per-requirement mode running concurrently with up to {min(deep_ai_concurrency, len(pending_rel))} request(s) in flight."
                 )
-            results_by_rel: dict[int, dict] = {}
-            with ThreadPoolExecutor(max_workers=min(deep_ai_concurrency, len(remaining_items))) as pool:
-                futures = {}
-                for rel_idx, (category, value) in enumerate(remaining_items):
-                    idx = resume_from + rel_idx + 1
-                    if callable(log_fn):
-                        log_fn(f"Deep Scan {idx}/{total_reqs}: [{category}] {value}")
-                    fut = pool.submit(self.llm.evaluate_criterion, resume_content, category, value)
-                    futures[fut] = (rel_idx, idx, category, value)
-                for fut in as_completed(futures):
-                    rel_idx, idx, category, value = futures[fut]
-                    try:
-                        raw_eval = fut.result()
-                    except Exception:
-                        raw_eval = None
-                    evaluation = self._normalize_deep_eval(raw_eval, category, value)
-                    results_by_rel[rel_idx] = evaluation
-                    if callable(log_fn):
-                        status = str(evaluation.get("status") or "Missing")
-                        icon = "✅" if status == "Met" else "⚠️" if status == "Partial" else "❌"
-                        log_fn(f"  ↳ {icon} {status} — {evaluation.get('requirement')}")
-                    if callable(progress_fn):
-                        ordered_partial = [results_by_rel[i] for i in sorted(results_by_rel.keys())]
-                        progress_fn(idx, total_reqs, deep_details + ordered_partial)
+            results_by_rel: dict[int, dict] = dict(cached_rel)
+            submitted = self.llm.submit_criteria(
+                resume_content,
+                [remaining_items[i] for i in pending_rel],
+                concurrency=deep_ai_concurrency,
+                use_cache=use_cache,
+            )
+            futures = {}
+            for rel_idx, fut in zip(pending_rel, submitted):
+                category, value = remaining_items[rel_idx]
+                idx = resume_from + rel_idx + 1
+                if callable(log_fn):
+                    log_fn(f"Deep Scan {idx}/{total_reqs}: [{category}] {value}")
+                futures[fut] = (rel_idx, idx, category, value)
+            for fut in as_completed(futures):
+                rel_idx, idx, category, value = futures[fut]
+                try:
+                    raw_eval = fut.result()
+                except Exception:
+                    raw_eval = None
+                evaluation = self._normalize_deep_eval(raw_eval, category, value)
+                results_by_rel[rel_idx] = evaluation
+                if raw_eval:
+                    self._save_evidence(evidence_scope, [(category, value, evaluation)])
+                if callable(log_fn):
+                    status = str(evaluation.get("status") or "Missing")
+                    icon = "✅" if status == "Met" else "⚠️" if status == "Partial" else "❌"
+                    log_fn(f"  ↳ {icon} {status} — {evaluation.get('requirement')}")
+                if callable(progress_fn):
+                    ordered_partial = [results_by_rel[i] for i in sorted(results_by_rel.keys())]
+                    progress_fn(idx, total_reqs, deep_details + ordered_partial)
             for rel_idx in range(len(remaining_items)):
                 new_details.append(
                     results_by_rel.get(rel_idx)
                     or self._normalize_deep_eval(None, remaining_items[rel_idx][0], remaining_items[rel_idx][1])
                 )
         else:
-            for idx, (category, value) in enumerate(remaining_items, start=resume_from + 1):
+            for rel_idx, (category, value) in enumerate(remaining_items):
+                idx = resume_from + rel_idx + 1
                 if callable(log_fn):
                     log_fn(f"Deep Scan {idx}/{total_reqs}: [{category}] {value}")
-                raw_eval = self.llm.evaluate_criterion(resume_content, category, value)
-                evaluation = self._normalize_deep_eval(raw_eval, category, value)
+                evaluation = cached_rel.get(rel_idx)
+                if evaluation is None:
+                    raw_eval = self.llm.evaluate_criterion(resume_content, category, value, use_cache=use_cache)
+                    evaluation = self._normalize_deep_eval(raw_eval, category, value)
+                    if raw_eval:
+                        self._save_evidence(evidence_scope, [(category, value, evaluation)])
                 new_details.append(evaluation)
                 if callable(progress_fn):
                     progress_fn(idx, total_reqs, deep_details + new_details)
@@ -432,6 +570,128 @@ class AnalysisService:
                     log_fn(f"  ↳ {icon} {status} — {evaluation.get('requirement')}")
         return new_details
 
+    # ── Batched Pass 1 ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _content_hash(value) -> str:
+        text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+        return hashlib.sha256(str(text or "").encode("utf-8")).hexdigest()
+
+    def _batched_standard(
+        self,
+        job: dict,
+        resume: dict,
+        batch_id: int | None,
+        batch_size: int,
+        force_rerun_pass1: bool,
+        log_fn,
+    ) -> dict | None:
+        """
+        Pass 1 via evaluate_standard_batch: score this resume together with up to
+        batch_size - 1 still-queued runs of the same JD in the same batch, and hand
+        their results off so those runs skip their own Pass 1 call. Hand-offs are
+        scoped to the batch, so runs outside it (e.g. a later forced rerun) never
+        see them. Returns None when the caller should fall back to a single
+        evaluate_standard.
+        """
+        if not batch_id:
+            return None
+        job_id, resume_id = int(job["id"]), int(resume["id"])
+        criteria_hash = self._content_hash(job.get("criteria"))
+        model = str(self.llm.model_name())
+
+        with self._pass1_lock:
+            pending = self._pass1_claims.get((job_id, resume_id))
+        if pending is not None:
+            # Another worker is scoring this resume right now; wait for its hand-off.
+            pending.wait(timeout=max(self.llm.request_timeout_sec, self.llm.bulk_timeout_sec) + 30)
+        handed = self.repo.pop_pass1_handoff(batch_id, criteria_hash, self._content_hash(resume.get("content")), model)
+        if isinstance(handed, dict):
+            if callable(log_fn):
+                log_fn("Pass 1 result taken from a batched multi-resume request.")
+            return handed
+        if batch_size <= 1:
+            return None
+
+        peer_ids = []
+        for rid in self.repo.list_queued_batch_resume_ids(
+            batch_id, job_id, limit=(batch_size - 1) * 2, exclude_resume_ids=[resume_id]
+        ):
+            # Runs that will reuse an existing match never call Pass 1.
+            if not force_rerun_pass1 and self.repo.get_existing_match(job_id, rid):
+                continue
+            peer_ids.append(rid)
+        with self._pass1_lock:
+            peer_ids = [rid for rid in peer_ids if (job_id, rid) not in self._pass1_claims][: batch_size - 1]
+            if not peer_ids:
+                return None
+            claimed = [(job_id, rid) for rid in [resume_id, *peer_ids]]
+            for key in claimed:
+                self._pass1_claims[key] = threading.Event()
+        try:
+            members = [resume] + [r for r in (self.repo.get_resume(rid) for rid in peer_ids) if r]
+            candidates = []
+            for member in members:
+                profile = member.get("profile")
+                if isinstance(profile, str):
+                    try:
+                        profile = json.loads(profile)
+                    except Exception:
+                        pass
+                candidates.append(
+                    {"candidate_id": f"r{member['id']}", "profile": profile, "resume_text": member.get("content")}
+                )
+            results = self.llm.evaluate_standard_batch(
+                job.get("criteria"), candidates, use_cache=not force_rerun_pass1
+            )
+            handoffs = [
+                (
+                    job_id,
+                    int(member["id"]),
+                    criteria_hash,
+                    self._content_hash(member.get("content")),
+                    model,
+                    results[f"r{member['id']}"],
+                )
+                for member in members[1:]
+                if f"r{member['id']}" in results
+            ]
+            self.repo.save_pass1_handoffs(batch_id, handoffs)
+            if callable(log_fn):
+                log_fn(
+                    f"Pass 1 batched: {len(results)}/{len(candidates)} candidate(s) scored in one request; "
+                    f"{len(handoffs)} result(s) handed to queued runs."
+                )
+            return results.get(f"r{resume_id}")
+        finally:
+            with self._pass1_lock:
+                for key in claimed:
+                    event = self._pass1_claims.pop(key, None)
+                    if event is not None:
+                        event.set()
+
+    def prescreen_report(self, sample_size: int = 500) -> dict:
+        """
+        Rule-vs-LLM agreement on stored Deep-scan verdicts. Rows the rules decided
+        themselves are not labels and are left out of the sample.
+        """
+        samples = []
+        for resume_content, details in self.repo.list_deep_scan_samples(limit=max(1, sample_size // 5)):
+            for row in details:
+                if not isinstance(row, dict) or row.get("prescreen"):
+                    continue
+                evidence = str(row.get("evidence") or "")
+                if evidence.startswith("Evaluation timed out"):
+                    continue
+                samples.append((resume_content, row.get("category"), row.get("requirement"), row.get("status")))
+                if len(samples) >= sample_size:
+                    break
+            if len(samples) >= sample_size:
+                break
+        report = self.llm.prescreen.agreement(samples)
+        report["live"] = self.llm.prescreen_stats()
+        return report
+
     def ingest_job(self, filename: str, content: str, tags: list[str]) -> dict:
         criteria = self.llm.analyze_jd(content)
         if not isinstance(criteria, dict) or criteria.get("error"):
@@ -463,6 +723,8 @@ class AnalysisService:
         deep_partial_details: list[dict] | None = None,
         progress_fn=None,
         debug_run_id: int | None = None,
+        pass1_batch_size: int = 1,
+        batch_id: int | None = None,
     ) -> dict:
         job = self.repo.get_job(job_id)
         if not job:
@@ -504,7 +766,14 @@ class AnalysisService:
             if callable(log_fn):
                 log_fn("Pass 1 reused from existing Standard match (force_rerun_pass1=false).")
         else:
-            standard = self.llm.evaluate_standard(resume["content"], job["criteria"], resume["profile"])
+            if int(pass1_batch_size or 1) > 1:
+                standard = self._batched_standard(
+                    job, resume, batch_id, int(pass1_batch_size), force_rerun_pass1, log_fn
+                )
+            if standard is None:
+                standard = self.llm.evaluate_standard(
+                    resume["content"], job["criteria"], resume["profile"], use_cache=not force_rerun_pass1
+                )
             if not isinstance(standard, dict):
                 if callable(log_fn):
                     log_fn("Standard evaluation failed or malformed; using fallback standard result.")
@@ -623,6 +892,7 @@ class AnalysisService:
                     resume_id=resume_id,
                     log_fn=log_fn,
                     progress_fn=progress_fn,
+                    use_cache=not force_rerun_deep,
                 )
             else:
                 new_details = self._run_per_requirement_deep_scan(
@@ -634,6 +904,7 @@ class AnalysisService:
                     deep_ai_concurrency=deep_ai_concurrency,
                     log_fn=log_fn,
                     progress_fn=progress_fn,
+                    use_cache=not force_rerun_deep,
                 )
             deep_details.extend(new_details)
 
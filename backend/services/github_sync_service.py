@@ -3,7 +3,6 @@ import datetime as dt
 import hashlib
 import json
 import os
-import shutil
 import sqlite3
 import tempfile
 import threading
@@ -55,6 +54,9 @@ class GitHubSyncService:
         default_factory=lambda: os.getenv("RESUME_MATCHER_AUTO_PUSH_DB_ON_RUN", "true").strip().lower() in ("1", "true", "yes", "on")
     )
     _auto_push_lock: threading.Lock = field(default_factory=threading.Lock)
+    # Drops idle pooled connections to the local DB (DBManager.close_pool) before
+    # the file is read for push/SHA checks or replaced by a pull.
+    close_pool: Callable[[], None] | None = None
 
     def _credentials(self) -> tuple[str | None, str | None]:
         secrets = _load_secrets()
@@ -127,6 +129,32 @@ class GitHubSyncService:
             "auto_write_mode": env_auto_write_mode if str(os.getenv("RESUME_MATCHER_AUTO_WRITE_MODE", "")).strip() else bool(writer.get("auto_write_mode", False)),
         }
 
+    def _checkpoint_local_db(self) -> None:
+        """Fold the WAL into the main DB file so its bytes reflect every committed write."""
+        if self.close_pool is not None:
+            self.close_pool()
+        local_db = Path(self.db_path)
+        if not local_db.exists():
+            return
+        conn = sqlite3.connect(str(local_db), timeout=30)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        finally:
+            conn.close()
+
+    def _backup_db_to(self, src_path: Path, dst_path: Path) -> None:
+        """
+        Consistent copy through the SQLite backup API: sees committed WAL content and
+        takes the proper locks, unlike copying or overwriting the file.
+        """
+        src = sqlite3.connect(str(src_path), timeout=30)
+        dst = sqlite3.connect(str(dst_path), timeout=30)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
     def pull_db(self) -> tuple[bool, str]:
         _, repo, err = self._client()
         if not repo:
@@ -143,7 +171,7 @@ class GitHubSyncService:
                 file_data = base64.b64decode(blob.content)
             if not file_data:
                 return False, "Downloaded DB content was empty."
-            local_path.write_bytes(file_data)
+            self._replace_local_db(file_data)
             self._restore_runtime_tables(local_path, local_runtime)
             return True, "Database pulled from GitHub (local runtime queue history preserved)."
         except GithubException as exc:
@@ -153,60 +181,84 @@ class GitHubSyncService:
         except Exception as exc:
             return False, f"Error pulling DB: {exc}"
 
-    def _snapshot_runtime_tables(self, db_file: Path) -> tuple[list[tuple], list[tuple]]:
+    def _replace_local_db(self, file_data: bytes) -> None:
+        """
+        Load downloaded DB bytes into the local DB via the backup API, so live
+        connections and the local -wal/-shm files stay consistent.
+        """
+        local_path = Path(self.db_path)
+        self._checkpoint_local_db()
+        with tempfile.TemporaryDirectory(prefix="resume_matcher_pull_") as td:
+            incoming = Path(td) / local_path.name
+            incoming.write_bytes(file_data)
+            check = sqlite3.connect(str(incoming))
+            try:
+                check.execute("PRAGMA schema_version").fetchone()
+            finally:
+                check.close()
+            self._backup_db_to(incoming, local_path)
+        if self.close_pool is not None:
+            self.close_pool()
+
+    # Local-only state kept across pulls and left out of pushes; restored in this
+    # order. requirement_evidence is a disposable deep-scan verdict cache.
+    RUNTIME_TABLES = ("job_runs", "job_run_logs", "job_batches", "requirement_evidence")
+    LOCAL_ONLY_TABLES = ("requirement_evidence",)
+
+    def _snapshot_runtime_tables(self, db_file: Path) -> dict:
+        """Rows of every runtime table, with its CREATE statement and column types."""
         if not db_file.exists():
-            return [], []
+            return {}
+        snapshot = {}
         try:
             conn = sqlite3.connect(str(db_file), timeout=30)
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT id, job_type, payload_json, status, progress, current_step, error, result_json, created_at, started_at, finished_at
-                FROM job_runs
-                ORDER BY id ASC
-                """
-            )
-            runs = cur.fetchall()
-            cur.execute(
-                """
-                SELECT id, run_id, level, message, created_at
-                FROM job_run_logs
-                ORDER BY id ASC
-                """
-            )
-            logs = cur.fetchall()
-            conn.close()
-            return runs, logs
+            try:
+                for table in self.RUNTIME_TABLES:
+                    row = conn.execute(
+                        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                    ).fetchone()
+                    if not row:
+                        continue
+                    columns = [(r[1], r[2]) for r in conn.execute(f"PRAGMA table_info({table})")]
+                    names = ", ".join(name for name, _ in columns)
+                    rows = conn.execute(f"SELECT {names} FROM {table} ORDER BY rowid ASC").fetchall()
+                    snapshot[table] = {"create_sql": row[0], "columns": columns, "rows": rows}
+            finally:
+                conn.close()
+            return snapshot
         except Exception:
-            return [], []
+            return {}
 
-    def _restore_runtime_tables(self, db_file: Path, snapshot: tuple[list[tuple], list[tuple]]) -> None:
-        runs, logs = snapshot
-        if not runs and not logs:
+    def _restore_runtime_tables(self, db_file: Path, snapshot: dict) -> None:
+        if not any(entry["rows"] for entry in snapshot.values()):
             return
         try:
             conn = sqlite3.connect(str(db_file), timeout=30)
             cur = conn.cursor()
-            # Keep local machine queue state/history intact across pulls.
-            cur.execute("DELETE FROM job_run_logs")
-            cur.execute("DELETE FROM job_runs")
-            if runs:
-                cur.executemany(
-                    """
-                    INSERT INTO job_runs
-                    (id, job_type, payload_json, status, progress, current_step, error, result_json, created_at, started_at, finished_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    runs,
-                )
-            if logs:
+            for table, entry in snapshot.items():
+                # The pulled DB may predate this table or some of its columns.
+                exists = cur.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()
+                if not exists:
+                    cur.execute(entry["create_sql"])
+                present = {r[1] for r in cur.execute(f"PRAGMA table_info({table})")}
+                for name, decl in entry["columns"]:
+                    if name not in present:
+                        cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}".rstrip())
+            # Keep local machine queue state/history intact across pulls. Batches are
+            # cleared first and re-inserted last so the job_runs triggers don't
+            # double-count them; their counters come from the snapshot as-is.
+            for table in snapshot:
+                cur.execute(f"DELETE FROM {table}")
+            for table in self.RUNTIME_TABLES:
+                entry = snapshot.get(table)
+                if not entry or not entry["rows"]:
+                    continue
+                names = [name for name, _ in entry["columns"]]
                 cur.executemany(
-                    """
-                    INSERT INTO job_run_logs
-                    (id, run_id, level, message, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    logs,
+                    f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                    entry["rows"],
                 )
             conn.commit()
             conn.close()
@@ -226,7 +278,14 @@ class GitHubSyncService:
                 WHERE run_id NOT IN (SELECT id FROM job_runs)
                 """
             )
+            for table in self.LOCAL_ONLY_TABLES:
+                try:
+                    cur.execute(f"DELETE FROM {table}")
+                except sqlite3.OperationalError:
+                    pass
             conn.commit()
+            # Drop the freed pages too, so deleted cache rows don't ride along in the file.
+            conn.execute("VACUUM")
             conn.close()
         except Exception:
             return
@@ -236,9 +295,16 @@ class GitHubSyncService:
         if not local_db.exists():
             raise FileNotFoundError(f"Local database not found at {self.db_path}")
 
+        self._checkpoint_local_db()
         with tempfile.TemporaryDirectory(prefix="resume_matcher_sync_") as td:
             temp_db = Path(td) / local_db.name
-            shutil.copy2(local_db, temp_db)
+            self._backup_db_to(local_db, temp_db)
+            conn = sqlite3.connect(str(temp_db), timeout=30)
+            try:
+                # Self-contained file: no -wal sidecar left next to the pushed bytes.
+                conn.execute("PRAGMA journal_mode=DELETE").fetchone()
+            finally:
+                conn.close()
             self._prune_runtime_tables_for_push(temp_db)
             return temp_db.read_bytes()
 
@@ -247,11 +313,11 @@ class GitHubSyncService:
         if not local_db.exists():
             return None
         try:
-            content = local_db.read_bytes()
+            # Same bytes push_db would upload, so an unchanged DB matches the remote blob.
+            content = self._build_sanitized_db_bytes_for_push()
         except Exception:
             return None
-        header = f"blob {len(content)}\0".encode("utf-8")
-        return hashlib.sha1(header + content).hexdigest()
+        return self._blob_sha_from_bytes(content)
 
     def _blob_sha_from_bytes(self, content: bytes) -> str:
         header = f"blob {len(content)}\0".encode("utf-8")
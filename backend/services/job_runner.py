@@ -1,14 +1,19 @@
+import queue
 import threading
 import time
 import traceback
 import json
 import base64
+import functools
+import hashlib
+import inspect
 import os
 import re
 from dataclasses import dataclass, field
 from typing import Callable
 
 import document_utils
+from text_cache import ExtractedTextCache, get_text_cache
 
 from .analysis import AnalysisService
 from .repository import Repository
@@ -22,11 +27,32 @@ class RunPausedError(RuntimeError):
     pass
 
 
+# Bump when extract_text_from_pdf / extract_text_from_docx output changes; edits to
+# clean_extracted_text and JobRunner._normalize_extracted_text are picked up on their own.
+EXTRACTED_TEXT_VERSION = "1"
+
+
+@functools.lru_cache(maxsize=1)
+def _normalization_fingerprint(normalizer) -> str:
+    parts = [EXTRACTED_TEXT_VERSION]
+    for fn in (document_utils.clean_extracted_text, normalizer):
+        try:
+            parts.append(inspect.getsource(fn))
+        except (OSError, TypeError):
+            parts.append(getattr(fn, "__qualname__", ""))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
 @dataclass
 class JobRunner:
     repo: Repository
     analysis: AnalysisService
     poll_seconds: float = 0.6
+    # The idle dispatcher blocks on Repository.queue_signal; this is only the safety-net
+    # re-check interval for state changes that bypass the signal (e.g. another process).
+    idle_poll_seconds: float = field(
+        default_factory=lambda: max(0.1, float(os.getenv("RESUME_MATCHER_RUN_IDLE_POLL_SEC", "5") or 5.0))
+    )
     on_run_terminal: Callable[[int, str], None] | None = None
     can_pick_next_run: Callable[[], bool] | None = None
     max_running_getter: Callable[[], int] | int = 1
@@ -35,23 +61,44 @@ class JobRunner:
     )
     _stop_event: threading.Event = field(default_factory=threading.Event)
     _threads: list[threading.Thread] = field(default_factory=list)
+    # Runs claimed by the dispatcher, waiting for a worker; None tells a worker to exit.
+    _handoff: queue.Queue = field(default_factory=queue.Queue)
+    _idle_workers: int = 0
+    _idle_lock: threading.Lock = field(default_factory=threading.Lock)
+    # Stale-state repair cadence for the run queue (kept off the claim path).
+    queue_normalize_interval_sec: float = field(
+        default_factory=lambda: max(1.0, float(os.getenv("RESUME_MATCHER_QUEUE_NORMALIZE_SEC", "60") or 60.0))
+    )
     _heartbeat_interval_sec: float = field(
         default_factory=lambda: max(5.0, float(os.getenv("RESUME_MATCHER_RUN_HEARTBEAT_SEC", "20") or 20.0))
     )
+    text_cache: ExtractedTextCache = field(default_factory=get_text_cache)
 
     def start(self) -> None:
         if any(t.is_alive() for t in self._threads):
             return
         self._stop_event.clear()
         self._threads = []
+        self._handoff = queue.Queue()
+        self._idle_workers = 0
         workers = max(1, int(self.worker_pool_size or 1))
         for i in range(workers):
-            t = threading.Thread(target=self._run_loop, name=f"job-runner-{i+1}", daemon=True)
+            t = threading.Thread(target=self._worker_loop, name=f"job-runner-{i+1}", daemon=True)
             t.start()
             self._threads.append(t)
+        t = threading.Thread(target=self._dispatch_loop, name="job-runner-dispatch", daemon=True)
+        t.start()
+        self._threads.append(t)
+        t = threading.Thread(target=self._normalize_loop, name="job-runner-normalize", daemon=True)
+        t.start()
+        self._threads.append(t)
 
     def stop(self) -> None:
         self._stop_event.set()
+        self.repo.queue_signal.notify_all()
+        # Sentinels queue up behind any already-claimed runs, so workers drain those first.
+        for _ in range(max(1, int(self.worker_pool_size or 1))):
+            self._handoff.put(None)
         for t in self._threads:
             t.join(timeout=2.0)
         self._threads = []
@@ -82,92 +129,135 @@ class JobRunner:
             value = 1
         return max(1, value)
 
-    def _run_loop(self) -> None:
+    def _wait_for_work(self) -> None:
+        if self._stop_event.is_set():
+            return
+        self.repo.queue_signal.wait(timeout=self.idle_poll_seconds)
+
+    def _free_workers(self) -> int:
+        with self._idle_lock:
+            return self._idle_workers - self._handoff.qsize()
+
+    def _dispatch_loop(self) -> None:
+        """Claim queued runs in batches sized to the idle worker count and hand them out."""
         while not self._stop_event.is_set():
             try:
                 if self.can_pick_next_run and not self.can_pick_next_run():
-                    time.sleep(self.poll_seconds)
+                    self._wait_for_work()
                     continue
-                run = self.repo.claim_next_run(max_running=self._max_running())
-                if not run:
-                    time.sleep(self.poll_seconds)
+                free = self._free_workers()
+                if free <= 0:
+                    # Workers notify the queue signal when they become idle.
+                    self._wait_for_work()
                     continue
-                run_id = int(run["id"])
-                self.repo.add_run_log(run_id, "info", f"Run picked up: {run['job_type']}")
-                heartbeat_stop = threading.Event()
-                heartbeat_thread = threading.Thread(
-                    target=self._run_heartbeat_loop,
-                    name=f"run-heartbeat-{run_id}",
-                    args=(run_id, heartbeat_stop),
-                    daemon=True,
-                )
-                heartbeat_thread.start()
+                runs = self.repo.claim_next_runs(limit=free, max_running=self._max_running())
+                if not runs:
+                    self._wait_for_work()
+                    continue
+                for run in runs:
+                    self._handoff.put(run)
+            except Exception:
+                # Keep the dispatcher alive if queue polling fails transiently.
+                print("[job-runner] dispatch error:\n" + traceback.format_exc())
+                time.sleep(self.poll_seconds)
+
+    def _normalize_loop(self) -> None:
+        while not self._stop_event.wait(self.queue_normalize_interval_sec):
+            try:
+                fixed = self.repo.normalize_queue(max_running=self._max_running())
+                if fixed:
+                    print(f"[job-runner] queue normalization re-queued {fixed} stale running run(s)")
+            except Exception:
+                print("[job-runner] queue normalization error:\n" + traceback.format_exc())
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._idle_lock:
+                self._idle_workers += 1
+            self.repo.queue_signal.notify()
+            run = self._handoff.get()
+            with self._idle_lock:
+                self._idle_workers -= 1
+            if run is None:
+                return
+            try:
+                self._process_run(run)
+            except Exception:
+                print("[job-runner] worker error:\n" + traceback.format_exc())
+
+    def _process_run(self, run: dict) -> None:
+        run_id = int(run["id"])
+        self.repo.add_run_log(run_id, "info", f"Run picked up: {run['job_type']}")
+        heartbeat_stop = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._run_heartbeat_loop,
+            name=f"run-heartbeat-{run_id}",
+            args=(run_id, heartbeat_stop),
+            daemon=True,
+        )
+        heartbeat_thread.start()
+        try:
+            result = self._execute(run_id=run_id, job_type=run["job_type"], payload=run.get("payload") or {})
+            if self.repo.is_run_canceled(run_id):
+                self.repo.add_run_log(run_id, "warn", "Run execution finished after cancellation; preserving canceled state.")
+                if self.on_run_terminal:
+                    try:
+                        self.on_run_terminal(run_id, "canceled")
+                    except Exception:
+                        print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
+            else:
+                self.repo.complete_run(run_id=run_id, result=result)
+                self.repo.add_run_log(run_id, "info", "Run completed")
+                if self.on_run_terminal:
+                    try:
+                        self.on_run_terminal(run_id, "completed")
+                    except Exception:
+                        print(f"[job-runner] on_run_terminal(completed) failed for run {run_id}")
+        except RunCanceledError:
+            self.repo.add_run_log(run_id, "warn", "Run canceled by user request.")
+            if self.on_run_terminal:
                 try:
-                    result = self._execute(run_id=run_id, job_type=run["job_type"], payload=run.get("payload") or {})
-                    if self.repo.is_run_canceled(run_id):
-                        self.repo.add_run_log(run_id, "warn", "Run execution finished after cancellation; preserving canceled state.")
-                        if self.on_run_terminal:
-                            try:
-                                self.on_run_terminal(run_id, "canceled")
-                            except Exception:
-                                print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
-                    else:
-                        self.repo.complete_run(run_id=run_id, result=result)
-                        self.repo.add_run_log(run_id, "info", "Run completed")
-                        if self.on_run_terminal:
-                            try:
-                                self.on_run_terminal(run_id, "completed")
-                            except Exception:
-                                print(f"[job-runner] on_run_terminal(completed) failed for run {run_id}")
-                except RunCanceledError:
-                    self.repo.add_run_log(run_id, "warn", "Run canceled by user request.")
-                    if self.on_run_terminal:
-                        try:
-                            self.on_run_terminal(run_id, "canceled")
-                        except Exception:
-                            print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
-                except RunPausedError as exc:
-                    reason = str(exc or "paused")
-                    self.repo.mark_run_paused(run_id=run_id, reason=reason)
-                    self.repo.add_run_log(run_id, "warn", f"Run paused by user request: {reason}")
+                    self.on_run_terminal(run_id, "canceled")
+                except Exception:
+                    print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
+        except RunPausedError as exc:
+            reason = str(exc or "paused")
+            self.repo.mark_run_paused(run_id=run_id, reason=reason)
+            self.repo.add_run_log(run_id, "warn", f"Run paused by user request: {reason}")
+            if self.on_run_terminal:
+                try:
+                    self.on_run_terminal(run_id, "paused")
+                except Exception:
+                    print(f"[job-runner] on_run_terminal(paused) failed for run {run_id}")
+        except Exception as exc:
+            if self.repo.is_run_canceled(run_id):
+                self.repo.add_run_log(run_id, "warn", "Run canceled while in progress; failure details suppressed.")
+                if self.on_run_terminal:
+                    try:
+                        self.on_run_terminal(run_id, "canceled")
+                    except Exception:
+                        print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
+            else:
+                pause_requested, pause_reason = self.repo.is_run_pause_requested(run_id)
+                if pause_requested:
+                    self.repo.mark_run_paused(run_id=run_id, reason=pause_reason)
+                    self.repo.add_run_log(run_id, "warn", f"Run paused while in progress: {pause_reason}")
                     if self.on_run_terminal:
                         try:
                             self.on_run_terminal(run_id, "paused")
                         except Exception:
                             print(f"[job-runner] on_run_terminal(paused) failed for run {run_id}")
-                except Exception as exc:
-                    if self.repo.is_run_canceled(run_id):
-                        self.repo.add_run_log(run_id, "warn", "Run canceled while in progress; failure details suppressed.")
-                        if self.on_run_terminal:
-                            try:
-                                self.on_run_terminal(run_id, "canceled")
-                            except Exception:
-                                print(f"[job-runner] on_run_terminal(canceled) failed for run {run_id}")
-                    else:
-                        pause_requested, pause_reason = self.repo.is_run_pause_requested(run_id)
-                        if pause_requested:
-                            self.repo.mark_run_paused(run_id=run_id, reason=pause_reason)
-                            self.repo.add_run_log(run_id, "warn", f"Run paused while in progress: {pause_reason}")
-                            if self.on_run_terminal:
-                                try:
-                                    self.on_run_terminal(run_id, "paused")
-                                except Exception:
-                                    print(f"[job-runner] on_run_terminal(paused) failed for run {run_id}")
-                            continue
-                        self.repo.fail_run(run_id=run_id, error=str(exc))
-                        self.repo.add_run_log(run_id, "error", f"{exc}\n{traceback.format_exc()}")
-                        if self.on_run_terminal:
-                            try:
-                                self.on_run_terminal(run_id, "failed")
-                            except Exception:
-                                print(f"[job-runner] on_run_terminal(failed) failed for run {run_id}")
-                finally:
-                    heartbeat_stop.set()
-                    heartbeat_thread.join(timeout=1.0)
-            except Exception:
-                # Keep the worker alive if queue polling fails transiently.
-                print("[job-runner] loop error:\n" + traceback.format_exc())
-                time.sleep(self.poll_seconds)
+                    return
+                self.repo.fail_run(run_id=run_id, error=str(exc))
+                self.repo.add_run_log(run_id, "error", f"{exc}\n{traceback.format_exc()}")
+                if self.on_run_terminal:
+                    try:
+                        self.on_run_terminal(run_id, "failed")
+                    except Exception:
+                        print(f"[job-runner] on_run_terminal(failed) failed for run {run_id}")
+        finally:
+            heartbeat_stop.set()
+            heartbeat_thread.join(timeout=1.0)
 
     def _run_heartbeat_loop(self, run_id: int, stop_event: threading.Event) -> None:
         while not stop_event.wait(self._heartbeat_interval_sec):
@@ -204,8 +294,7 @@ class JobRunner:
         if pause_requested:
             raise RunPausedError(pause_reason or "paused")
 
-    def _extract_uploaded_text(self, filename: str, content_b64: str) -> str:
-        raw_bytes = base64.b64decode(content_b64.encode("utf-8"))
+    def _extract_uploaded_text(self, filename: str, raw_bytes: bytes) -> str:
         lower = filename.lower()
         if lower.endswith(".pdf"):
             return document_utils.extract_text_from_pdf(raw_bytes, use_ocr=True)
@@ -213,6 +302,81 @@ class JobRunner:
             return document_utils.extract_text_from_docx(raw_bytes)
         return raw_bytes.decode("utf-8", errors="ignore")
 
+    @staticmethod
+    def _upload_file_type(filename: str) -> str:
+        lower = filename.lower()
+        if lower.endswith(".pdf"):
+            return "pdf"
+        if lower.endswith(".docx"):
+            return "docx"
+        return "text"
+
+    def _extraction_version(self, file_type: str) -> str:
+        version = _normalization_fingerprint(type(self)._normalize_extracted_text)
+        if file_type == "pdf":
+            ocr = json.dumps(
+                {"available": document_utils.PDF2IMAGE_AVAILABLE, **document_utils._ocr_settings()}, sort_keys=True
+            )
+            version += ":" + hashlib.sha256(ocr.encode("utf-8")).hexdigest()[:12]
+        return version
+
+    def _extract_normalized_text(self, run_id: int, filename: str, raw_bytes: bytes, file_sha256: str) -> str:
+        """
+        Extracted + normalized text of an upload. Served from the on-disk text cache
+        when the same bytes were extracted before (e.g. force_reparse reruns), so
+        only the LLM step is repeated. Error placeholders and low-quality PDF text
+        (OCR unavailable or failed) are not cached.
+        """
+        file_type = self._upload_file_type(filename)
+        version = self._extraction_version(file_type)
+        cached = self.text_cache.get(file_sha256, file_type, version)
+        if cached is not None:
+            self.repo.add_run_log(run_id, "info", f"Reused cached extracted text for '{filename}'.")
+            return cached
+        text = self._normalize_extracted_text(self._extract_uploaded_text(filename=filename, raw_bytes=raw_bytes))
+        cacheable = self.repo.db.has_extracted_text(text)
+        if cacheable and file_type == "pdf":
+            cacheable = document_utils.calculate_text_quality(text) >= 50
+        if cacheable:
+            self.text_cache.put(file_sha256, file_type, version, text)
+        return text
+
+    def _find_duplicate_document(self, kind: str, file_sha256: str | None = None, content_sha256: str | None = None):
+        finder = self.repo.db.find_job_by_hash if kind == "job" else self.repo.db.find_resume_by_hash
+        return finder(file_sha256=file_sha256, content_sha256=content_sha256)
+
+    def _link_duplicate_document(self, run_id: int, kind: str, duplicate: dict, filename: str, tags: list) -> dict:
+        """
+        Reuse an already ingested copy of an uploaded document (same bytes, or same
+        extracted text) instead of extracting and analyzing it again. The upload's
+        tags are added to the existing row.
+        """
+        doc_id = int(duplicate["id"])
+        clean_tags = [str(t).strip() for t in tags if str(t).strip()]
+        if clean_tags:
+            current = (self.repo.get_job(doc_id) if kind == "job" else self.repo.get_resume(doc_id)) or {}
+            merged = self.repo.db._join_tags(list(current.get("tags") or []) + clean_tags)
+            if kind == "job":
+                self.repo.db.update_job_tags(doc_id, merged)
+            else:
+                self.repo.db.update_resume_tags(doc_id, merged)
+            for t in clean_tags:
+                self.repo.add_tag(t)
+        basis = "file" if duplicate.get("matched_on") == "file_sha256" else "extracted text"
+        label = "JD" if kind == "job" else "resume"
+        self.repo.add_run_log(
+            run_id,
+            "info",
+            f"Skipped duplicate {label} '{filename}': same {basis} as '{duplicate['filename']}' (#{doc_id}).",
+        )
+        self.repo.update_run_progress(run_id, 100, "skipped duplicate")
+        return {
+            f"{kind}_id": doc_id,
+            "filename": filename,
+            "skipped": True,
+            "duplicate_of": {"id": doc_id, "filename": duplicate["filename"], "matched_on": duplicate.get("matched_on")},
+        }
+
     def _normalize_extracted_text(self, text: str) -> str:
         raw = str(text or "")
         if not raw:
@@ -345,18 +509,34 @@ class JobRunner:
                 self.repo.update_run_progress(run_id, 100, "skipped existing")
                 return {"job_id": int(existing["id"]), "filename": filename, "skipped": True}
 
+            raw_bytes = base64.b64decode(content_b64.encode("utf-8"))
+            file_sha256 = hashlib.sha256(raw_bytes).hexdigest()
+            dedupe = not existing and not force_reparse
+            duplicate = self._find_duplicate_document("job", file_sha256=file_sha256) if dedupe else None
+            if duplicate:
+                return self._link_duplicate_document(run_id, "job", duplicate, filename, tags)
+
             self._ensure_not_canceled(run_id)
-            text = self._normalize_extracted_text(self._extract_uploaded_text(filename=filename, content_b64=content_b64))
+            text = self._extract_normalized_text(run_id, filename, raw_bytes, file_sha256)
+            # content_sha256 is None for empty text and error placeholders: no lookup then.
+            content_sha256 = self.repo.db.content_sha256(text)
+            duplicate = (
+                self._find_duplicate_document("job", content_sha256=content_sha256)
+                if dedupe and content_sha256
+                else None
+            )
+            if duplicate:
+                return self._link_duplicate_document(run_id, "job", duplicate, filename, tags)
 
             self.repo.update_run_progress(run_id, 60, "analyzing job description")
             self._ensure_not_canceled(run_id)
-            criteria = self.analysis.llm.analyze_jd(text)
+            criteria = self.analysis.llm.analyze_jd(text, use_cache=not force_reparse)
             if not isinstance(criteria, dict) or criteria.get("error"):
                 raise RuntimeError(f"JD analysis failed for '{filename}': {criteria}")
 
             if existing:
                 job_id = int(existing["id"])
-                self.repo.db.update_job_content(job_id, text, criteria)
+                self.repo.db.update_job_content(job_id, text, criteria, file_sha256=file_sha256)
                 if tags:
                     self.repo.db.update_job_tags(job_id, ",".join([t for t in tags if str(t).strip()]))
                 for t in tags:
@@ -364,7 +544,9 @@ class JobRunner:
                         self.repo.add_tag(str(t).strip())
                 row = self.repo.get_job(job_id)
             else:
-                row = self.repo.add_job(filename=filename, content=text, criteria=criteria, tags=tags)
+                row = self.repo.add_job(
+                    filename=filename, content=text, criteria=criteria, tags=tags, file_sha256=file_sha256
+                )
                 for t in tags:
                     if str(t).strip():
                         self.repo.add_tag(str(t).strip())
@@ -417,18 +599,33 @@ class JobRunner:
                 self.repo.update_run_progress(run_id, 100, "skipped existing")
                 return {"resume_id": int(existing["id"]), "filename": filename, "skipped": True}
 
+            raw_bytes = base64.b64decode(content_b64.encode("utf-8"))
+            file_sha256 = hashlib.sha256(raw_bytes).hexdigest()
+            dedupe = not existing and not force_reparse
+            duplicate = self._find_duplicate_document("resume", file_sha256=file_sha256) if dedupe else None
+            if duplicate:
+                return self._link_duplicate_document(run_id, "resume", duplicate, filename, tags)
+
             self._ensure_not_canceled(run_id)
-            text = self._normalize_extracted_text(self._extract_uploaded_text(filename=filename, content_b64=content_b64))
+            text = self._extract_normalized_text(run_id, filename, raw_bytes, file_sha256)
+            content_sha256 = self.repo.db.content_sha256(text)
+            duplicate = (
+                self._find_duplicate_document("resume", content_sha256=content_sha256)
+                if dedupe and content_sha256
+                else None
+            )
+            if duplicate:
+                return self._link_duplicate_document(run_id, "resume", duplicate, filename, tags)
 
             self.repo.update_run_progress(run_id, 60, "analyzing resume")
             self._ensure_not_canceled(run_id)
-            profile = self.analysis.llm.analyze_resume(text)
+            profile = self.analysis.llm.analyze_resume(text, use_cache=not force_reparse)
             if not isinstance(profile, dict):
                 raise RuntimeError(f"Resume analysis failed for '{filename}'.")
 
             if existing:
                 resume_id = int(existing["id"])
-                self.repo.db.update_resume_content(resume_id, text, profile)
+                self.repo.db.update_resume_content(resume_id, text, profile, file_sha256=file_sha256)
                 if tags:
                     self.repo.db.update_resume_tags(resume_id, ",".join([t for t in tags if str(t).strip()]))
                 for t in tags:
@@ -436,7 +633,9 @@ class JobRunner:
                         self.repo.add_tag(str(t).strip())
                 row = self.repo.get_resume(resume_id)
             else:
-                row = self.repo.add_resume(filename=filename, content=text, profile=profile, tags=tags)
+                row = self.repo.add_resume(
+                    filename=filename, content=text, profile=profile, tags=tags, file_sha256=file_sha256
+                )
                 for t in tags:
                     if str(t).strip():
                         self.repo.add_tag(str(t).strip())
@@ -453,8 +652,19 @@ class JobRunner:
             if not filename or not content_b64:
                 raise ValueError("filename and content_b64 are required for ingest_auto_file")
 
+            raw_bytes = base64.b64decode(content_b64.encode("utf-8"))
+            file_sha256 = hashlib.sha256(raw_bytes).hexdigest()
+            if not force_reparse:
+                # The document type is only known after extraction, so look in both tables.
+                for kind in ("job", "resume"):
+                    duplicate = self._find_duplicate_document(kind, file_sha256=file_sha256)
+                    if duplicate:
+                        result = self._link_duplicate_document(run_id, kind, duplicate, filename, tags)
+                        return {"document_type": kind, **result}
+
             self._ensure_not_canceled(run_id)
-            text = self._normalize_extracted_text(self._extract_uploaded_text(filename=filename, content_b64=content_b64))
+            text = self._extract_normalized_text(run_id, filename, raw_bytes, file_sha256)
+            content_sha256 = self.repo.db.content_sha256(text)
             self.repo.update_run_progress(run_id, 35, "classifying document type")
             kind, jd_score, resume_score = self._infer_document_type(filename=filename, text=text)
             self.repo.add_run_log(
@@ -470,20 +680,29 @@ class JobRunner:
                     self.repo.add_run_log(run_id, "info", f"Skipped existing JD '{filename}' (force_reparse disabled).")
                     self.repo.update_run_progress(run_id, 100, "skipped existing")
                     return {"document_type": "job", "job_id": int(existing["id"]), "filename": filename, "skipped": True}
+                duplicate = (
+                    self._find_duplicate_document("job", content_sha256=content_sha256)
+                    if not existing and not force_reparse and content_sha256
+                    else None
+                )
+                if duplicate:
+                    return {"document_type": "job", **self._link_duplicate_document(run_id, "job", duplicate, filename, tags)}
 
                 self.repo.update_run_progress(run_id, 60, "analyzing job description")
                 self._ensure_not_canceled(run_id)
-                criteria = self.analysis.llm.analyze_jd(text)
+                criteria = self.analysis.llm.analyze_jd(text, use_cache=not force_reparse)
                 if not isinstance(criteria, dict) or criteria.get("error"):
                     raise RuntimeError(f"JD analysis failed for '{filename}': {criteria}")
                 if existing:
                     job_id = int(existing["id"])
-                    self.repo.db.update_job_content(job_id, text, criteria)
+                    self.repo.db.update_job_content(job_id, text, criteria, file_sha256=file_sha256)
                     if tags:
                         self.repo.db.update_job_tags(job_id, ",".join([t for t in tags if str(t).strip()]))
                     row = self.repo.get_job(job_id)
                 else:
-                    row = self.repo.add_job(filename=filename, content=text, criteria=criteria, tags=tags)
+                    row = self.repo.add_job(
+                        filename=filename, content=text, criteria=criteria, tags=tags, file_sha256=file_sha256
+                    )
                 for t in tags:
                     if str(t).strip():
                         self.repo.add_tag(str(t).strip())
@@ -495,20 +714,29 @@ class JobRunner:
                 self.repo.add_run_log(run_id, "info", f"Skipped existing resume '{filename}' (force_reparse disabled).")
                 self.repo.update_run_progress(run_id, 100, "skipped existing")
                 return {"document_type": "resume", "resume_id": int(existing["id"]), "filename": filename, "skipped": True}
+            duplicate = (
+                self._find_duplicate_document("resume", content_sha256=content_sha256)
+                if not existing and not force_reparse and content_sha256
+                else None
+            )
+            if duplicate:
+                return {"document_type": "resume", **self._link_duplicate_document(run_id, "resume", duplicate, filename, tags)}
 
             self.repo.update_run_progress(run_id, 60, "analyzing resume")
             self._ensure_not_canceled(run_id)
-            profile = self.analysis.llm.analyze_resume(text)
+            profile = self.analysis.llm.analyze_resume(text, use_cache=not force_reparse)
             if not isinstance(profile, dict):
                 raise RuntimeError(f"Resume analysis failed for '{filename}'.")
             if existing:
                 resume_id = int(existing["id"])
-                self.repo.db.update_resume_content(resume_id, text, profile)
+                self.repo.db.update_resume_content(resume_id, text, profile, file_sha256=file_sha256)
                 if tags:
                     self.repo.db.update_resume_tags(resume_id, ",".join([t for t in tags if str(t).strip()]))
                 row = self.repo.get_resume(resume_id)
             else:
-                row = self.repo.add_resume(filename=filename, content=text, profile=profile, tags=tags)
+                row = self.repo.add_resume(
+                    filename=filename, content=text, profile=profile, tags=tags, file_sha256=file_sha256
+                )
             for t in tags:
                 if str(t).strip():
                     self.repo.add_tag(str(t).strip())
@@ -527,7 +755,8 @@ class JobRunner:
             normalized_text = self._normalize_extracted_text(str(existing.get("content") or ""))
             self.repo.update_run_progress(run_id, 60, "reanalyzing job description")
             self._ensure_not_canceled(run_id)
-            criteria = self.analysis.llm.analyze_jd(normalized_text)
+            # Reprocessing is an explicit request to ask the model again; never replay a cached answer.
+            criteria = self.analysis.llm.analyze_jd(normalized_text, use_cache=False)
             if not isinstance(criteria, dict) or criteria.get("error"):
                 raise RuntimeError(f"JD analysis failed for '{existing.get('filename', '')}': {criteria}")
             self.repo.db.update_job_content(job_id, normalized_text, criteria)
@@ -551,7 +780,7 @@ class JobRunner:
             normalized_text = self._normalize_extracted_text(str(existing.get("content") or ""))
             self.repo.update_run_progress(run_id, 60, "reanalyzing resume")
             self._ensure_not_canceled(run_id)
-            profile = self.analysis.llm.analyze_resume(normalized_text)
+            profile = self.analysis.llm.analyze_resume(normalized_text, use_cache=False)
             if not isinstance(profile, dict):
                 raise RuntimeError(f"Resume analysis failed for '{existing.get('filename', '')}'.")
             self.repo.db.update_resume_content(resume_id, normalized_text, profile)
@@ -579,6 +808,7 @@ class JobRunner:
             ai_concurrency = max(1, int(payload.get("ai_concurrency", 1) or 1))
             deep_resume_from = int(payload.get("deep_resume_from", 0) or 0)
             deep_partial_details = payload.get("deep_partial_details") or []
+            pass1_batch_size = max(1, int(payload.get("pass1_batch_size", 1) or 1))
 
             self.repo.add_run_log(
                 run_id,
@@ -661,6 +891,8 @@ class JobRunner:
                     details=details,
                 ),
                 debug_run_id=run_id,
+                pass1_batch_size=pass1_batch_size,
+                batch_id=int(payload.get("batch_id") or 0) or None,
             )
             if predicted_reuse and existing_before and int(row["id"]) == int(existing_before["id"]):
                 self.repo.add_run_log(
@@ -749,6 +981,8 @@ class JobRunner:
                     "ai_concurrency": max(1, int(payload.get("ai_concurrency", 1) or 1)),
                     "batch_group_key": batch_key,
                     "deep_wave_from_cap": True,
+                    # Deep-wave runs count toward the parent matrix batch.
+                    "batch_id": payload.get("batch_id"),
                 }
                 queued_ids.append(int(self.repo.enqueue_run(job_type="score_match", payload=run_payload)))
             self.repo.add_run_log(
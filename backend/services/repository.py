@@ -1,11 +1,13 @@
 import json
+import math
+import threading
 import datetime as dt
-from dataclasses import dataclass
-
-import pandas as pd
+from dataclasses import dataclass, field
 
 from database import DBManager
 
+from .run_events import RunEventBus
+
 
 def _parse_tags(raw_tags: str | None) -> list[str]:
     if not raw_tags:
@@ -36,11 +38,8 @@ def _candidate_name_from_profile(profile_raw, fallback_name: str | None = None,
 def _as_int(value, default: int = 0, nullable: bool = False):
     if value is None:
         return None if nullable else default
-    try:
-        if pd.isna(value):
-            return None if nullable else default
-    except Exception:
-        pass
+    if isinstance(value, float) and math.isnan(value):
+        return None if nullable else default
     try:
         if isinstance(value, (bytes, bytearray)):
             b = bytes(value)
@@ -56,77 +55,123 @@ def _as_int(value, default: int = 0, nullable: bool = False):
         return None if nullable else default
 
 
+class RunQueueSignal:
+    """
+    In-process wake-up for idle queue workers.
+
+    Every notify() leaves a wake token so a worker that checks the queue just
+    before a run is enqueued still wakes up for it. Tokens are capped so a burst
+    of notifications cannot make idle workers spin on empty claims.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._waiters = 0
+        self.max_pending = max(1, int(max_pending))
+
+    def notify(self, n: int = 1) -> None:
+        with self._cond:
+            self._pending = min(self.max_pending, self._pending + max(1, int(n)))
+            self._cond.notify(n)
+
+    def notify_all(self) -> None:
+        with self._cond:
+            self._pending = min(self.max_pending, max(self._pending, self._waiters, 1))
+            self._cond.notify_all()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until woken or *timeout* elapses. Returns True when a wake token was consumed."""
+        with self._cond:
+            if self._pending <= 0:
+                self._waiters += 1
+                try:
+                    self._cond.wait(timeout)
+                finally:
+                    self._waiters -= 1
+            if self._pending > 0:
+                self._pending -= 1
+                return True
+            return False
+
+
 @dataclass
 class Repository:
     db: DBManager
+    queue_signal: RunQueueSignal = field(default_factory=RunQueueSignal)
+    events: RunEventBus = field(default_factory=RunEventBus)
 
     def list_jobs(self) -> list[dict]:
-        df = self.db.fetch_dataframe(
+        rows = self.db.fetch_all(
             "SELECT id, filename, tags, upload_date FROM jobs ORDER BY id DESC"
         )
         return [
             {
                 "id": int(row["id"]),
                 "filename": row["filename"],
-                "tags": _parse_tags(row.get("tags")),
-                "upload_date": row.get("upload_date"),
+                "tags": _parse_tags(row["tags"]),
+                "upload_date": row["upload_date"],
             }
-            for _, row in df.iterrows()
+            for row in rows
         ]
 
     def list_resumes(self) -> list[dict]:
-        df = self.db.fetch_dataframe(
+        rows = self.db.fetch_all(
             "SELECT id, filename, tags, upload_date FROM resumes ORDER BY id DESC"
         )
         return [
             {
                 "id": int(row["id"]),
                 "filename": row["filename"],
-                "tags": _parse_tags(row.get("tags")),
-                "upload_date": row.get("upload_date"),
+                "tags": _parse_tags(row["tags"]),
+                "upload_date": row["upload_date"],
             }
-            for _, row in df.iterrows()
+            for row in rows
         ]
 
     def get_job(self, job_id: int) -> dict | None:
-        df = self.db.fetch_dataframe(
-            f"SELECT id, filename, content, criteria, tags, upload_date FROM jobs WHERE id = {int(job_id)} LIMIT 1"
+        row = self.db.fetch_one(
+            "SELECT id, filename, content, criteria, tags, upload_date FROM jobs WHERE id = ? LIMIT 1",
+            (int(job_id),),
         )
-        if df.empty:
+        if row is None:
             return None
-        row = df.iloc[0]
         return {
             "id": int(row["id"]),
             "filename": row["filename"],
             "content": row["content"],
             "criteria": row["criteria"],
-            "tags": _parse_tags(row.get("tags")),
-            "upload_date": row.get("upload_date"),
+            "tags": _parse_tags(row["tags"]),
+            "upload_date": row["upload_date"],
         }
 
     def get_resume(self, resume_id: int) -> dict | None:
-        df = self.db.fetch_dataframe(
-            f"SELECT id, filename, content, profile, tags, upload_date FROM resumes WHERE id = {int(resume_id)} LIMIT 1"
+        row = self.db.fetch_one(
+            "SELECT id, filename, content, profile, tags, upload_date FROM resumes WHERE id = ? LIMIT 1",
+            (int(resume_id),),
         )
-        if df.empty:
+        if row is None:
             return None
-        row = df.iloc[0]
         return {
             "id": int(row["id"]),
             "filename": row["filename"],
             "content": row["content"],
             "profile": row["profile"],
-            "tags": _parse_tags(row.get("tags")),
-            "upload_date": row.get("upload_date"),
+            "tags": _parse_tags(row["tags"]),
+            "upload_date": row["upload_date"],
         }
 
-    def add_job(self, filename: str, content: str, criteria: dict, tags: list[str]) -> dict:
-        self.db.add_job(filename, content, criteria, tags=self.db._join_tags(tags))
+    def add_job(
+        self, filename: str, content: str, criteria: dict, tags: list[str], file_sha256: str | None = None
+    ) -> dict:
+        self.db.add_job(filename, content, criteria, tags=self.db._join_tags(tags), file_sha256=file_sha256)
         created = self.db.get_job_by_filename(filename)
         return self.get_job(int(created["id"])) if created else {}
 
-    def add_resume(self, filename: str, content: str, profile: dict, tags: list[str]) -> dict:
-        self.db.add_resume(filename, content, profile, tags=self.db._join_tags(tags))
+    def add_resume(
+        self, filename: str, content: str, profile: dict, tags: list[str], file_sha256: str | None = None
+    ) -> dict:
+        self.db.add_resume(filename, content, profile, tags=self.db._join_tags(tags), file_sha256=file_sha256)
         created = self.db.get_resume_by_filename(filename)
         return self.get_resume(int(created["id"])) if created else {}
 
@@ -143,15 +188,16 @@ class Repository:
         return int(self.db.count_legacy_run_deep_matches_for_job(run_id=run_id, job_id=job_id))
 
     def count_legacy_run_matches_for_job(self, run_id: int, job_id: int) -> int:
-        df = self.db.fetch_dataframe(
+        row = self.db.fetch_one(
             "SELECT COUNT(*) AS c "
             "FROM run_matches rm "
             "JOIN matches m ON m.id = rm.match_id "
-            f"WHERE rm.run_id = {int(run_id)} AND m.job_id = {int(job_id)}"
+            "WHERE rm.run_id = ? AND m.job_id = ?",
+            (int(run_id), int(job_id)),
         )
-        if df.empty:
+        if row is None:
             return 0
-        return int(df.iloc[0]["c"] or 0)
+        return int(row["c"] or 0)
 
     def save_match(
         self,
@@ -176,28 +222,28 @@ class Repository:
         )
 
     def get_match(self, match_id: int) -> dict | None:
-        df = self.db.fetch_dataframe(
+        row = self.db.fetch_one(
             "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, "
             "m.decision, m.reasoning, m.standard_reasoning, m.missing_skills, m.match_details, m.strategy, "
             "r.profile AS resume_profile, r.filename AS resume_name "
             "FROM matches m "
             "LEFT JOIN resumes r ON r.id = m.resume_id "
-            f"WHERE m.id = {int(match_id)} LIMIT 1"
+            "WHERE m.id = ? LIMIT 1",
+            (int(match_id),),
         )
-        if df.empty:
+        if row is None:
             return None
-        row = df.iloc[0]
         return {
             "id": int(row["id"]),
             "job_id": int(row["job_id"]),
             "resume_id": int(row["resume_id"]),
             "candidate_name": _candidate_name_from_profile(
-                row.get("resume_profile"),
-                row.get("candidate_name"),
-                row.get("resume_name"),
+                row["resume_profile"],
+                row["candidate_name"],
+                row["resume_name"],
             ),
-            "match_score": _as_int(row.get("match_score"), default=0),
-            "standard_score": _as_int(row.get("standard_score"), nullable=True),
+            "match_score": _as_int(row["match_score"], default=0),
+            "standard_score": _as_int(row["standard_score"], nullable=True),
             "decision": row["decision"] or "",
             "reasoning": row["reasoning"] or "",
             "standard_reasoning": row["standard_reasoning"] or "",
@@ -209,6 +255,25 @@ class Repository:
     def get_existing_match(self, job_id: int, resume_id: int) -> dict | None:
         return self.db.get_match_if_exists(job_id, resume_id)
 
+    def get_requirement_evidence(
+        self, resume_hash: str, model: str, keys: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        return self.db.get_requirement_evidence(resume_hash, model, keys)
+
+    def save_requirement_evidence(self, resume_hash: str, model: str, rows: list[tuple[str, str, str, str]]) -> int:
+        return int(self.db.save_requirement_evidence(resume_hash, model, rows))
+
+    def list_queued_batch_resume_ids(
+        self, batch_id: int, job_id: int, limit: int, exclude_resume_ids: list[int] | tuple = ()
+    ) -> list[int]:
+        return self.db.list_queued_batch_resume_ids(batch_id, job_id, limit, exclude_resume_ids)
+
+    def save_pass1_handoffs(self, batch_id: int, rows: list[tuple[int, int, str, str, str, dict]]) -> int:
+        return int(self.db.save_pass1_handoffs(batch_id, rows))
+
+    def pop_pass1_handoff(self, batch_id: int, criteria_hash: str, resume_hash: str, model: str) -> dict | None:
+        return self.db.pop_pass1_handoff(batch_id, criteria_hash, resume_hash, model)
+
     def list_tags(self) -> list[str]:
         return self.db.list_tags()
 
@@ -265,6 +330,9 @@ class Repository:
         self.db.execute_query("DELETE FROM run_matches")
         self.db.execute_query("DELETE FROM job_run_logs")
         self.db.execute_query("DELETE FROM job_runs")
+        self.db.execute_query("DELETE FROM job_batches")
+        self.db.execute_query("DELETE FROM requirement_evidence")
+        self.db.execute_query("DELETE FROM pass1_handoff")
         self.db.execute_query("DELETE FROM jobs")
         self.db.execute_query("DELETE FROM resumes")
 
@@ -275,34 +343,61 @@ class Repository:
         self.db.execute_query("DELETE FROM runs")
         self.db.execute_query("DELETE FROM job_run_logs")
         self.db.execute_query("DELETE FROM job_runs")
+        self.db.execute_query("DELETE FROM job_batches")
+        self.db.execute_query("DELETE FROM requirement_evidence")
+        self.db.execute_query("DELETE FROM pass1_handoff")
+
+    def list_deep_scan_samples(self, limit: int = 50) -> list[tuple[str, list]]:
+        """[(resume content, match_details), ...] from the newest Deep matches."""
+        result = self.db.fetch_all(
+            "SELECT r.content, m.match_details FROM matches m "
+            "JOIN resumes r ON r.id = m.resume_id "
+            "WHERE m.strategy = 'Deep' AND m.match_details IS NOT NULL "
+            "ORDER BY m.id DESC LIMIT ?",
+            (int(limit),),
+        )
+        samples = []
+        for row in result:
+            try:
+                details = json.loads(row["match_details"] or "[]")
+            except Exception:
+                continue
+            if isinstance(details, list) and details:
+                samples.append((str(row["content"] or ""), details))
+        return samples
 
     def list_matches(self, limit: int = 200) -> list[dict]:
-        df = self.db.fetch_dataframe(
+        result = self.db.fetch_all(
             "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, m.standard_reasoning, "
             "m.strategy, m.decision, m.reasoning, "
             "r.profile AS resume_profile, r.filename AS resume_name "
             "FROM matches m "
-            "JOIN (SELECT MAX(id) AS id FROM matches GROUP BY job_id, resume_id) latest ON latest.id = m.id "
             "LEFT JOIN resumes r ON r.id = m.resume_id "
-            "ORDER BY m.id DESC LIMIT "
-            f"{int(limit)}"
+            # Latest row per (job, resume): walks ids newest-first and stops at LIMIT
+            # instead of grouping the whole table.
+            "WHERE NOT EXISTS ("
+            "SELECT 1 FROM matches newer "
+            "WHERE newer.job_id = m.job_id AND newer.resume_id = m.resume_id AND newer.id > m.id"
+            ") "
+            "ORDER BY m.id DESC LIMIT ?",
+            (int(limit),),
         )
         rows = []
-        for _, row in df.iterrows():
+        for row in result:
             rows.append(
                 {
                     "id": int(row["id"]),
                     "job_id": int(row["job_id"]),
                     "resume_id": int(row["resume_id"]),
                     "candidate_name": _candidate_name_from_profile(
-                        row.get("resume_profile"),
-                        row.get("candidate_name"),
-                        row.get("resume_name"),
+                        row["resume_profile"],
+                        row["candidate_name"],
+                        row["resume_name"],
                     ),
-                    "resume_name": row.get("resume_name") or "",
-                    "match_score": _as_int(row.get("match_score"), default=0),
-                    "standard_score": _as_int(row.get("standard_score"), nullable=True),
-                    "standard_reasoning": row.get("standard_reasoning") or "",
+                    "resume_name": row["resume_name"] or "",
+                    "match_score": _as_int(row["match_score"], default=0),
+                    "standard_score": _as_int(row["standard_score"], nullable=True),
+                    "standard_reasoning": row["standard_reasoning"] or "",
                     "strategy": row["strategy"] or "Standard",
                     "decision": row["decision"] or "",
                     "reasoning": row["reasoning"] or "",
@@ -317,28 +412,28 @@ class Repository:
         return self.db.delete_matches_by_pair(job_id=job_id, resume_id=resume_id)
 
     def get_match_summary(self, match_id: int) -> dict | None:
-        df = self.db.fetch_dataframe(
+        row = self.db.fetch_one(
             "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, m.decision, "
             "m.reasoning, m.standard_reasoning, m.strategy, m.match_details, m.missing_skills, "
             "r.profile AS resume_profile, r.filename AS resume_name "
             "FROM matches m "
             "LEFT JOIN resumes r ON r.id = m.resume_id "
-            f"WHERE m.id = {int(match_id)} LIMIT 1"
+            "WHERE m.id = ? LIMIT 1",
+            (int(match_id),),
         )
-        if df.empty:
+        if row is None:
             return None
-        row = df.iloc[0]
         return {
             "id": int(row["id"]),
             "job_id": int(row["job_id"]),
             "resume_id": int(row["resume_id"]),
             "candidate_name": _candidate_name_from_profile(
-                row.get("resume_profile"),
-                row.get("candidate_name"),
-                row.get("resume_name"),
+                row["resume_profile"],
+                row["candidate_name"],
+                row["resume_name"],
             ),
-            "match_score": _as_int(row.get("match_score"), default=0),
-            "standard_score": _as_int(row.get("standard_score"), nullable=True),
+            "match_score": _as_int(row["match_score"], default=0),
+            "standard_score": _as_int(row["standard_score"], nullable=True),
             "decision": row["decision"] or "",
             "reasoning": row["reasoning"] or "",
             "standard_reasoning": row["standard_reasoning"] or "",
@@ -348,12 +443,12 @@ class Repository:
         }
 
     def list_legacy_runs(self, limit: int = 100) -> list[dict]:
-        df = self.db.fetch_dataframe(
-            "SELECT id, name, threshold, created_at FROM runs ORDER BY id DESC LIMIT "
-            f"{int(limit)}"
+        result = self.db.fetch_all(
+            "SELECT id, name, threshold, created_at FROM runs ORDER BY id DESC LIMIT ?",
+            (int(limit),),
         )
         rows = []
-        for _, row in df.iterrows():
+        for row in result:
             rows.append(
                 {
                     "id": int(row["id"]),
@@ -365,18 +460,19 @@ class Repository:
         return rows
 
     def list_legacy_run_results(self, run_id: int) -> list[dict]:
-        df = self.db.fetch_dataframe(
+        result = self.db.iterate(
             "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, m.standard_reasoning, m.decision, m.reasoning, "
             "m.strategy, j.filename AS job_name, r.filename AS resume_name, r.profile AS resume_profile "
             "FROM matches m "
             "JOIN run_matches rm ON rm.match_id = m.id "
             "JOIN jobs j ON j.id = m.job_id "
             "JOIN resumes r ON r.id = m.resume_id "
-            f"WHERE rm.run_id = {int(run_id)} "
-            "ORDER BY m.match_score DESC"
+            "WHERE rm.run_id = ? "
+            "ORDER BY m.match_score DESC",
+            (int(run_id),),
         )
         rows = []
-        for _, row in df.iterrows():
+        for row in result:
             rows.append(
                 {
                     "id": int(row["id"]),
@@ -385,13 +481,13 @@ class Repository:
                     "job_name": row["job_name"] or "",
                     "resume_name": row["resume_name"] or "",
                     "candidate_name": _candidate_name_from_profile(
-                        row.get("resume_profile"),
-                        row.get("candidate_name"),
-                        row.get("resume_name"),
+                        row["resume_profile"],
+                        row["candidate_name"],
+                        row["resume_name"],
                     ),
-                    "match_score": _as_int(row.get("match_score"), default=0),
-                    "standard_score": _as_int(row.get("standard_score"), nullable=True),
-                    "standard_reasoning": row.get("standard_reasoning") or "",
+                    "match_score": _as_int(row["match_score"], default=0),
+                    "standard_score": _as_int(row["standard_score"], nullable=True),
+                    "standard_reasoning": row["standard_reasoning"] or "",
                     "decision": row["decision"] or "",
                     "reasoning": row["reasoning"] or "",
                     "strategy": row["strategy"] or "Standard",
@@ -400,10 +496,32 @@ class Repository:
         return rows
 
     def enqueue_run(self, job_type: str, payload: dict) -> int:
-        return int(self.db.enqueue_job_run(job_type, payload))
+        run_id = int(self.db.enqueue_job_run(job_type, payload))
+        self.queue_signal.notify()
+        self.events.publish_run(run_id, "queued", job_type=job_type)
+        return run_id
+
+    def enqueue_run_batch(self, job_type: str, payloads: list[dict], label: str | None = None) -> tuple[int, list[int]]:
+        batch_id, run_ids = self.db.enqueue_job_run_batch(job_type, payloads, label=label)
+        if run_ids:
+            self.queue_signal.notify(len(run_ids))
+        # One event for the whole batch; clients refresh their run list once.
+        self.events.publish("batch", {"batch_id": int(batch_id), "status": "queued", "queued": len(run_ids)})
+        return int(batch_id), [int(rid) for rid in run_ids]
 
     def recover_queue_after_restart(self) -> dict:
-        return dict(self.db.recover_running_runs_after_restart() or {})
+        out = dict(self.db.recover_running_runs_after_restart() or {})
+        self.queue_signal.notify_all()
+        return out
+
+    def normalize_queue(self, max_running: int = 1) -> int:
+        fixed = int((self.db.normalize_active_queue(max_running=max_running) or {}).get("fixed") or 0)
+        if fixed:
+            self.queue_signal.notify_all()
+        return fixed
+
+    def queue_normalization_stats(self) -> dict:
+        return self.db.queue_normalization_stats()
 
     def list_runs(self, limit: int = 100) -> list[dict]:
         rows = self.db.list_job_runs(limit=limit, include_all_active=True)
@@ -430,6 +548,74 @@ class Repository:
             row["is_stuck"] = delta >= stale_after_sec
         return rows
 
+    def get_batch(self, batch_id: int) -> dict | None:
+        row = self.db.get_job_batch(batch_id)
+        if not row:
+            return None
+        counts = {
+            key: _as_int(row[key])
+            for key in (
+                "total_runs",
+                "queued_runs",
+                "running_runs",
+                "paused_runs",
+                "completed_runs",
+                "failed_runs",
+                "canceled_runs",
+                "skipped_runs",
+            )
+        }
+        done = counts["completed_runs"] + counts["failed_runs"] + counts["canceled_runs"]
+        remaining = counts["queued_runs"] + counts["running_runs"] + counts["paused_runs"]
+        if remaining == 0:
+            status = "completed"
+        elif counts["paused_runs"] and not counts["running_runs"]:
+            status = "paused"
+        elif row["started_at"]:
+            status = "running"
+        else:
+            status = "queued"
+
+        elapsed_sec = 0.0
+        try:
+            if row["started_at"]:
+                start = dt.datetime.fromisoformat(str(row["started_at"]))
+                end = dt.datetime.now()
+                if remaining == 0 and row["last_finished_at"]:
+                    end = dt.datetime.fromisoformat(str(row["last_finished_at"]))
+                elapsed_sec = max(0.0, (end - start).total_seconds())
+        except Exception:
+            elapsed_sec = 0.0
+        per_sec = (done / elapsed_sec) if done and elapsed_sec > 0 else 0.0
+        eta_seconds = None
+        if remaining == 0:
+            eta_seconds = 0
+        elif per_sec > 0:
+            eta_seconds = int(round(remaining / per_sec))
+
+        return {
+            "id": int(row["id"]),
+            "label": row["label"],
+            "job_type": row["job_type"],
+            "status": status,
+            "total": counts["total_runs"],
+            "queued": counts["queued_runs"],
+            "running": counts["running_runs"],
+            "paused": counts["paused_runs"],
+            "completed": counts["completed_runs"],
+            "failed": counts["failed_runs"],
+            "canceled": counts["canceled_runs"],
+            "skipped": counts["skipped_runs"],
+            "done": done,
+            "progress": int(round(100 * done / counts["total_runs"])) if counts["total_runs"] else 0,
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "last_finished_at": row["last_finished_at"],
+            "elapsed_seconds": int(round(elapsed_sec)),
+            "throughput_per_min": round(per_sec * 60.0, 2),
+            "eta_seconds": eta_seconds,
+        }
+
     def get_run(self, run_id: int) -> dict | None:
         row = self.db.get_job_run(run_id)
         if not row:
@@ -473,10 +659,18 @@ class Repository:
         return 300
 
     def claim_next_run(self, max_running: int = 1) -> dict | None:
-        return self.db.claim_next_job_run(max_running=max_running)
+        runs = self.claim_next_runs(limit=1, max_running=max_running)
+        return runs[0] if runs else None
+
+    def claim_next_runs(self, limit: int, max_running: int = 1) -> list[dict]:
+        runs = list(self.db.claim_next_job_runs(limit=limit, max_running=max_running) or [])
+        for run in runs:
+            self.events.publish_run(run["id"], "running", progress=run.get("progress"), current_step=run.get("current_step"))
+        return runs
 
     def update_run_progress(self, run_id: int, progress: int, current_step: str) -> None:
         self.db.update_job_run_progress(run_id=run_id, progress=progress, current_step=current_step)
+        self.events.publish_run(run_id, progress=int(progress), current_step=current_step)
 
     def update_run_payload(self, run_id: int, payload: dict) -> None:
         self.db.update_job_run_payload(run_id=run_id, payload=payload)
@@ -486,21 +680,42 @@ class Repository:
 
     def checkpoint_run(self, run_id: int, payload: dict, result: dict, progress: int, current_step: str) -> None:
         self.db.checkpoint_job_run(run_id=run_id, payload=payload, result=result, progress=progress, current_step=current_step)
+        self.events.publish_run(run_id, progress=int(progress), current_step=current_step)
 
     def complete_run(self, run_id: int, result: dict) -> None:
         self.db.complete_job_run(run_id=run_id, result=result)
+        # A running slot was freed.
+        self.queue_signal.notify()
+        self.events.publish_run(run_id, "completed", progress=100)
 
     def fail_run(self, run_id: int, error: str) -> None:
         self.db.fail_job_run(run_id=run_id, error_message=error)
+        self.queue_signal.notify()
+        self.events.publish_run(run_id, "failed", error=str(error))
 
     def cancel_run(self, run_id: int, reason: str = "canceled", clean: bool = True) -> bool:
-        return bool(self.db.cancel_job_run(run_id=run_id, reason=reason, clean=clean))
+        ok = bool(self.db.cancel_job_run(run_id=run_id, reason=reason, clean=clean))
+        if ok:
+            self.queue_signal.notify()
+            self.events.publish_run(run_id, "canceled")
+        return ok
 
     def pause_run(self, run_id: int, reason: str = "paused") -> dict:
-        return dict(self.db.pause_job_run(run_id=run_id, reason=reason) or {})
+        out = dict(self.db.pause_job_run(run_id=run_id, reason=reason) or {})
+        if out.get("ok"):
+            state = str(out.get("state") or "")
+            if state == "pause_requested":
+                self.events.publish_run(run_id, "running", current_step="pause_requested", pause_requested=True)
+            else:
+                self.events.publish_run(run_id, state)
+        return out
 
     def mark_run_paused(self, run_id: int, reason: str = "paused") -> bool:
-        return bool(self.db.mark_job_run_paused(run_id=run_id, reason=reason))
+        ok = bool(self.db.mark_job_run_paused(run_id=run_id, reason=reason))
+        if ok:
+            self.queue_signal.notify()
+            self.events.publish_run(run_id, "paused")
+        return ok
 
     def is_run_canceled(self, run_id: int) -> bool:
         row = self.get_run(run_id)
@@ -520,10 +735,17 @@ class Repository:
         return wanted, reason
 
     def requeue_run(self, run_id: int, payload: dict | None = None, current_step: str = "requeued") -> bool:
-        return bool(self.db.requeue_job_run(run_id=run_id, payload=payload, current_step=current_step))
+        ok = bool(self.db.requeue_job_run(run_id=run_id, payload=payload, current_step=current_step))
+        if ok:
+            self.queue_signal.notify()
+            self.events.publish_run(run_id, "queued", current_step=current_step)
+        return ok
 
     def add_run_log(self, run_id: int, level: str, message: str) -> int:
-        return self.db.append_job_run_log(run_id=run_id, level=level, message=message)
+        created_at = dt.datetime.now().isoformat()
+        log_id = self.db.append_job_run_log(run_id=run_id, level=level, message=message, created_at=created_at)
+        self.events.publish_log(log_id, run_id, level, message, created_at=created_at)
+        return log_id
 
     def try_set_group_flag(self, flag_key: str) -> bool:
         return bool(self.db.try_set_group_flag(flag_key))
@@ -531,9 +753,29 @@ class Repository:
     def has_group_flag(self, flag_key: str) -> bool:
         return bool(self.db.has_group_flag(flag_key))
 
-    def list_run_logs(self, run_id: int, limit: int = 500) -> list[dict]:
+    def list_run_logs(
+        self,
+        run_id: int,
+        limit: int = 500,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[dict]:
+        rows = self.db.list_job_run_logs(run_id=run_id, limit=limit, after_id=after_id, before_id=before_id)
+        if after_id is not None:
+            return rows
         # Return ascending timeline for UI readability.
-        return list(reversed(self.db.list_job_run_logs(run_id=run_id, limit=limit)))
+        return list(reversed(rows))
+
+    def table_counts(self) -> dict[str, int]:
+        # One round trip instead of a query per table.
+        row = self.db.fetch_one(
+            "SELECT (SELECT COUNT(*) FROM jobs) AS jobs, "
+            "(SELECT COUNT(*) FROM resumes) AS resumes, "
+            "(SELECT COUNT(*) FROM matches) AS matches, "
+            "(SELECT COUNT(*) FROM job_runs) AS job_runs, "
+            "(SELECT COUNT(*) FROM runs) AS runs"
+        )
+        return {key: int(row[key] or 0) for key in row.keys()}
 
     def dashboard_snapshot(self) -> dict:
         jobs = self.list_jobs()
@@ -544,11 +786,12 @@ class Repository:
         queued = sum(1 for r in runs if r.get("status") == "queued")
         failed = sum(1 for r in runs if r.get("status") == "failed")
 
-        jobs_total = int(self.db.fetch_dataframe("SELECT COUNT(*) AS c FROM jobs").iloc[0]["c"])
-        resumes_total = int(self.db.fetch_dataframe("SELECT COUNT(*) AS c FROM resumes").iloc[0]["c"])
-        matches_total = int(self.db.fetch_dataframe("SELECT COUNT(*) AS c FROM matches").iloc[0]["c"])
-        bg_runs_total = int(self.db.fetch_dataframe("SELECT COUNT(*) AS c FROM job_runs").iloc[0]["c"])
-        legacy_runs_total = int(self.db.fetch_dataframe("SELECT COUNT(*) AS c FROM runs").iloc[0]["c"])
+        totals = self.table_counts()
+        jobs_total = totals["jobs"]
+        resumes_total = totals["resumes"]
+        matches_total = totals["matches"]
+        bg_runs_total = totals["job_runs"]
+        legacy_runs_total = totals["runs"]
 
         return {
             "counts": {
@@ -0,0 +1,140 @@
+import asyncio
+import datetime as dt
+import json
+import os
+import threading
+from collections import deque
+
+
+class RunEventSubscription:
+    """
+    One live listener (an SSE connection). Events are published from worker
+    threads and delivered into the subscriber's asyncio loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_buffer: int, log_run_id: int | None = None):
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, int(max_buffer)))
+        self.log_run_id = log_run_id
+        self.overflowed = False
+        self.closed = False
+
+    def wants(self, event: dict) -> bool:
+        if event["type"] == "log" and self.log_run_id is not None:
+            return int(event["data"].get("run_id") or 0) == self.log_run_id
+        return True
+
+    def push(self, event: dict) -> None:
+        if self.closed or not self.wants(event):
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Subscriber loop already closed.
+            self.closed = True
+
+    def _put(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop buffered events and ask it to resync from the REST endpoints.
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> dict | None:
+        if self.overflowed:
+            self.overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return {"id": None, "type": "resync", "data": {}}
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RunEventBus:
+    """
+    In-process fan-out of run state transitions and run log lines.
+
+    Publishing is cheap when nobody listens (lock + ring-buffer append). The ring
+    buffer lets a reconnecting client replay what it missed via Last-Event-ID.
+    """
+
+    def __init__(self, history_size: int | None = None, subscriber_buffer: int | None = None):
+        self.history_size = max(1, int(history_size or os.getenv("RESUME_MATCHER_EVENT_HISTORY", "2000") or 2000))
+        self.subscriber_buffer = max(
+            1, int(subscriber_buffer or os.getenv("RESUME_MATCHER_EVENT_BUFFER", "1000") or 1000)
+        )
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: deque = deque(maxlen=self.history_size)
+        self._subscribers: set[RunEventSubscription] = set()
+
+    def publish(self, event_type: str, data: dict) -> dict:
+        with self._lock:
+            self._seq += 1
+            event = {"id": self._seq, "type": str(event_type), "data": dict(data or {})}
+            self._history.append(event)
+            for sub in list(self._subscribers):
+                sub.push(event)
+        return event
+
+    def subscribe(
+        self,
+        last_event_id: int | None = None,
+        log_run_id: int | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> RunEventSubscription:
+        sub = RunEventSubscription(
+            loop or asyncio.get_running_loop(), max_buffer=self.subscriber_buffer, log_run_id=log_run_id
+        )
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else self._seq + 1
+                if int(last_event_id) + 1 < oldest:
+                    # Missed events already fell out of the ring buffer.
+                    sub.overflowed = True
+                else:
+                    for event in self._history:
+                        if event["id"] > int(last_event_id):
+                            sub.push(event)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: RunEventSubscription) -> None:
+        sub.closed = True
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # --- Typed helpers used by Repository ---
+    def publish_run(self, run_id: int, status: str | None = None, **fields) -> dict:
+        data = {"run_id": int(run_id)}
+        if status is not None:
+            data["status"] = str(status)
+        data.update({k: v for k, v in fields.items() if v is not None})
+        return self.publish("run", data)
+
+    def publish_log(self, log_id: int, run_id: int, level: str, message: str, created_at: str | None = None) -> dict:
+        return self.publish(
+            "log",
+            {
+                "id": int(log_id),
+                "run_id": int(run_id),
+                "level": str(level),
+                "message": str(message),
+                "created_at": created_at or dt.datetime.now().isoformat(),
+            },
+        )
+
+
+def format_sse(event: dict) -> str:
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event.get('data') or {}, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
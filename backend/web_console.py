@@ -936,7 +936,7 @@ def render_console() -> HTMLResponse:
             <div class="settings-col">
               <div class="settings-section">
                 <div class="settings-title">Configuration</div>
-                <input id="setLmUrl" placeholder="LM URL" />
+                <input id="setLmUrl" placeholder="LM URL (pool: url|weight, url|weight)" />
                 <input id="setApiKey" class="row" placeholder="API Key" />
                 <div class="row2 row">
                   <select id="setLmModel">
@@ -1164,6 +1164,10 @@ def render_console() -> HTMLResponse:
               <label class="caption" for="aiConcurrencyInput">AI Request Concurrency (1 = sequential)</label>
               <input id="aiConcurrencyInput" type="number" min="1" max="32" step="1" value="1" />
             </div>
+            <div class="row2" style="margin-top:6px; align-items:center;">
+              <label class="caption" for="pass1BatchSizeInput">Pass 1 Resumes per Request (1 = one at a time)</label>
+              <input id="pass1BatchSizeInput" type="number" min="1" max="20" step="1" value="1" />
+            </div>
             <div class="row2" style="margin-top:6px; align-items:center;">
               <label class="caption" for="jobConcurrencyInput">Queue Job Concurrency (parallel resumes)</label>
               <input id="jobConcurrencyInput" type="number" min="1" max="32" step="1" value="1" />
@@ -1585,6 +1589,14 @@ def render_console() -> HTMLResponse:
     selectedSimpleMatchId: null,
     lastAutoRunName: null,
     analysisQueuedRunIds: [],
+    analysisBatchId: null,
+    analysisBatch: null,
+    logLines: [],
+    logFirstId: 0,
+    logLastId: 0,
+    logHasOlder: false,
+    logLoadingOlder: false,
+    logRun: null,
     analysisAutoPollEnabled: false,
     analysisSubmitting: false,
     autoUploadSubmitting: false,
@@ -1606,6 +1618,7 @@ def render_console() -> HTMLResponse:
   const tagsFrom = (s) => String(s || '').split(',').map(x => x.trim()).filter(Boolean);
   const escapeHtml = (s) => String(s || '').replace(/[&<>"']/g, (ch) => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[ch]));
   const DEBUG_LOG_LIMIT = 300;
+  const LOG_PAGE_SIZE = 500;
   const ANALYSIS_BATCH_STORAGE_KEY = 'talentscout.analysisQueuedRunIds';
   const debugLines = [];
   let textPromptResolver = null;
@@ -1636,16 +1649,44 @@ def render_console() -> HTMLResponse:
     }
   }
 
-  function setTrackedBatchRunIds(ids) {
+  function setTrackedBatchRunIds(ids, batchId = null) {
     state.analysisQueuedRunIds = Array.from(new Set((ids || []).map((x) => Number(x)).filter(Boolean)));
+    state.analysisBatchId = Number(batchId || 0) || null;
+    state.analysisBatch = null;
     persistBatchRunIds(state.analysisQueuedRunIds);
   }
 
   function clearTrackedBatchRunIds() {
     state.analysisQueuedRunIds = [];
+    state.analysisBatchId = null;
+    state.analysisBatch = null;
     persistBatchRunIds([]);
   }
 
+  function trackedBatchSummary() {
+    const batch = state.analysisBatch;
+    if (!batch || !state.analysisBatchId || Number(batch.id) !== Number(state.analysisBatchId)) return null;
+    return batch;
+  }
+
+  async function refreshTrackedBatch() {
+    const id = Number(state.analysisBatchId || 0);
+    if (!id) return;
+    try {
+      // O(1) server-side counters instead of scanning /v1/runs for every tracked id.
+      state.analysisBatch = await getJson(`/v1/batches/${id}`);
+    } catch {
+      state.analysisBatch = null;
+    }
+  }
+
+  function formatEta(seconds) {
+    const sec = Math.max(0, Math.round(Number(seconds || 0)));
+    if (sec < 60) return `${sec}s`;
+    if (sec < 3600) return `${Math.floor(sec / 60)}m ${sec % 60}s`;
+    return `${Math.floor(sec / 3600)}h ${Math.floor((sec % 3600) / 60)}m`;
+  }
+
   function isQueuePausedByRuns(runs = null) {
     const rows = Array.isArray(runs) ? runs : (state.runs || []);
     return rows.some((r) => String(r && r.status ? r.status : '') === 'paused' || isPauseRequested(r));
@@ -2007,6 +2048,24 @@ def render_console() -> HTMLResponse:
     if (q('jobProgressMeta')) q('jobProgressMeta').textContent = `${jobPct}% • ${jobStep}`;
     if (q('jobProgressFill')) q('jobProgressFill').style.width = `${jobPct}%`;
 
+    const batch = trackedBatchSummary();
+    if (batch) {
+      const total = Number(batch.total || 0);
+      const parts = [`${Number(batch.completed || 0)}/${total} complete`];
+      if (Number(batch.skipped || 0)) parts.push(`${batch.skipped} duplicate(s) skipped`);
+      if (Number(batch.failed || 0)) parts.push(`${batch.failed} failed`);
+      if (Number(batch.canceled || 0)) parts.push(`${batch.canceled} canceled`);
+      if (Number(batch.running || 0)) parts.push(`${batch.running} running`);
+      if (Number(batch.paused || 0)) parts.push(`${batch.paused} paused`);
+      if (Number(batch.queued || 0)) parts.push(`${batch.queued} queued`);
+      const rate = Number(batch.throughput_per_min || 0);
+      const rateEta = rate && batch.eta_seconds ? ` • ${rate}/min • ETA ${formatEta(batch.eta_seconds)}` : '';
+      if (q('batchProgressLabel')) q('batchProgressLabel').textContent = `Batch Progress • #${batch.id} • ${total} job(s)`;
+      if (q('batchProgressMeta')) q('batchProgressMeta').textContent = `${parts.join(', ')}${rateEta}`;
+      if (q('batchProgressFill')) q('batchProgressFill').style.width = `${Number(batch.progress || 0)}%`;
+      return;
+    }
+
     const ids = (state.analysisQueuedRunIds || []).map((x) => Number(x)).filter(Boolean);
     if (ids.length) {
       const rows = ids.map((id) => runs.find((r) => Number(r.id) === id)).filter(Boolean);
@@ -2124,6 +2183,24 @@ def render_console() -> HTMLResponse:
       return;
     }
 
+    const batch = trackedBatchSummary();
+    if (batch) {
+      const failed = Number(batch.failed || 0);
+      const active = Number(batch.queued || 0) + Number(batch.running || 0) + Number(batch.paused || 0);
+      updateRunStatusBars();
+      if (!active) {
+        // Terminal state reached for tracked batch.
+        clearTrackedBatchRunIds();
+        if (!hasLiveQueueRuns()) stopAnalysisAutoPoll();
+        if (!failed) {
+          setMsg('msgMatch', '', true);
+          return;
+        }
+      }
+      setMsg('msgMatch', `Tracking batch #${batch.id} (${Number(batch.total || 0)} runs, ${Number(batch.done || 0)} done).`, failed === 0);
+      return;
+    }
+
     const rows = ids
       .map((id) => state.runs.find((r) => Number(r.id) === id))
       .filter(Boolean);
@@ -2260,6 +2337,15 @@ def render_console() -> HTMLResponse:
     const localAvailable = !!s.local_lm_available;
 
     el.className = 'status-chip';
+    el.title = '';
+    const pool = Array.isArray(s.llm_endpoints) ? s.llm_endpoints : [];
+    if (pool.length > 1) {
+      const healthy = pool.filter((e) => e.state !== 'ejected').length;
+      el.classList.add(healthy ? 'ok' : 'err');
+      el.textContent = `${healthy ? '✅' : '⚠️'} AI: ${healthy}/${pool.length} servers healthy`;
+      el.title = pool.map((e) => `${e.url} — ${e.state}, ${e.latency_ms ?? '?'} ms, ${e.errors} error(s)`).join('\n');
+      return;
+    }
     if (usingLocalLm && !localAvailable) {
       el.classList.add('err');
       el.textContent = '⚠️ AI: no model server';
@@ -3625,8 +3711,7 @@ def render_console() -> HTMLResponse:
         ? String(selectedLegacyMeta.name).replace(/^Auto:\s*/i, 'Run: ')
         : 'Run: Batch Rerun';
       const legacyRun = await createLegacyRun(cfg.runName || defaultName, cfg.threshold);
-      let queued = 0;
-      const runIds = [];
+      const pairs = [];
       const seen = new Set();
       for (const row of rows) {
         const key = `${row.job_id}:${row.resume_id}`;
@@ -3641,27 +3726,25 @@ def render_console() -> HTMLResponse:
             continue;
           }
         }
-        const run = await send('/v1/runs', 'POST', {
-          job_type: 'score_match',
-          payload: {
-            job_id: Number(row.job_id),
-            resume_id: Number(row.resume_id),
-            threshold: cfg.threshold,
-            auto_deep: cfg.autoDeep,
-            run_name: cfg.runName || null,
-            legacy_run_id: Number(legacyRun.id),
-            force_rerun_pass1: cfg.forcePass1,
-            force_rerun_deep: cfg.forceDeep,
-            deep_single_prompt: cfg.deepSinglePrompt,
-            ai_concurrency: cfg.aiConcurrency,
-          },
-        });
-        queued += 1;
-        runIds.push(Number(run.id));
+        pairs.push([Number(row.job_id), Number(row.resume_id)]);
       }
-      if (queued === 0) throw new Error('No rerun tasks were queued.');
+      if (!pairs.length) throw new Error('No rerun tasks were queued.');
+      const batch = await send('/v1/runs/matrix', 'POST', {
+        pairs,
+        threshold: cfg.threshold,
+        auto_deep: cfg.autoDeep,
+        run_name: cfg.runName || null,
+        legacy_run_id: Number(legacyRun.id),
+        force_rerun_pass1: cfg.forcePass1,
+        force_rerun_deep: cfg.forceDeep,
+        deep_single_prompt: cfg.deepSinglePrompt,
+        ai_concurrency: cfg.aiConcurrency,
+      });
+      const runIds = (batch.run_ids || []).map(Number);
+      const queued = runIds.length;
+      const batchId = Number(batch.batch_id || 0);
       state.logPinnedRunId = null;
-      setTrackedBatchRunIds(runIds.slice());
+      setTrackedBatchRunIds(runIds.slice(), batchId);
       startAnalysisAutoPoll();
       await refreshRunPanels();
       setMsg('msgLegacyRerun', `Queued batch rerun: ${queued} task(s), queue run #${runIds.join(', ')} linked to legacy run #${legacyRun.id}.`);
@@ -3752,6 +3835,77 @@ def render_console() -> HTMLResponse:
       .join('|');
   }
 
+  // Live updates: /v1/events pushes run transitions and log lines. While the stream is
+  // connected the 3s poll only runs as a 30s safety net; on errors polling takes over.
+  const live = { source: null, connected: false, lastFullPollAt: 0, refreshTimer: null, renderQueued: false };
+
+  function scheduleLiveRender() {
+    if (live.renderQueued) return;
+    live.renderQueued = true;
+    requestAnimationFrame(() => {
+      live.renderQueued = false;
+      renderRuns();
+      updateAnalysisQueueMessage();
+    });
+  }
+
+  function scheduleLiveRefresh(delayMs = 2000) {
+    if (live.refreshTimer) return;
+    live.refreshTimer = setTimeout(async () => {
+      live.refreshTimer = null;
+      live.lastFullPollAt = Date.now();
+      try {
+        startAnalysisAutoPoll();
+        await pollRunActivity();
+      } catch (e) {
+        console.error(e);
+      }
+    }, delayMs);
+  }
+
+  function onLiveRunEvent(data) {
+    const run = (state.runs || []).find((r) => Number(r.id) === Number(data.run_id));
+    if (!run) {
+      scheduleLiveRefresh();
+      return;
+    }
+    const prevStatus = String(run.status || '');
+    if (data.status) run.status = data.status;
+    if (data.progress !== undefined) run.progress = data.progress;
+    if (data.current_step) run.current_step = data.current_step;
+    if (data.error) run.error = data.error;
+    if (data.pause_requested) run.payload = { ...(run.payload || {}), pause_requested: true };
+    scheduleLiveRender();
+    // Status changes may carry results, batch counters or follow-up runs: refetch once, debounced.
+    if (data.status && data.status !== prevStatus) scheduleLiveRefresh();
+  }
+
+  function onLiveLogEvent(data) {
+    if (Number(data.run_id) !== Number(state.lastLoadedLogRunId || 0)) return;
+    // Ids advance the same cursor loadLogs uses, so a later after_id fetch skips these.
+    if (Number(data.id) <= Number(state.logLastId || 0)) return;
+    const el = q('runLogs');
+    if (!el) return;
+    const line = formatLogLine(data);
+    state.logLines.push(line);
+    state.logLastId = Number(data.id);
+    el.textContent += String.fromCharCode(10) + line;
+    if (state.logAutoFollow) el.scrollTop = el.scrollHeight;
+  }
+
+  function connectRunEvents() {
+    if (typeof EventSource === 'undefined' || live.source) return;
+    const src = new EventSource('/v1/events');
+    live.source = src;
+    src.onopen = () => { live.connected = true; };
+    // EventSource reconnects on its own (resuming from Last-Event-ID); polling covers the gap.
+    src.onerror = () => { live.connected = false; };
+    src.addEventListener('run', (e) => onLiveRunEvent(JSON.parse(e.data)));
+    src.addEventListener('log', (e) => onLiveLogEvent(JSON.parse(e.data)));
+    src.addEventListener('batch', () => scheduleLiveRefresh(250));
+    src.addEventListener('resync', () => scheduleLiveRefresh(0));
+  }
+
   async function pollRunActivity() {
     if (!state.analysisAutoPollEnabled) return;
 
@@ -3759,7 +3913,7 @@ def render_console() -> HTMLResponse:
     const hadActive = previousRuns.some((r) => r.status === 'queued' || r.status === 'running');
     const previousById = new Map(previousRuns.map((r) => [Number(r.id), r]));
 
-    const runs = await getJson('/v1/runs');
+    const [runs] = await Promise.all([getJson('/v1/runs'), refreshTrackedBatch()]);
     const hasActive = runs.some((r) => r.status === 'queued' || r.status === 'running');
     const runChanged = runSignature(previousRuns) !== runSignature(runs);
 
@@ -4240,6 +4394,13 @@ def render_console() -> HTMLResponse:
       (standardScore ? `<span class="score-sub">Pass 1: ${standardScore}</span>` : '');
   }
 
+  async function queueUploadBatch(jobType, payloads, label) {
+    // One batch per selection, so the progress bar's counters (duplicates skipped,
+    // ETA) cover every upload in it.
+    const batch = await send('/v1/runs/batch', 'POST', { job_type: jobType, payloads, label });
+    return { batchId: Number(batch.batch_id || 0), runIds: (batch.run_ids || []).map(Number) };
+  }
+
   async function queueIngestJob() {
     try {
       const tags = tagsFrom(q('jdTagsCsv').value);
@@ -4248,7 +4409,7 @@ def render_console() -> HTMLResponse:
       const forceReparse = !!q('jdForceReparse').checked;
       if (!files.length) throw new Error('Upload at least one JD file.');
 
-      const runIds = [];
+      const payloads = [];
       for (const f of files) {
         const existing = state.jobs.find((j) => String(j.filename) === String(f.name));
         if (existing && !forceReparse) continue;
@@ -4256,16 +4417,14 @@ def render_console() -> HTMLResponse:
         let binary = '';
         for (let i = 0; i < bytes.byteLength; i++) binary += String.fromCharCode(bytes[i]);
         const content_b64 = btoa(binary);
-        const run = await send('/v1/runs', 'POST', {
-          job_type: 'ingest_job_file',
-          payload: { filename: f.name, content_b64, tags, force_reparse: forceReparse },
-        });
-        runIds.push(Number(run.id));
+        payloads.push({ filename: f.name, content_b64, tags, force_reparse: forceReparse });
       }
-      if (!runIds.length) throw new Error('All uploaded JDs already exist. Enable Force Reparse to process them again.');
+      if (!payloads.length) throw new Error('All uploaded JDs already exist. Enable Force Reparse to process them again.');
+      const batch = await queueUploadBatch('ingest_job_file', payloads, `Upload ${payloads.length} JD file(s)`);
+      const runIds = batch.runIds;
       setMsg('msgJD', `Queued ${runIds.length} JD parsing run(s): #${runIds.join(', ')}`);
       q('selectedRunId').value = String(runIds[runIds.length - 1]);
-      setTrackedBatchRunIds(runIds.slice());
+      setTrackedBatchRunIds(runIds.slice(), batch.batchId);
       startAnalysisAutoPoll();
       await refreshAll();
     } catch (e) {
@@ -4289,7 +4448,7 @@ def render_console() -> HTMLResponse:
         ...(state.resumes || []).map((r) => String(r.filename || '')),
       ]);
 
-      const runIds = [];
+      const payloads = [];
       const skippedExisting = [];
       for (const f of files) {
         if (!forceReparse && existingNames.has(String(f.name || ''))) {
@@ -4300,25 +4459,23 @@ def render_console() -> HTMLResponse:
         let binary = '';
         for (let i = 0; i < bytes.byteLength; i++) binary += String.fromCharCode(bytes[i]);
         const content_b64 = btoa(binary);
-        const run = await send('/v1/runs', 'POST', {
-          job_type: 'ingest_auto_file',
-          payload: { filename: f.name, content_b64, tags, force_reparse: forceReparse },
-        });
-        runIds.push(Number(run.id));
+        payloads.push({ filename: f.name, content_b64, tags, force_reparse: forceReparse });
       }
-      if (!runIds.length) {
+      if (!payloads.length) {
         if (skippedExisting.length) {
           throw new Error(`All selected files already exist (${skippedExisting.length}). Enable "Force Reparse Existing Files" to run AI again.`);
         }
         throw new Error('No files were queued.');
       }
+      const batch = await queueUploadBatch('ingest_auto_file', payloads, `Upload ${payloads.length} document(s)`);
+      const runIds = batch.runIds;
       const skipNote = skippedExisting.length
         ? ` Skipped ${skippedExisting.length} existing file(s): ${skippedExisting.slice(0, 5).join(', ')}${skippedExisting.length > 5 ? ', ...' : ''}.`
         : '';
       setMsg('msgAutoUpload', `Queued ${runIds.length} auto-detect ingest run(s): #${runIds.join(', ')}.${skipNote}`);
       state.autoUploadRunIds = runIds.slice();
       q('selectedRunId').value = String(runIds[runIds.length - 1]);
-      setTrackedBatchRunIds(runIds.slice());
+      setTrackedBatchRunIds(runIds.slice(), batch.batchId);
       startAnalysisAutoPoll();
       await refreshAll();
     } catch (e) {
@@ -4337,7 +4494,7 @@ def render_console() -> HTMLResponse:
       const forceReparse = !!q('resForceReparse').checked;
       if (!files.length) throw new Error('Upload at least one resume file.');
 
-      const runIds = [];
+      const payloads = [];
       for (const f of files) {
         const existing = state.resumes.find((r) => String(r.filename) === String(f.name));
         if (existing && !forceReparse) continue;
@@ -4345,16 +4502,14 @@ def render_console() -> HTMLResponse:
         let binary = '';
         for (let i = 0; i < bytes.byteLength; i++) binary += String.fromCharCode(bytes[i]);
         const content_b64 = btoa(binary);
-        const run = await send('/v1/runs', 'POST', {
-          job_type: 'ingest_resume_file',
-          payload: { filename: f.name, content_b64, tags, force_reparse: forceReparse },
-        });
-        runIds.push(Number(run.id));
+        payloads.push({ filename: f.name, content_b64, tags, force_reparse: forceReparse });
       }
-      if (!runIds.length) throw new Error('All uploaded resumes already exist. Enable Force Reparse to process them again.');
+      if (!payloads.length) throw new Error('All uploaded resumes already exist. Enable Force Reparse to process them again.');
+      const batch = await queueUploadBatch('ingest_resume_file', payloads, `Upload ${payloads.length} resume(s)`);
+      const runIds = batch.runIds;
       setMsg('msgRes', `Queued ${runIds.length} resume parsing run(s): #${runIds.join(', ')}`);
       q('selectedRunId').value = String(runIds[runIds.length - 1]);
-      setTrackedBatchRunIds(runIds.slice());
+      setTrackedBatchRunIds(runIds.slice(), batch.batchId);
       startAnalysisAutoPoll();
       await refreshAll();
     } catch (e) {
@@ -4507,13 +4662,12 @@ def render_console() -> HTMLResponse:
       const debugBulkLog = !!(q('debugBulkLog') && q('debugBulkLog').checked);
       const maxDeepPerJd = Math.max(0, Number(q('maxDeepPerJdInput').value || 0));
       const aiConcurrency = Math.max(1, Number(q('aiConcurrencyInput').value || 1));
+      const pass1BatchSize = Math.min(20, Math.max(1, Number(q('pass1BatchSizeInput').value || 1)));
       const jobConcurrency = Math.max(1, Number(q('jobConcurrencyInput').value || 1));
       await send('/v1/settings/runtime', 'PUT', { job_concurrency: jobConcurrency });
 
-      let queued = 0;
-      const queuedRunIds = [];
-      let lastRunId = null;
-      let firstQueuedRunId = null;
+      const pairs = [];
+      const legacyRunIds = {};
       for (const job_id of jobIds) {
         const job = state.jobs.find((j) => Number(j.id) === Number(job_id));
         const jdTags = (job && job.tags) ? job.tags.map((t) => String(t).trim()).filter(Boolean) : [];
@@ -4529,57 +4683,40 @@ def render_console() -> HTMLResponse:
         if (!perJobResumeIds.length) continue;
         const defaultRunName = buildLegacyRunNameForJob(runName || state.lastAutoRunName || '', job);
         const legacyRun = await createLegacyRun(defaultRunName, threshold);
-        const batchGroupKey = `legacy:${Number(legacyRun.id)}:job:${Number(job_id)}:cap:${maxDeepPerJd}`;
-        const useDeepCapTwoPhase = autoDeep && maxDeepPerJd > 0 && !forceRerunDeep;
-
-        for (const resume_id of perJobResumeIds) {
-          const run = await send('/v1/runs', 'POST', {
-            job_type: 'score_match',
-            payload: {
-              job_id,
-              resume_id,
-              threshold,
-              auto_deep: useDeepCapTwoPhase ? false : autoDeep,
-              run_name: runName || null,
-              legacy_run_id: Number(legacyRun.id),
-              force_rerun_pass1: forceRerunPass1,
-              force_rerun_deep: forceRerunDeep,
-              deep_single_prompt: deepSinglePrompt,
-              debug_bulk_log: debugBulkLog,
-              max_deep_scans_per_jd: maxDeepPerJd,
-              ai_concurrency: aiConcurrency,
-              deep_cap_batch_mode: useDeepCapTwoPhase,
-              batch_group_key: batchGroupKey,
-              batch_total_for_job: perJobResumeIds.length,
-              batch_deep_cap: maxDeepPerJd,
-            },
-          });
-          queued += 1;
-          queuedRunIds.push(Number(run.id));
-          lastRunId = run.id;
-          if (!firstQueuedRunId) {
-            firstQueuedRunId = Number(run.id);
-            state.logPinnedRunId = null;
-            q('selectedRunId').value = String(firstQueuedRunId);
-            setTrackedBatchRunIds([firstQueuedRunId]);
-            startAnalysisAutoPoll();
-            await refreshRunPanels();
-            await loadLogs(firstQueuedRunId);
-          } else if (queued % 5 === 0) {
-            setMsg('msgMatch', `Submitting analysis jobs... queued ${queued} so far.`, true);
-          }
-        }
+        legacyRunIds[job_id] = Number(legacyRun.id);
+        for (const resume_id of perJobResumeIds) pairs.push([job_id, resume_id]);
       }
 
+      if (!pairs.length) throw new Error('No resumes matched selected JD tag(s).');
+      setMsg('msgMatch', `Submitting ${pairs.length} analysis job(s)...`, true);
+      // One request for the whole matrix; the server enqueues every pair in a single transaction.
+      const batch = await send('/v1/runs/matrix', 'POST', {
+        pairs,
+        legacy_run_ids: legacyRunIds,
+        threshold,
+        auto_deep: autoDeep,
+        run_name: runName || null,
+        force_rerun_pass1: forceRerunPass1,
+        force_rerun_deep: forceRerunDeep,
+        deep_single_prompt: deepSinglePrompt,
+        debug_bulk_log: debugBulkLog,
+        max_deep_scans_per_jd: maxDeepPerJd,
+        ai_concurrency: aiConcurrency,
+        pass1_batch_size: pass1BatchSize,
+      });
+      const queuedRunIds = (batch.run_ids || []).map(Number);
+      const queued = queuedRunIds.length;
+      const lastRunId = queued ? queuedRunIds[queued - 1] : null;
       if (queued === 0) throw new Error('No resumes matched selected JD tag(s).');
       if (lastRunId) {
         state.logPinnedRunId = null;
         q('selectedRunId').value = String(lastRunId);
         await loadLogs();
       }
-      setTrackedBatchRunIds(queuedRunIds.slice());
+      setTrackedBatchRunIds(queuedRunIds.slice(), batch.batch_id);
       startAnalysisAutoPoll();
-      setMsg('msgMatch', `Submitted ${queued} analysis job(s). Refreshing dashboard...`, true);
+      await refreshTrackedBatch();
+      setMsg('msgMatch', `Submitted ${queued} analysis job(s) as batch #${batch.batch_id}. Refreshing dashboard...`, true);
       await refreshAll();
       updateAnalysisQueueMessage();
     } catch (e) {
@@ -4590,45 +4727,92 @@ def render_console() -> HTMLResponse:
     }
   }
 
+  function formatLogLine(l) {
+    return `[${l.created_at}] ${String(l.level || '').toUpperCase()} ${l.message}`;
+  }
+
+  function renderLogView(run, forceScrollBottom = false) {
+    const el = q('runLogs');
+    const prevTop = el.scrollTop;
+    const header = [
+      `Run #${run.id} | ${run.job_type} | status=${run.status} | progress=${run.progress || 0}%`,
+      `Step: ${run.current_step || '-'}`,
+    ];
+    if (run.error) header.push(`Error: ${run.error}`);
+    if (run.result && Object.keys(run.result).length) {
+      header.push(`Result: ${JSON.stringify(run.result)}`);
+    }
+    const timeline = state.logLines.length ? state.logLines.slice() : ['No run log lines were recorded for this run.'];
+    if (state.logHasOlder) timeline.unshift('... scroll to the top to load older lines ...');
+    el.textContent = [...header, '', ...timeline].join(String.fromCharCode(10));
+    if (state.logAutoFollow || forceScrollBottom) {
+      el.scrollTop = el.scrollHeight;
+    } else {
+      const maxTop = Math.max(0, el.scrollHeight - el.clientHeight);
+      el.scrollTop = Math.min(prevTop, maxTop);
+    }
+  }
+
   async function loadLogs(runId = null) {
     const id = Number(runId || q('selectedRunId').value || 0);
     if (!id) {
       return;
     }
     try {
+      const runChanged = Number(state.lastLoadedLogRunId || 0) !== Number(id);
+      // Same run: fetch only lines after the last one we have (keyset cursor).
+      const logsUrl = !runChanged && state.logLastId
+        ? `/v1/runs/${id}/logs?after_id=${state.logLastId}`
+        : `/v1/runs/${id}/logs?limit=${LOG_PAGE_SIZE}`;
       const [run, logs] = await Promise.all([
         getJson(`/v1/runs/${id}`),
-        getJson(`/v1/runs/${id}/logs`),
+        getJson(logsUrl),
       ]);
-      const el = q('runLogs');
-      const prevTop = el.scrollTop;
-      const prevHeight = el.scrollHeight;
-      const runChanged = Number(state.lastLoadedLogRunId || 0) !== Number(id);
-      const header = [
-        `Run #${run.id} | ${run.job_type} | status=${run.status} | progress=${run.progress || 0}%`,
-        `Step: ${run.current_step || '-'}`,
-      ];
-      if (run.error) header.push(`Error: ${run.error}`);
-      if (run.result && Object.keys(run.result).length) {
-        header.push(`Result: ${JSON.stringify(run.result)}`);
-      }
-      const timeline = (logs || []).map((l) => `[${l.created_at}] ${String(l.level || '').toUpperCase()} ${l.message}`);
-      if (!timeline.length) {
-        timeline.push('No run log lines were recorded for this run.');
+      if (runChanged || !state.logLastId) {
+        state.logLines = [];
+        state.logLastId = 0;
+        state.logFirstId = logs.length ? Number(logs[0].id) : 0;
+        state.logHasOlder = logs.length >= LOG_PAGE_SIZE;
       }
-      el.textContent = [...header, '', ...timeline].join(String.fromCharCode(10));
-      if (state.logAutoFollow || runChanged) {
-        el.scrollTop = el.scrollHeight;
-      } else {
-        const maxTop = Math.max(0, el.scrollHeight - el.clientHeight);
-        el.scrollTop = Math.min(prevTop, maxTop);
+      for (const l of logs || []) {
+        // Live SSE lines may already be in the buffer.
+        if (Number(l.id) <= Number(state.logLastId || 0)) continue;
+        state.logLines.push(formatLogLine(l));
+        state.logLastId = Number(l.id);
       }
+      state.logRun = run;
       state.lastLoadedLogRunId = Number(id);
+      renderLogView(run, runChanged);
     } catch (e) {
       q('runLogs').textContent = e.message;
     }
   }
 
+  async function loadOlderLogs() {
+    const id = Number(state.lastLoadedLogRunId || 0);
+    if (!id || !state.logHasOlder || !state.logFirstId || state.logLoadingOlder) return;
+    state.logLoadingOlder = true;
+    try {
+      const el = q('runLogs');
+      const prevHeight = el.scrollHeight;
+      const older = await getJson(`/v1/runs/${id}/logs?before_id=${state.logFirstId}&limit=${LOG_PAGE_SIZE}`);
+      if (Number(state.lastLoadedLogRunId || 0) !== id) return;
+      if (older.length) {
+        state.logLines = [...older.map(formatLogLine), ...state.logLines];
+        state.logFirstId = Number(older[0].id);
+      }
+      state.logHasOlder = older.length >= LOG_PAGE_SIZE;
+      if (state.logRun) renderLogView(state.logRun);
+      // Keep the lines the user was reading in place.
+      el.scrollTop = el.scrollHeight - prevHeight;
+    } catch (e) {
+      console.error(e);
+    } finally {
+      state.logLoadingOlder = false;
+    }
+  }
+
+
   async function loadHistoryLogs() {
     const raw = String((q('historyRunId') && q('historyRunId').value) || '').trim();
     if (!raw) return;
@@ -4641,6 +4825,9 @@ def render_console() -> HTMLResponse:
   }
 
   async function loadLegacyHistoryLog(legacyRunId) {
+    // The log pane no longer shows a queue run; stop live/incremental appends into it.
+    state.lastLoadedLogRunId = null;
+    state.logLastId = 0;
     if (!legacyRunId) {
       q('runLogs').textContent = 'No legacy run selected.';
       return;
@@ -5242,6 +5429,7 @@ def render_console() -> HTMLResponse:
         updateAnalysisQueueMessage();
       }
       await loadSettings();
+      connectRunEvents();
       const hasTrackedActive = (state.analysisQueuedRunIds || []).some((id) =>
         (state.runs || []).some((r) => Number(r.id) === Number(id) && (r.status === 'queued' || r.status === 'running'))
       );
@@ -5254,6 +5442,7 @@ def render_console() -> HTMLResponse:
         logEl.addEventListener('scroll', () => {
           const delta = logEl.scrollHeight - logEl.scrollTop - logEl.clientHeight;
           state.logAutoFollow = delta <= 24;
+          if (logEl.scrollTop <= 4) loadOlderLogs();
         });
         logEl.dataset.boundScroll = '1';
       }
@@ -5266,6 +5455,8 @@ def render_console() -> HTMLResponse:
 
   boot();
   setInterval(async () => {
+    if (live.connected && Date.now() - live.lastFullPollAt < 30000) return;
+    live.lastFullPollAt = Date.now();
     try {
       await pollRunActivity();
     } catch (e) {
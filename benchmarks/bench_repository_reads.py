@@ -0,0 +1,168 @@
+"""
+Micro-benchmark: Repository read paths, pandas DataFrame (legacy) vs sqlite3.Row.
+
+Builds a throwaway database with ~50k matches and reports per-call latency for
+the hot read methods. The "pandas" column re-implements the previous
+fetch_dataframe + iterrows path so both variants run against the same data.
+
+Usage:
+    python benchmarks/bench_repository_reads.py [--matches 50000] [--repeat 20]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database import DBManager  # noqa: E402
+from backend.services.repository import Repository, _as_int, _candidate_name_from_profile, _parse_tags  # noqa: E402
+
+
+def _seed(db: DBManager, n_matches: int, n_jobs: int = 50) -> tuple[int, int, int]:
+    n_resumes = max(1, n_matches // n_jobs)
+    now = datetime.datetime.now().isoformat()
+    profile = json.dumps({"candidate_name": "Bench Candidate", "extracted_skills": ["Python", "SQL"]})
+    criteria = json.dumps({"must_have_skills": ["Python", "SQL", "AWS"]})
+    conn = db.get_connection()
+    c = conn.cursor()
+    c.executemany(
+        "INSERT INTO jobs (filename, content, criteria, tags, upload_date) VALUES (?, ?, ?, ?, ?)",
+        [(f"jd_{i}.pdf", "JD text " * 200, criteria, "eng,bench", now) for i in range(n_jobs)],
+    )
+    c.executemany(
+        "INSERT INTO resumes (filename, content, profile, tags, upload_date) VALUES (?, ?, ?, ?, ?)",
+        [(f"cv_{i}.pdf", "Resume text " * 200, profile, "bench", now) for i in range(n_resumes)],
+    )
+    c.execute("INSERT INTO runs (name, job_id, threshold, created_at) VALUES (?, NULL, 50, ?)", ("bench", now))
+    run_id = c.lastrowid
+    details = json.dumps([{"requirement": "Python", "category": "must_have_skills", "status": "Met", "evidence": "x"}])
+    rows = []
+    for j in range(1, n_jobs + 1):
+        for r in range(1, n_resumes + 1):
+            rows.append((j, r, "Bench Candidate", (j * r) % 100, (j + r) % 100, "Review", "ok", "ok", "[]", details, "Standard"))
+    c.executemany(
+        "INSERT INTO matches (job_id, resume_id, candidate_name, match_score, standard_score, decision, reasoning, "
+        "standard_reasoning, missing_skills, match_details, strategy) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    # Link one JD's worth of matches into the legacy run.
+    c.execute("INSERT INTO run_matches (run_id, match_id) SELECT ?, id FROM matches WHERE job_id = 1", (run_id,))
+    conn.commit()
+    conn.close()
+    return n_jobs, n_resumes, int(run_id)
+
+
+def _legacy_get_job(db: DBManager, job_id: int) -> dict | None:
+    df = db.fetch_dataframe(
+        f"SELECT id, filename, content, criteria, tags, upload_date FROM jobs WHERE id = {int(job_id)} LIMIT 1"
+    )
+    if df.empty:
+        return None
+    row = df.iloc[0]
+    return {
+        "id": int(row["id"]),
+        "filename": row["filename"],
+        "content": row["content"],
+        "criteria": row["criteria"],
+        "tags": _parse_tags(row.get("tags")),
+        "upload_date": row.get("upload_date"),
+    }
+
+
+def _legacy_list_matches(db: DBManager, limit: int = 200) -> list[dict]:
+    df = db.fetch_dataframe(
+        "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, m.standard_reasoning, "
+        "m.strategy, m.decision, m.reasoning, r.profile AS resume_profile, r.filename AS resume_name "
+        "FROM matches m "
+        "JOIN (SELECT MAX(id) AS id FROM matches GROUP BY job_id, resume_id) latest ON latest.id = m.id "
+        "LEFT JOIN resumes r ON r.id = m.resume_id "
+        f"ORDER BY m.id DESC LIMIT {int(limit)}"
+    )
+    return [
+        {
+            "id": int(row["id"]),
+            "candidate_name": _candidate_name_from_profile(
+                row.get("resume_profile"), row.get("candidate_name"), row.get("resume_name")
+            ),
+            "match_score": _as_int(row.get("match_score"), default=0),
+            "standard_score": _as_int(row.get("standard_score"), nullable=True),
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+def _legacy_legacy_run_results(db: DBManager, run_id: int) -> list[dict]:
+    df = db.fetch_dataframe(
+        "SELECT m.id, m.job_id, m.resume_id, m.candidate_name, m.match_score, m.standard_score, m.decision, "
+        "m.strategy, j.filename AS job_name, r.filename AS resume_name, r.profile AS resume_profile "
+        "FROM matches m JOIN run_matches rm ON rm.match_id = m.id "
+        "JOIN jobs j ON j.id = m.job_id JOIN resumes r ON r.id = m.resume_id "
+        f"WHERE rm.run_id = {int(run_id)} ORDER BY m.match_score DESC"
+    )
+    return [
+        {
+            "id": int(row["id"]),
+            "candidate_name": _candidate_name_from_profile(
+                row.get("resume_profile"), row.get("candidate_name"), row.get("resume_name")
+            ),
+            "match_score": _as_int(row.get("match_score"), default=0),
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+def _legacy_counts(db: DBManager) -> dict:
+    return {
+        table: int(db.fetch_dataframe(f"SELECT COUNT(*) AS c FROM {table}").iloc[0]["c"])
+        for table in ("jobs", "resumes", "matches", "job_runs", "runs")
+    }
+
+
+def _time_call(fn, repeat: int) -> float:
+    fn()  # warm caches / pooled connection
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(db_path=os.path.join(tmp, "bench.db"))
+        repo = Repository(db=db)
+        t0 = time.perf_counter()
+        n_jobs, n_resumes, run_id = _seed(db, args.matches)
+        print(f"Seeded {n_jobs} jobs x {n_resumes} resumes ({n_jobs * n_resumes} matches) in {time.perf_counter() - t0:.1f}s")
+
+        cases = [
+            ("get_job", lambda: _legacy_get_job(db, 7), lambda: repo.get_job(7)),
+            ("list_matches(200)", lambda: _legacy_list_matches(db), lambda: repo.list_matches(limit=200)),
+            ("list_legacy_run_results", lambda: _legacy_legacy_run_results(db, run_id), lambda: repo.list_legacy_run_results(run_id)),
+            ("dashboard counts", lambda: _legacy_counts(db), lambda: repo.table_counts()),
+        ]
+        print(f"{'call':<26}{'pandas ms':>12}{'sqlite3.Row ms':>16}{'speedup':>10}")
+        for name, before, after in cases:
+            b = _time_call(before, args.repeat)
+            a = _time_call(after, args.repeat)
+            print(f"{name:<26}{b:>12.2f}{a:>16.2f}{(b / a if a else 0):>9.1f}x")
+        db.close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
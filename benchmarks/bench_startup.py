@@ -0,0 +1,92 @@
+"""
+Startup-time benchmark: import cost of the server entry point and heavy modules.
+
+Each module is imported in a fresh interpreter so results are not skewed by
+modules already cached in sys.modules. ``backend.app`` builds the app at import
+time, so its number is effectively the server startup cost (minus uvicorn).
+
+Exits non-zero when the median ``backend.app`` import time exceeds the budget
+(--budget-ms, or RESUME_MATCHER_STARTUP_BUDGET_MS; default 2500 ms), and also
+when pandas is pulled in at import time.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 2500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["backend.app", "ai_engine", "document_utils"]
+
+_PROBE = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - t0
+print(json.dumps({"ms": elapsed * 1000.0, "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+
+def _measure(module: str, env: dict) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, module],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # backend.app prints startup chatter; the probe result is the last line.
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("RESUME_MATCHER_STARTUP_BUDGET_MS", "2500") or 2500),
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update(
+            {
+                "PYTHONPATH": PROJECT_ROOT,
+                "RESUME_MATCHER_DB_PATH": os.path.join(tmp, "startup.db"),
+                "RESUME_MATCHER_LM_BASE_URL": "mock://startup",
+                "RESUME_MATCHER_AUTO_PULL_DB_ON_START": "off",
+            }
+        )
+        results = {}
+        print(f"{'module':<18}{'median ms':>12}{'min ms':>10}{'pandas':>9}")
+        for module in MODULES:
+            samples = [_measure(module, env) for _ in range(max(1, args.repeat))]
+            times = [s["ms"] for s in samples]
+            pandas_loaded = any(s["pandas_loaded"] for s in samples)
+            results[module] = (statistics.median(times), pandas_loaded)
+            print(f"{module:<18}{statistics.median(times):>12.1f}{min(times):>10.1f}{'yes' if pandas_loaded else 'no':>9}")
+
+    failed = False
+    app_ms, app_pandas = results["backend.app"]
+    if app_ms > args.budget_ms:
+        print(f"FAIL: backend.app import {app_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if app_pandas:
+        print("FAIL: pandas is imported during server startup")
+        failed = True
+    if not failed:
+        print(f"OK: backend.app import {app_ms:.1f} ms within budget {args.budget_ms:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,138 @@
 import sqlite3
 import json
 import datetime
-import pandas as pd
+import hashlib
+import os
+import queue
+import threading
+import time
+
+
+class _PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection whose close() hands it back to the owning DBManager pool.
+    Subclassing (instead of proxying) keeps isinstance checks such as pandas'
+    read_sql sqlite fallback working unchanged.
+    """
+
+    _owner = None
+    _generation = 0
+    _last_used = 0.0
+
+    def close(self):
+        owner = self._owner
+        if owner is None:
+            super().close()
+            return
+        owner._release_connection(self)
+
+    def _close_for_real(self):
+        self._owner = None
+        super().close()
+
 
 class DBManager:
-    def __init__(self, db_path='resume_matcher.db'):
+    def __init__(self, db_path='resume_matcher.db', pool_size=None, statement_cache_size=None):
         self.db_path = db_path
+        self.pool_size = max(0, int(
+            pool_size
+            if pool_size is not None
+            else (os.getenv("RESUME_MATCHER_DB_POOL_SIZE", "16") or 16)
+        ))
+        self.statement_cache_size = max(0, int(
+            statement_cache_size
+            if statement_cache_size is not None
+            else (os.getenv("RESUME_MATCHER_DB_STATEMENT_CACHE", "256") or 256)
+        ))
+        # Idle connections older than this are pinged before reuse.
+        self.health_check_idle_sec = 30.0
+        self._pool = queue.LifoQueue(maxsize=self.pool_size) if self.pool_size else None
+        self._pool_lock = threading.Lock()
+        self._pool_generation = 0
+        # How often queue normalization ran and how often it actually repaired state.
+        self._queue_normalize_lock = threading.Lock()
+        self._queue_normalize_stats = {
+            "runs": 0,
+            "runs_with_fixes": 0,
+            "rows_fixed": 0,
+            "last_run_at": None,
+            "last_fixed_at": None,
+        }
         self._init_db()
 
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_path, timeout=30)
+    def _open_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            factory=_PooledConnection,
+            cached_statements=self.statement_cache_size,
+            # Pooled connections may be reused by a different thread after release;
+            # the pool guarantees a single user at a time.
+            check_same_thread=False,
+        )
         conn.execute("PRAGMA journal_mode=WAL")
+        conn._owner = self if self._pool is not None else None
+        conn._generation = self._pool_generation
         return conn
 
+    def _connection_is_healthy(self, conn):
+        if conn._generation != self._pool_generation:
+            return False
+        if time.monotonic() - conn._last_used < self.health_check_idle_sec:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def get_connection(self):
+        if self._pool is None:
+            return self._open_connection()
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return self._open_connection()
+            if self._connection_is_healthy(conn):
+                return conn
+            conn._close_for_real()
+
+    def _release_connection(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn._close_for_real()
+            return
+        with self._pool_lock:
+            stale = self._pool is None or conn._generation != self._pool_generation
+        if stale:
+            conn._close_for_real()
+            return
+        conn._last_used = time.monotonic()
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn._close_for_real()
+
+    def close_pool(self):
+        """
+        Close idle pooled connections. Connections currently checked out are
+        closed when released; later get_connection() calls open fresh ones.
+        Call on shutdown and after the DB file is replaced on disk (GitHub pull).
+        """
+        if self._pool is None:
+            return
+        with self._pool_lock:
+            self._pool_generation += 1
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn._close_for_real()
+
     def _init_db(self):
         conn = self.get_connection()
         c = conn.cursor()
@@ -40,6 +160,27 @@ class DBManager:
         except:
             pass
 
+        # Content fingerprints for upload dedup: SHA-256 of the uploaded bytes and
+        # of the normalized extracted text (see content_sha256).
+        for table in ("jobs", "resumes"):
+            for col in ("file_sha256 TEXT", "content_sha256 TEXT"):
+                try:
+                    c.execute(f"ALTER TABLE {table} ADD COLUMN {col}")
+                except:
+                    pass
+            for row in c.execute(f"SELECT id, content FROM {table} WHERE content_sha256 IS NULL").fetchall():
+                digest = self.content_sha256(row[1])
+                if digest:
+                    c.execute(f"UPDATE {table} SET content_sha256 = ? WHERE id = ?", (digest, row[0]))
+            # Earlier builds fingerprinted failed extractions too (see has_extracted_text).
+            c.execute(
+                f"""UPDATE {table} SET content_sha256 = NULL
+                    WHERE content_sha256 IS NOT NULL
+                      AND (TRIM(COALESCE(content, ''), ' ' || char(9, 10, 13)) = ''
+                           OR substr(content, 1, 6) = '[Error'
+                           OR substr(content, 1, 13) = 'Error reading')"""
+            )
+
         # Ensure strategy column exists (migration for existing dbs)
         try:
             c.execute("ALTER TABLE matches ADD COLUMN strategy TEXT DEFAULT 'Standard'")
@@ -107,16 +248,156 @@ class DBManager:
                       created_at TIMESTAMP,
                       FOREIGN KEY(run_id) REFERENCES job_runs(id))''')
 
+        c.execute('''CREATE TABLE IF NOT EXISTS job_batches
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      label TEXT,
+                      job_type TEXT,
+                      total_runs INTEGER DEFAULT 0,
+                      created_at TIMESTAMP)''')
+
+        # Batch progress counters, maintained by the triggers below.
+        for col in (
+            "queued_runs INTEGER DEFAULT 0",
+            "running_runs INTEGER DEFAULT 0",
+            "paused_runs INTEGER DEFAULT 0",
+            "completed_runs INTEGER DEFAULT 0",
+            "failed_runs INTEGER DEFAULT 0",
+            "canceled_runs INTEGER DEFAULT 0",
+            "started_at TIMESTAMP",
+            "last_finished_at TIMESTAMP",
+        ):
+            try:
+                c.execute(f"ALTER TABLE job_batches ADD COLUMN {col}")
+            except:
+                pass
+        try:
+            c.execute("ALTER TABLE job_runs ADD COLUMN batch_id INTEGER")
+        except:
+            pass
+        try:
+            c.execute("ALTER TABLE job_batches ADD COLUMN skipped_runs INTEGER DEFAULT 0")
+        except:
+            pass
+
+        # Triggers keep job_batches counters exact for every status transition
+        # (claim, complete, fail, cancel, pause, requeue, recovery) in the same
+        # transaction, so reading batch progress is a single-row lookup.
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_job_runs_batch_insert
+                     AFTER INSERT ON job_runs
+                     WHEN NEW.batch_id IS NOT NULL
+                     BEGIN
+                       UPDATE job_batches
+                       SET total_runs = total_runs + 1,
+                           queued_runs = queued_runs + (NEW.status = 'queued')
+                       WHERE id = NEW.batch_id;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_job_runs_batch_status
+                     AFTER UPDATE OF status ON job_runs
+                     WHEN NEW.batch_id IS NOT NULL AND NEW.status IS NOT OLD.status
+                     BEGIN
+                       UPDATE job_batches
+                       SET queued_runs = queued_runs + (NEW.status = 'queued') - (OLD.status = 'queued'),
+                           running_runs = running_runs + (NEW.status = 'running') - (OLD.status = 'running'),
+                           paused_runs = paused_runs + (NEW.status = 'paused') - (OLD.status = 'paused'),
+                           completed_runs = completed_runs + (NEW.status = 'completed') - (OLD.status = 'completed'),
+                           failed_runs = failed_runs + (NEW.status = 'failed') - (OLD.status = 'failed'),
+                           canceled_runs = canceled_runs + (NEW.status = 'canceled') - (OLD.status = 'canceled'),
+                           started_at = COALESCE(started_at, CASE WHEN NEW.status = 'running' THEN NEW.started_at END),
+                           last_finished_at = CASE
+                               WHEN NEW.status IN ('completed', 'failed', 'canceled') THEN NEW.finished_at
+                               ELSE last_finished_at
+                           END
+                       WHERE id = NEW.batch_id;
+                     END''')
+        # Completed ingest runs that reused an existing document (result "skipped").
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_job_runs_batch_skipped
+                     AFTER UPDATE OF status ON job_runs
+                     WHEN NEW.batch_id IS NOT NULL AND NEW.status IS NOT OLD.status
+                          AND 'completed' IN (NEW.status, OLD.status)
+                     BEGIN
+                       UPDATE job_batches
+                       SET skipped_runs = COALESCE(skipped_runs, 0)
+                           + (NEW.status = 'completed' AND COALESCE(
+                                 CASE WHEN json_valid(NEW.result_json) THEN json_extract(NEW.result_json, '$.skipped') END, 0))
+                           - (OLD.status = 'completed' AND COALESCE(
+                                 CASE WHEN json_valid(OLD.result_json) THEN json_extract(OLD.result_json, '$.skipped') END, 0))
+                       WHERE id = NEW.batch_id;
+                     END''')
+
         c.execute('''CREATE TABLE IF NOT EXISTS job_run_group_flags
                      (flag_key TEXT PRIMARY KEY,
                       created_at TIMESTAMP)''')
 
+        # Deep-scan verdicts per (resume text, requirement), reused across JDs that
+        # share a requirement. resume_hash is a SHA-256 of the resume content.
+        c.execute('''CREATE TABLE IF NOT EXISTS requirement_evidence
+                     (resume_hash TEXT NOT NULL,
+                      category TEXT NOT NULL,
+                      requirement TEXT NOT NULL,
+                      model TEXT NOT NULL,
+                      status TEXT,
+                      evidence TEXT,
+                      created_at TIMESTAMP,
+                      hit_count INTEGER DEFAULT 0,
+                      PRIMARY KEY (resume_hash, model, category, requirement))''')
+
+        # Pass 1 results scored on behalf of other queued runs of the same batch by a
+        # batched request, waiting to be picked up (and deleted) by the run they
+        # belong to. Rows are transient; the pre-batch_id layout is simply dropped.
+        handoff_cols = {row[1] for row in c.execute("PRAGMA table_info(pass1_handoff)").fetchall()}
+        if handoff_cols and "batch_id" not in handoff_cols:
+            c.execute("DROP TABLE pass1_handoff")
+        c.execute('''CREATE TABLE IF NOT EXISTS pass1_handoff
+                     (batch_id INTEGER NOT NULL,
+                      job_id INTEGER NOT NULL,
+                      resume_id INTEGER NOT NULL,
+                      criteria_hash TEXT NOT NULL,
+                      resume_hash TEXT NOT NULL,
+                      model TEXT NOT NULL,
+                      result TEXT NOT NULL,
+                      created_at TIMESTAMP,
+                      PRIMARY KEY (batch_id, criteria_hash, resume_hash, model))''')
+        # A run that ends without taking its hand-off (canceled, failed, reused an
+        # existing match) drops it; everything left goes once the batch has finished.
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_job_runs_pass1_handoff_purge
+                     AFTER UPDATE OF status ON job_runs
+                     WHEN NEW.batch_id IS NOT NULL AND NEW.status IS NOT OLD.status
+                          AND NEW.status IN ('completed', 'failed', 'canceled')
+                     BEGIN
+                       DELETE FROM pass1_handoff
+                       WHERE batch_id = NEW.batch_id
+                         AND job_id = CASE WHEN json_valid(NEW.payload_json)
+                                           THEN json_extract(NEW.payload_json, '$.job_id') END
+                         AND resume_id = CASE WHEN json_valid(NEW.payload_json)
+                                              THEN json_extract(NEW.payload_json, '$.resume_id') END;
+                       DELETE FROM pass1_handoff
+                       WHERE batch_id = NEW.batch_id
+                         AND NOT EXISTS (
+                             SELECT 1 FROM job_runs
+                             WHERE batch_id = NEW.batch_id AND status IN ('queued', 'running', 'paused')
+                         );
+                     END''')
+
         c.execute(
             "CREATE INDEX IF NOT EXISTS idx_job_runs_status_created_at ON job_runs(status, created_at)"
         )
+        # Covering index for the claim path: status filter + id order, no table lookups.
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_job_runs_status_id ON job_runs(status, id)"
+        )
         c.execute(
             "CREATE INDEX IF NOT EXISTS idx_job_run_logs_run_id_id ON job_run_logs(run_id, id)"
         )
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_job_runs_batch_status ON job_runs(batch_id, status)"
+        )
+        # Serves latest-match-per-pair lookups (list_matches, get_match_if_exists).
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_matches_job_resume_id ON matches(job_id, resume_id, id)"
+        )
+        for table in ("jobs", "resumes"):
+            for col in ("file_sha256", "content_sha256"):
+                c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{col} ON {table}({col})")
 
         conn.commit()
         conn.close()
@@ -137,19 +418,61 @@ class DBManager:
         conn.close()
         return {'id': res[0]} if res else None
 
-    def add_job(self, filename, content, criteria, tags=None):
+    @staticmethod
+    def has_extracted_text(text):
+        """False for empty text and the error placeholders extraction returns instead of text."""
+        text = str(text or "")
+        return bool(text.strip()) and not text.startswith(("[Error", "Error reading"))
+
+    @staticmethod
+    def content_sha256(text):
+        """
+        SHA-256 of text with case and whitespace normalized, so re-extractions match.
+        None when there is no real text: every failed upload would otherwise share one
+        fingerprint and be deduped onto the first.
+        """
+        if not DBManager.has_extracted_text(text):
+            return None
+        normalized = " ".join(str(text).casefold().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _find_by_hash(self, table, file_sha256=None, content_sha256=None):
+        for col, value in (("file_sha256", file_sha256), ("content_sha256", content_sha256)):
+            if not value:
+                continue
+            row = self.fetch_one(f"SELECT id, filename FROM {table} WHERE {col} = ? ORDER BY id LIMIT 1", (value,))
+            if row:
+                return {'id': row["id"], 'filename': row["filename"], 'matched_on': col}
+        return None
+
+    def find_job_by_hash(self, file_sha256=None, content_sha256=None):
+        return self._find_by_hash("jobs", file_sha256=file_sha256, content_sha256=content_sha256)
+
+    def find_resume_by_hash(self, file_sha256=None, content_sha256=None):
+        return self._find_by_hash("resumes", file_sha256=file_sha256, content_sha256=content_sha256)
+
+    def add_job(self, filename, content, criteria, tags=None, file_sha256=None):
         conn = self.get_connection()
         c = conn.cursor()
-        c.execute("INSERT INTO jobs (filename, content, criteria, tags, upload_date) VALUES (?, ?, ?, ?, ?)",
-                  (filename, content, json.dumps(criteria, indent=2), tags, datetime.datetime.now().isoformat()))
+        c.execute(
+            """INSERT INTO jobs (filename, content, criteria, tags, upload_date, file_sha256, content_sha256)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (filename, content, json.dumps(criteria, indent=2), tags, datetime.datetime.now().isoformat(),
+             file_sha256, self.content_sha256(content)),
+        )
         conn.commit()
         conn.close()
 
-    def update_job_content(self, job_id, content, criteria):
+    def update_job_content(self, job_id, content, criteria, file_sha256=None):
         conn = self.get_connection()
         c = conn.cursor()
-        c.execute("UPDATE jobs SET content = ?, criteria = ?, upload_date = ? WHERE id = ?",
-                  (content, json.dumps(criteria, indent=2), datetime.datetime.now().isoformat(), job_id))
+        c.execute(
+            """UPDATE jobs SET content = ?, criteria = ?, upload_date = ?, content_sha256 = ?,
+                   file_sha256 = COALESCE(?, file_sha256)
+               WHERE id = ?""",
+            (content, json.dumps(criteria, indent=2), datetime.datetime.now().isoformat(),
+             self.content_sha256(content), file_sha256, job_id),
+        )
         conn.commit()
         conn.close()
 
@@ -160,20 +483,29 @@ class DBManager:
         conn.commit()
         conn.close()
 
-    def add_resume(self, filename, content, profile, tags=None):
+    def add_resume(self, filename, content, profile, tags=None, file_sha256=None):
         conn = self.get_connection()
         c = conn.cursor()
-        c.execute("INSERT INTO resumes (filename, content, profile, tags, upload_date) VALUES (?, ?, ?, ?, ?)",
-                  (filename, content, json.dumps(profile, indent=2), tags, datetime.datetime.now().isoformat()))
+        c.execute(
+            """INSERT INTO resumes (filename, content, profile, tags, upload_date, file_sha256, content_sha256)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (filename, content, json.dumps(profile, indent=2), tags, datetime.datetime.now().isoformat(),
+             file_sha256, self.content_sha256(content)),
+        )
         conn.commit()
         conn.close()
 
-    def update_resume_content(self, resume_id, content, profile):
+    def update_resume_content(self, resume_id, content, profile, file_sha256=None):
         conn = self.get_connection()
         c = conn.cursor()
         # Preserve existing tags if not passed? For now just content update.
-        c.execute("UPDATE resumes SET content = ?, profile = ?, upload_date = ? WHERE id = ?",
-                  (content, json.dumps(profile, indent=2), datetime.datetime.now().isoformat(), resume_id))
+        c.execute(
+            """UPDATE resumes SET content = ?, profile = ?, upload_date = ?, content_sha256 = ?,
+                   file_sha256 = COALESCE(?, file_sha256)
+               WHERE id = ?""",
+            (content, json.dumps(profile, indent=2), datetime.datetime.now().isoformat(),
+             self.content_sha256(content), file_sha256, resume_id),
+        )
         conn.commit()
         conn.close()
 
@@ -495,12 +827,174 @@ class DBManager:
             }
         return None
 
-    def fetch_dataframe(self, query):
+    def get_requirement_evidence(self, resume_hash, model, keys):
+        """Return {(category, requirement): {"status", "evidence"}} for the cached subset of *keys*."""
+        wanted = set(keys or [])
+        if not wanted:
+            return {}
+        conn = self.get_connection()
+        c = conn.cursor()
+        # One PK-prefix range scan per resume/model; a resume has at most a few
+        # hundred cached requirements, so filtering in Python beats an IN over pairs.
+        c.execute(
+            "SELECT category, requirement, status, evidence FROM requirement_evidence "
+            "WHERE resume_hash = ? AND model = ?",
+            (str(resume_hash), str(model)),
+        )
+        found = {}
+        for category, requirement, status, evidence in c.fetchall():
+            if (category, requirement) in wanted:
+                found[(category, requirement)] = {"status": status, "evidence": evidence}
+        if found:
+            c.executemany(
+                "UPDATE requirement_evidence SET hit_count = hit_count + 1 "
+                "WHERE resume_hash = ? AND model = ? AND category = ? AND requirement = ?",
+                [(str(resume_hash), str(model), cat, req) for cat, req in found],
+            )
+            conn.commit()
+        conn.close()
+        return found
+
+    def save_requirement_evidence(self, resume_hash, model, rows):
+        """Upsert [(category, requirement, status, evidence), ...] for one resume/model."""
+        rows = list(rows or [])
+        if not rows:
+            return 0
+        now = datetime.datetime.now().isoformat()
+        conn = self.get_connection()
+        c = conn.cursor()
+        c.executemany(
+            '''INSERT INTO requirement_evidence
+               (resume_hash, category, requirement, model, status, evidence, created_at, hit_count)
+               VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+               ON CONFLICT(resume_hash, model, category, requirement)
+               DO UPDATE SET status = excluded.status, evidence = excluded.evidence, created_at = excluded.created_at''',
+            [
+                (str(resume_hash), str(cat), str(req), str(model), str(status), str(evidence), now)
+                for cat, req, status, evidence in rows
+            ],
+        )
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def list_queued_batch_resume_ids(self, batch_id, job_id, limit, exclude_resume_ids=()):
+        """Resume ids of still-queued score_match runs for *job_id* in *batch_id*, oldest first."""
+        exclude = {int(r) for r in (exclude_resume_ids or ())}
+        conn = self.get_connection()
+        c = conn.cursor()
+        c.execute(
+            '''SELECT json_extract(payload_json, '$.resume_id')
+               FROM job_runs
+               WHERE batch_id = ? AND status = 'queued' AND job_type = 'score_match'
+                 AND json_extract(payload_json, '$.job_id') = ?
+               ORDER BY id
+               LIMIT ?''',
+            (int(batch_id), int(job_id), int(limit) + len(exclude)),
+        )
+        ids = []
+        for (resume_id,) in c.fetchall():
+            if resume_id is None or int(resume_id) in exclude or int(resume_id) in ids:
+                continue
+            ids.append(int(resume_id))
+        conn.close()
+        return ids[: int(limit)]
+
+    def save_pass1_handoffs(self, batch_id, rows):
+        """Upsert [(job_id, resume_id, criteria_hash, resume_hash, model, result_dict), ...] for one batch."""
+        rows = list(rows or [])
+        if not rows:
+            return 0
+        now = datetime.datetime.now().isoformat()
+        conn = self.get_connection()
+        c = conn.cursor()
+        c.executemany(
+            '''INSERT OR REPLACE INTO pass1_handoff
+               (batch_id, job_id, resume_id, criteria_hash, resume_hash, model, result, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            [
+                (int(batch_id), int(job_id), int(resume_id), str(ch), str(rh), str(m), json.dumps(result), now)
+                for job_id, resume_id, ch, rh, m, result in rows
+            ],
+        )
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def pop_pass1_handoff(self, batch_id, criteria_hash, resume_hash, model):
+        key = (int(batch_id), str(criteria_hash), str(resume_hash), str(model))
+        where = "batch_id = ? AND criteria_hash = ? AND resume_hash = ? AND model = ?"
+        conn = self.get_connection()
+        c = conn.cursor()
+        try:
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                c.execute(f"DELETE FROM pass1_handoff WHERE {where} RETURNING result", key)
+                row = c.fetchone()
+            else:
+                # Read and delete under one write lock so two runs can't take the same row.
+                c.execute("BEGIN IMMEDIATE")
+                row = c.execute(f"SELECT result FROM pass1_handoff WHERE {where}", key).fetchone()
+                if row:
+                    c.execute(f"DELETE FROM pass1_handoff WHERE {where}", key)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        if not row:
+            return None
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def fetch_dataframe(self, query, params=None):
+        # pandas is imported on demand (exports/analysis only) so that importing
+        # this module, and therefore starting the API server, stays cheap.
+        import pandas as pd
+
         conn = self.get_connection()
-        df = pd.read_sql(query, conn)
+        df = pd.read_sql(query, conn, params=params)
         conn.close()
         return df
 
+    # --- Row-based read helpers (sqlite3.Row supports both row["col"] and row[0]) ---
+    def fetch_one(self, query, params=()):
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.row_factory = sqlite3.Row
+            c.execute(query, params)
+            return c.fetchone()
+        finally:
+            conn.close()
+
+    def fetch_all(self, query, params=()):
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.row_factory = sqlite3.Row
+            c.execute(query, params)
+            return c.fetchall()
+        finally:
+            conn.close()
+
+    def iterate(self, query, params=(), batch_size=500):
+        """Yield rows lazily; the connection is held until the generator is exhausted or closed."""
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.row_factory = sqlite3.Row
+            c.execute(query, params)
+            while True:
+                batch = c.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            conn.close()
+
     def execute_query(self, query, params=()):
         conn = self.get_connection()
         c = conn.cursor()
@@ -510,18 +1004,72 @@ class DBManager:
 
     # --- Background run queue methods ---
     def enqueue_job_run(self, job_type, payload):
+        batch_id = (payload or {}).get("batch_id")
         conn = self.get_connection()
         c = conn.cursor()
         c.execute(
-            '''INSERT INTO job_runs (job_type, payload_json, status, progress, created_at)
-               VALUES (?, ?, 'queued', 0, ?)''',
-            (job_type, json.dumps(payload or {}), datetime.datetime.now().isoformat()),
+            '''INSERT INTO job_runs (job_type, payload_json, status, progress, created_at, batch_id)
+               VALUES (?, ?, 'queued', 0, ?, ?)''',
+            (
+                job_type,
+                json.dumps(payload or {}),
+                datetime.datetime.now().isoformat(),
+                int(batch_id) if batch_id else None,
+            ),
         )
         run_id = c.lastrowid
         conn.commit()
         conn.close()
         return run_id
 
+    def enqueue_job_run_batch(self, job_type, payloads, label=None):
+        """
+        Create a job_batches row and enqueue one run per payload with a single
+        executemany in the same transaction. Each payload gets "batch_id" set.
+        Returns (batch_id, run_ids) with run_ids in payload order.
+        """
+        payloads = [dict(p or {}) for p in (payloads or [])]
+        now_iso = datetime.datetime.now().isoformat()
+        conn = self.get_connection()
+        c = conn.cursor()
+        try:
+            c.execute("BEGIN IMMEDIATE")
+            # total_runs/queued_runs are filled in by trg_job_runs_batch_insert.
+            c.execute(
+                "INSERT INTO job_batches (label, job_type, total_runs, created_at) VALUES (?, ?, 0, ?)",
+                (label, job_type, now_iso),
+            )
+            batch_id = int(c.lastrowid)
+            for p in payloads:
+                p["batch_id"] = batch_id
+            run_ids = []
+            if payloads:
+                c.executemany(
+                    '''INSERT INTO job_runs (job_type, payload_json, status, progress, created_at, batch_id)
+                       VALUES (?, ?, 'queued', 0, ?, ?)''',
+                    [(job_type, json.dumps(p), now_iso, batch_id) for p in payloads],
+                )
+                # Rowids are allocated consecutively while this transaction holds the write lock.
+                last_id = int(c.execute("SELECT last_insert_rowid()").fetchone()[0])
+                run_ids = list(range(last_id - len(payloads) + 1, last_id + 1))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return batch_id, run_ids
+
+    def get_job_batch(self, batch_id):
+        row = self.fetch_one(
+            '''SELECT id, label, job_type, total_runs, queued_runs, running_runs, paused_runs,
+                      completed_runs, failed_runs, canceled_runs, skipped_runs, created_at, started_at,
+                      last_finished_at
+               FROM job_batches WHERE id = ?''',
+            (int(batch_id),),
+        )
+        return dict(row) if row else None
+
     def _row_to_job_run(self, row):
         return {
             "id": row[0],
@@ -602,30 +1150,26 @@ class DBManager:
 
     def _normalize_active_queue_locked(self, cursor, max_running=1):
         """
-        Ensure strict single-run semantics:
-        - Active queue order is by lowest id among queued/running/paused.
-        - If multiple rows are marked running due to stale state/reload edge cases,
-          keep only the front active row as-is and demote later running rows to queued.
-        Returns:
-            active_rows: list[(id, status)] sorted by id for status in queued/running/paused
-            fixed_count: number of rows demoted from running -> queued
+        Repair stale queue state (rare; runs on startup and on a timer, not per claim):
+        - If more rows are marked running than max_running allows due to stale
+          state/reload edge cases, keep the lowest-id running rows and demote the
+          later ones back to queued.
+        Returns the number of rows demoted from running -> queued.
         """
+        cursor.execute("SELECT id FROM job_runs WHERE status = 'running' ORDER BY id ASC")
+        running_ids = [int(r[0]) for r in (cursor.fetchall() or [])]
+        max_running = max(1, int(max_running or 1))
+        if len(running_ids) <= max_running:
+            return 0
+
         cursor.execute(
-            "SELECT id, status FROM job_runs WHERE status IN ('queued', 'running', 'paused') ORDER BY id ASC"
+            "SELECT id FROM job_runs WHERE status IN ('queued', 'running', 'paused') ORDER BY id ASC LIMIT 1"
         )
-        active_rows = [(int(r[0]), str(r[1] or "")) for r in (cursor.fetchall() or [])]
-        if not active_rows:
-            return [], 0
-
-        max_running = max(1, int(max_running or 1))
-        head_id = active_rows[0][0]
+        head = cursor.fetchone()
+        head_id = int(head[0]) if head else running_ids[0]
         fixed = 0
         now_iso = datetime.datetime.now().isoformat()
-        running_ids = [rid for rid, status in active_rows if status == "running"]
-        keep_running = set(running_ids[:max_running])
-        for run_id, status in active_rows:
-            if status != "running" or run_id in keep_running:
-                continue
+        for run_id in running_ids[max_running:]:
             cursor.execute(
                 """
                 UPDATE job_runs
@@ -651,21 +1195,35 @@ class DBManager:
                         now_iso,
                     ),
                 )
+        return fixed
 
-        if fixed:
-            cursor.execute(
-                "SELECT id, status FROM job_runs WHERE status IN ('queued', 'running', 'paused') ORDER BY id ASC"
-            )
-            active_rows = [(int(r[0]), str(r[1] or "")) for r in (cursor.fetchall() or [])]
-        return active_rows, fixed
+    def _record_queue_normalization(self, fixed):
+        now_iso = datetime.datetime.now().isoformat()
+        with self._queue_normalize_lock:
+            stats = self._queue_normalize_stats
+            stats["runs"] += 1
+            stats["last_run_at"] = now_iso
+            if fixed:
+                stats["runs_with_fixes"] += 1
+                stats["rows_fixed"] += int(fixed)
+                stats["last_fixed_at"] = now_iso
+
+    def queue_normalization_stats(self):
+        with self._queue_normalize_lock:
+            return dict(self._queue_normalize_stats)
 
     def normalize_active_queue(self, max_running=1):
         conn = self.get_connection()
         c = conn.cursor()
-        active_rows, fixed = self._normalize_active_queue_locked(c, max_running=max_running)
+        try:
+            c.execute("BEGIN IMMEDIATE")
+        except Exception:
+            pass
+        fixed = self._normalize_active_queue_locked(c, max_running=max_running)
         conn.commit()
         conn.close()
-        return {"active": active_rows, "fixed": int(fixed)}
+        self._record_queue_normalization(fixed)
+        return {"fixed": int(fixed)}
 
     def recover_running_runs_after_restart(self):
         """
@@ -738,52 +1296,87 @@ class DBManager:
                 )
 
         # Re-apply strict single-run normalization after recovery.
-        self._normalize_active_queue_locked(c, max_running=1)
+        fixed = self._normalize_active_queue_locked(c, max_running=1)
         conn.commit()
         conn.close()
+        self._record_queue_normalization(fixed)
         return {"requeued": requeued, "paused": paused}
 
     def claim_next_job_run(self, max_running=1):
+        runs = self.claim_next_job_runs(1, max_running=max_running)
+        return runs[0] if runs else None
+
+    def claim_next_job_runs(self, limit=1, max_running=1):
+        """
+        Atomically move up to `limit` queued runs (lowest id first) to running,
+        bounded by the free `max_running` slots, and return their full rows.
+        Claim and re-read happen in a single write transaction.
+        """
         conn = self.get_connection()
         c = conn.cursor()
         try:
             c.execute("BEGIN IMMEDIATE")
         except Exception:
             pass
-        active_rows, _ = self._normalize_active_queue_locked(c, max_running=max_running)
-        if not active_rows:
-            conn.commit()
-            conn.close()
-            return None
-        # Paused queue always blocks new claims until explicit unpause.
-        if any(status == "paused" for _, status in active_rows):
-            conn.commit()
-            conn.close()
-            return None
-        running = sum(1 for _, status in active_rows if status == "running")
-        if running >= max(1, int(max_running or 1)):
-            conn.commit()
-            conn.close()
-            return None
-        queued_ids = [rid for rid, status in active_rows if status == "queued"]
-        if not queued_ids:
+        try:
+            # Index-only probes on idx_job_runs_status_id; stale-state repair is
+            # left to normalize_active_queue (startup + timer).
+            # Paused queue always blocks new claims until explicit unpause.
+            c.execute("SELECT 1 FROM job_runs WHERE status = 'paused' LIMIT 1")
+            if c.fetchone():
+                conn.commit()
+                return []
+            c.execute("SELECT COUNT(*) FROM job_runs WHERE status = 'running'")
+            running = int((c.fetchone() or [0])[0] or 0)
+            slots = min(max(1, int(limit or 1)), max(1, int(max_running or 1)) - running)
+            if slots <= 0:
+                conn.commit()
+                return []
+            now_iso = datetime.datetime.now().isoformat()
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                c.execute(
+                    '''UPDATE job_runs
+                       SET status = 'running', started_at = ?, current_step = ?, progress = 1
+                       WHERE id IN (SELECT id FROM job_runs WHERE status = 'queued' ORDER BY id ASC LIMIT ?)
+                         AND status = 'queued'
+                       RETURNING id, job_type, payload_json, status, progress, current_step, error,
+                                 result_json, created_at, started_at, finished_at,
+                                 (SELECT MAX(l.created_at) FROM job_run_logs l WHERE l.run_id = job_runs.id)''',
+                    (now_iso, "started", int(slots)),
+                )
+                rows = c.fetchall() or []
+            else:
+                c.execute(
+                    "SELECT id FROM job_runs WHERE status = 'queued' ORDER BY id ASC LIMIT ?",
+                    (int(slots),),
+                )
+                ids = [int(r[0]) for r in (c.fetchall() or [])]
+                rows = []
+                if ids:
+                    marks = ",".join("?" for _ in ids)
+                    c.execute(
+                        f'''UPDATE job_runs
+                            SET status = 'running', started_at = ?, current_step = ?, progress = 1
+                            WHERE id IN ({marks}) AND status = 'queued' ''',
+                        (now_iso, "started", *ids),
+                    )
+                    c.execute(
+                        f'''SELECT jr.id, jr.job_type, jr.payload_json, jr.status, jr.progress, jr.current_step, jr.error,
+                                  jr.result_json, jr.created_at, jr.started_at, jr.finished_at,
+                                  (SELECT MAX(l.created_at) FROM job_run_logs l WHERE l.run_id = jr.id)
+                           FROM job_runs jr
+                           WHERE jr.id IN ({marks}) AND jr.status = 'running' AND jr.started_at = ?''',
+                        (*ids, now_iso),
+                    )
+                    rows = c.fetchall() or []
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
             conn.close()
-            return None
-        run_id = int(queued_ids[0])
-
-        c.execute(
-            '''UPDATE job_runs
-               SET status = 'running', started_at = ?, current_step = ?, progress = 1
-               WHERE id = ? AND status = 'queued' ''',
-            (datetime.datetime.now().isoformat(), "started", run_id),
-        )
-        changed = c.rowcount
-        conn.commit()
-        conn.close()
-        if changed != 1:
-            return None
-        return self.get_job_run(run_id)
+        # RETURNING order is unspecified; hand runs out in queue order.
+        return sorted((self._row_to_job_run(r) for r in rows), key=lambda run: int(run["id"]))
 
     def try_set_group_flag(self, flag_key):
         key = str(flag_key or "").strip()
@@ -1004,30 +1597,54 @@ class DBManager:
         conn.close()
         return changed == 1
 
-    def append_job_run_log(self, run_id, level, message):
+    def append_job_run_log(self, run_id, level, message, created_at=None):
         conn = self.get_connection()
         c = conn.cursor()
         c.execute(
             '''INSERT INTO job_run_logs (run_id, level, message, created_at)
                VALUES (?, ?, ?, ?)''',
-            (int(run_id), str(level), str(message), datetime.datetime.now().isoformat()),
+            (int(run_id), str(level), str(message), created_at or datetime.datetime.now().isoformat()),
         )
         log_id = c.lastrowid
         conn.commit()
         conn.close()
         return int(log_id)
 
-    def list_job_run_logs(self, run_id, limit=500):
+    def list_job_run_logs(self, run_id, limit=500, after_id=None, before_id=None):
+        """
+        Keyset pages over idx_job_run_logs_run_id_id.
+        - after_id: rows with id > after_id, oldest first (tailing).
+        - otherwise: newest rows first, optionally only ids < before_id (scrolling back).
+        """
         conn = self.get_connection()
         c = conn.cursor()
-        c.execute(
-            '''SELECT id, run_id, level, message, created_at
-               FROM job_run_logs
-               WHERE run_id = ?
-               ORDER BY id DESC
-               LIMIT ?''',
-            (int(run_id), int(limit)),
-        )
+        if after_id is not None:
+            c.execute(
+                '''SELECT id, run_id, level, message, created_at
+                   FROM job_run_logs
+                   WHERE run_id = ? AND id > ?
+                   ORDER BY id ASC
+                   LIMIT ?''',
+                (int(run_id), int(after_id), int(limit)),
+            )
+        elif before_id is not None:
+            c.execute(
+                '''SELECT id, run_id, level, message, created_at
+                   FROM job_run_logs
+                   WHERE run_id = ? AND id < ?
+                   ORDER BY id DESC
+                   LIMIT ?''',
+                (int(run_id), int(before_id), int(limit)),
+            )
+        else:
+            c.execute(
+                '''SELECT id, run_id, level, message, created_at
+                   FROM job_run_logs
+                   WHERE run_id = ?
+                   ORDER BY id DESC
+                   LIMIT ?''',
+                (int(run_id), int(limit)),
+            )
         rows = c.fetchall()
         conn.close()
         return [
@@ -1,19 +1,30 @@
 import pypdf
 import docx
 import io
-import pytesseract
 import json
+import multiprocessing
+import os
 import re
 import ast
 import string
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image
 
 try:
-    from pdf2image import convert_from_bytes
+    from pdf2image import convert_from_path, pdfinfo_from_bytes
     PDF2IMAGE_AVAILABLE = True
 except ImportError:
     PDF2IMAGE_AVAILABLE = False
 
+def _load_pytesseract():
+    # pytesseract eagerly imports pandas when it is installed; defer it to the
+    # OCR path so importing this module (and the API server) stays cheap.
+    import pytesseract
+    return pytesseract
+
 def clean_extracted_text(text):
     """
     Removes non-printable characters and normalizes whitespace.
@@ -78,69 +89,376 @@ def extract_text_from_docx(file_bytes):
     except Exception as e:
         return f"Error reading DOCX: {e}"
 
-def extract_text_from_pdf(file_bytes, use_ocr=False, log_callback=None):
+OCR_TESSERACT_CONFIG = "--psm 3"
+OCR_DEFAULT_DPI_STEPS = (300,)
+# Opt-in (RESUME_MATCHER_OCR_DPI_STEPS=adaptive): render cheaply first and only
+# re-render pages whose mean word confidence stays below the threshold. Neither
+# the ladder nor the threshold is the default until benchmarks/bench_ocr.py
+# shows it beating fixed 300 DPI on real scans.
+OCR_ADAPTIVE_DPI_STEPS = (200, 300, 400)
+OCR_DEFAULT_MIN_CONFIDENCE = 75.0
+OCR_PREPROCESS_STEPS = ("grayscale", "binarize", "deskew")
+
+
+def _ocr_settings():
     """
-    Advanced PDF extraction with native-to-OCR fallback.
-    Triggers OCR if:
-    1. Native extraction crashes completely.
-    2. Any single page fails (partial failure).
-    3. Extracted text quality is low.
+    OCR pipeline settings from the environment:
+    RESUME_MATCHER_OCR_DPI_STEPS ("adaptive" or e.g. "200,300,400"), or
+    RESUME_MATCHER_OCR_DPI for a single fixed DPI (300);
+    RESUME_MATCHER_OCR_MIN_CONFIDENCE (75), only used between DPI steps; and
+    RESUME_MATCHER_OCR_PREPROCESS, a comma list of grayscale/binarize/deskew (off).
     """
-    def log(msg):
-        if log_callback:
-            log_callback(msg)
-        print(f"[DEBUG] PDF: {msg}")
+    steps_raw = str(os.getenv("RESUME_MATCHER_OCR_DPI_STEPS", "") or "").strip()
+    fixed_raw = str(os.getenv("RESUME_MATCHER_OCR_DPI", "") or "").strip()
+    if steps_raw.lower() == "adaptive":
+        steps_raw = ",".join(str(dpi) for dpi in OCR_ADAPTIVE_DPI_STEPS)
+    dpi_steps = []
+    for part in (steps_raw or fixed_raw).split(","):
+        try:
+            dpi = int(part.strip())
+        except ValueError:
+            continue
+        if 50 <= dpi <= 1200 and dpi not in dpi_steps:
+            dpi_steps.append(dpi)
+    try:
+        min_confidence = float(os.getenv("RESUME_MATCHER_OCR_MIN_CONFIDENCE", "") or OCR_DEFAULT_MIN_CONFIDENCE)
+    except ValueError:
+        min_confidence = OCR_DEFAULT_MIN_CONFIDENCE
+    preprocess = [
+        step for step in (p.strip().lower() for p in str(os.getenv("RESUME_MATCHER_OCR_PREPROCESS", "") or "").split(","))
+        if step in OCR_PREPROCESS_STEPS
+    ]
+    return {
+        "dpi_steps": tuple(sorted(dpi_steps)) or OCR_DEFAULT_DPI_STEPS,
+        "min_confidence": min_confidence,
+        "preprocess": tuple(preprocess),
+    }
 
-    text = ""
-    native_failed = False
-    partial_failure = False # Track if specific pages failed
 
-    # 1. Try Native Extraction first
+def _ocr_worker_count():
+    raw = str(os.getenv("RESUME_MATCHER_OCR_WORKERS", "") or "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _init_ocr_worker():
+    # One tesseract thread per worker process; parallelism comes from the pool.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+_ocr_pool = None
+_ocr_pool_workers = 0
+_ocr_pool_lock = threading.Lock()
+
+
+def _get_ocr_pool(workers):
+    """Shared process pool for OCR; rebuilt only when the worker count changes."""
+    global _ocr_pool, _ocr_pool_workers
+    with _ocr_pool_lock:
+        if _ocr_pool is None or _ocr_pool_workers != workers:
+            if _ocr_pool is not None:
+                _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: the API process runs threads (LLM loop, job workers) that must not be forked.
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+            )
+            _ocr_pool_workers = workers
+        return _ocr_pool
+
+
+def _discard_ocr_pool():
+    global _ocr_pool, _ocr_pool_workers
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+        _ocr_pool = None
+        _ocr_pool_workers = 0
+
+
+def _otsu_threshold(gray):
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best_t, best_var = 127, -1.0
+    for t, h in enumerate(hist):
+        weight_bg += h
+        if not weight_bg or weight_bg == total:
+            continue
+        sum_bg += t * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / (total - weight_bg)
+        between = weight_bg * (total - weight_bg) * (mean_bg - mean_fg) ** 2
+        if between > best_var:
+            best_t, best_var = t, between
+    return best_t
+
+
+def _estimate_skew(gray, max_angle=5.0, step=0.5):
+    """
+    Skew angle in degrees by projection profile: text lines give the sharpest
+    row-darkness profile when level. Row means come from a 1-pixel-wide BOX
+    resize, so each candidate angle costs one C-level rotate + resize.
+    """
+    small = gray.copy()
+    small.thumbnail((800, 800))
+    inverted = small.point(lambda p: 255 - p)
+    best_angle, best_score = 0.0, -1.0
+    angle = -max_angle
+    while angle <= max_angle + 1e-9:
+        rotated = inverted.rotate(angle, resample=Image.BILINEAR, expand=False, fillcolor=0)
+        rows = list(rotated.resize((1, rotated.height), Image.BOX).tobytes())
+        mean = sum(rows) / len(rows)
+        score = sum((r - mean) ** 2 for r in rows)
+        if score > best_score:
+            best_angle, best_score = angle, score
+        angle += step
+    return best_angle
+
+
+def preprocess_page_image(img, steps):
+    """Optional Pillow clean-up before OCR: grayscale, Otsu binarization, deskew."""
+    steps = set(steps or ())
+    if not steps:
+        return img
+    gray = img.convert("L")
+    if "deskew" in steps:
+        angle = _estimate_skew(gray)
+        if abs(angle) >= 0.25:
+            gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    if "binarize" in steps:
+        threshold = _otsu_threshold(gray)
+        gray = gray.point(lambda p: 255 if p > threshold else 0)
+    return gray
+
+
+def _text_from_tesseract_data(data):
+    """Rebuild page text from image_to_data output: words -> lines -> paragraphs."""
+    paragraphs = []
+    current_par, current_line = None, None
+    lines, words = [], []
+    for i, word in enumerate(data.get("text", [])):
+        word = str(word or "").strip()
+        if not word:
+            continue
+        par_key = (data["block_num"][i], data["par_num"][i])
+        line_key = par_key + (data["line_num"][i],)
+        if line_key != current_line and words:
+            lines.append(" ".join(words))
+            words = []
+        if par_key != current_par and lines:
+            paragraphs.append("\n".join(lines))
+            lines = []
+        current_par, current_line = par_key, line_key
+        words.append(word)
+    if words:
+        lines.append(" ".join(words))
+    if lines:
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+def _mean_word_confidence(data):
+    confs = []
+    for word, conf in zip(data.get("text", []), data.get("conf", [])):
+        try:
+            conf = float(conf)
+        except (TypeError, ValueError):
+            continue
+        if conf >= 0 and str(word or "").strip():
+            confs.append(conf)
+    return (sum(confs) / len(confs)) if confs else 0.0
+
+
+def _ocr_page(pdf_path, page_no, settings=None):
+    """
+    Render one page (1-based) and OCR it; runs inside an OCR worker process.
+
+    Tries each DPI in settings["dpi_steps"] from lowest to highest and stops at
+    the first whose mean word confidence reaches settings["min_confidence"];
+    otherwise keeps the most confident attempt. Returns
+    {"text", "dpi", "confidence", "attempts"}.
+    """
+    settings = settings or _ocr_settings()
+    pytesseract = _load_pytesseract()
+    best = None
+    attempts = 0
+    for dpi in settings["dpi_steps"]:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=page_no, last_page=page_no)
+        attempts += 1
+        try:
+            texts, confs, blank = [], [], True
+            for img in images:
+                prepared = preprocess_page_image(img, settings.get("preprocess"))
+                data = pytesseract.image_to_data(
+                    prepared, config=OCR_TESSERACT_CONFIG, output_type=pytesseract.Output.DICT
+                )
+                texts.append(_text_from_tesseract_data(data))
+                confs.append(_mean_word_confidence(data))
+                low, high = prepared.convert("L").getextrema()
+                blank = blank and high - low < 16
+        finally:
+            for img in images:
+                img.close()
+        result = {
+            "text": "\n".join(texts),
+            "dpi": dpi,
+            "confidence": round(min(confs) if confs else 0.0, 1),
+            "attempts": attempts,
+        }
+        if best is None or result["confidence"] > best["confidence"]:
+            best = result
+        best["attempts"] = attempts
+        # A blank page has no words at any DPI; don't escalate it.
+        if result["confidence"] >= settings["min_confidence"] or (blank and not result["text"].strip()):
+            break
+    return best or {"text": "", "dpi": None, "confidence": 0.0, "attempts": attempts}
+
+
+def _native_pages(file_bytes, log):
+    """
+    Native text per page with pypdf. Returns (pages, crashed) where pages[i] is
+    the text of page i+1, or None when that page failed to extract.
+    """
     try:
-        log("Attempting native PDF extraction...")
         pdf_reader = pypdf.PdfReader(io.BytesIO(file_bytes))
+        pages = []
         for i, page in enumerate(pdf_reader.pages):
             try:
-                content = page.extract_text()
-                if content:
-                    text += content + "\n"
+                pages.append(page.extract_text() or "")
             except Exception as e:
                 log(f"Page {i+1} extraction warning: {e}")
-                partial_failure = True # Mark that at least one page failed
-                continue
+                pages.append(None)
+        return pages, False
     except Exception as e:
         log(f"Native extraction crashed: {e}")
-        native_failed = True
+        return [], True
+
+
+def _ocr_pages(file_bytes, page_numbers, log, workers=None, settings=None):
+    """
+    OCR the given 1-based pages and return {page_no: text}.
+
+    Pages are rendered lazily one at a time (pdf2image first_page/last_page), so
+    memory holds at most one page image per worker instead of the whole document.
+    With more than one worker, pages run on a shared process pool; a broken pool
+    falls back to OCR in this process for whatever is left.
+    """
+    workers = _ocr_worker_count() if workers is None else max(1, int(workers))
+    settings = settings or _ocr_settings()
+    results = {}
+
+    def _done(n, detail):
+        results[n] = detail.get("text") or ""
+        log(f"OCR Page {n} done (dpi {detail.get('dpi')}, confidence {detail.get('confidence')}).")
+
+    with tempfile.TemporaryDirectory(prefix="resume_ocr_") as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "input.pdf")
+        with open(pdf_path, "wb") as fh:
+            fh.write(file_bytes)
+        pending = list(page_numbers)
+        if workers > 1 and len(pending) > 1:
+            try:
+                pool = _get_ocr_pool(workers)
+                futures = {pool.submit(_ocr_page, pdf_path, n, settings): n for n in pending}
+                for fut in as_completed(futures):
+                    n = futures[fut]
+                    try:
+                        _done(n, fut.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        log(f"OCR Page {n} failed: {e}")
+                        results[n] = ""
+            except BrokenProcessPool as e:
+                log(f"OCR worker pool failed ({e}); continuing in-process.")
+                _discard_ocr_pool()
+            pending = [n for n in pending if n not in results]
+        for n in pending:
+            log(f"OCR Page {n}...")
+            try:
+                _done(n, _ocr_page(pdf_path, n, settings))
+            except Exception as e:
+                log(f"OCR Page {n} failed: {e}")
+                results[n] = ""
+    return results
+
+
+PAGE_OCR_QUALITY_THRESHOLD = 50
+
+
+def _page_needs_ocr(page_text):
+    """A page is OCR'd when native extraction failed, found (almost) nothing, or looks garbled."""
+    return page_text is None or calculate_text_quality(page_text) < PAGE_OCR_QUALITY_THRESHOLD
+
+
+def _better_page_text(native, ocr):
+    if not native:
+        return ocr or ""
+    if not ocr:
+        return native
+    native_q, ocr_q = calculate_text_quality(native), calculate_text_quality(ocr)
+    if native_q == ocr_q:
+        return ocr if len(ocr.strip()) > len(native.strip()) else native
+    return ocr if ocr_q > native_q else native
+
+
+def extract_text_from_pdf(file_bytes, use_ocr=False, log_callback=None):
+    """
+    Advanced PDF extraction with native-to-OCR fallback, decided per page.
+    A page is OCR'd if:
+    1. Native extraction crashed completely (every page).
+    2. That page failed to extract.
+    3. That page's text quality is low (calculate_text_quality < 50, which
+       includes image-only pages with no text layer).
+    OCR output is merged back in page order, keeping native text for good pages.
+    OCR runs page by page on a process pool (RESUME_MATCHER_OCR_WORKERS).
+    """
+    def log(msg):
+        if log_callback:
+            log_callback(msg)
+        print(f"[DEBUG] PDF: {msg}")
+
+    # 1. Try Native Extraction first
+    log("Attempting native PDF extraction...")
+    pages, native_failed = _native_pages(file_bytes, log)
+    text = "".join(p + "\n" for p in pages if p)
 
-    # 2. Assess Quality
+    # 2. Assess Quality, overall and per page
     quality = calculate_text_quality(text)
     log(f"Native Quality Score: {quality}/100")
+    bad_pages = [i + 1 for i, page_text in enumerate(pages) if _page_needs_ocr(page_text)]
+    if not native_failed and not bad_pages and (len(text.strip()) < 150 or quality < 50):
+        # Every page passes on its own but the document as a whole doesn't; redo all of it.
+        bad_pages = list(range(1, len(pages) + 1))
 
     # 3. OCR Fallback Logic
-    # Trigger if:
-    # a) Native extraction crashed completely
-    # b) Any specific page failed (partial_failure) <-- NEW CHECK
-    # c) Text is too short (< 150 chars)
-    # d) Quality is garbage (< 50)
-    should_use_ocr = (native_failed or partial_failure or len(text.strip()) < 150 or quality < 50) and use_ocr
+    should_use_ocr = (native_failed or bool(bad_pages)) and use_ocr
 
     if should_use_ocr:
-        reason = "Partial Page Failure" if partial_failure else "Low Quality/Crash"
+        reason = "Native Crash" if native_failed else f"{len(bad_pages)}/{len(pages)} Bad Page(s)"
 
         if not PDF2IMAGE_AVAILABLE:
             log(f"OCR needed ({reason}) but dependencies missing.")
             return text if len(text.strip()) > 50 else "[Error: OCR required but dependencies missing]"
 
-        log(f"⚠️ {reason} detected. Triggering OCR Fallback...")
         try:
-            images = convert_from_bytes(file_bytes, dpi=300)
-            ocr_text = ""
-            for i, img in enumerate(images):
-                log(f"OCR Page {i+1}...")
-                page_text = pytesseract.image_to_string(img, config='--psm 3')
-                ocr_text += page_text + "\n"
-
-            final_text = clean_extracted_text(ocr_text)
+            if native_failed:
+                pages = [None] * int(pdfinfo_from_bytes(file_bytes).get("Pages") or 0)
+                bad_pages = list(range(1, len(pages) + 1))
+            log(f"⚠️ {reason} detected. OCR for page(s) {', '.join(str(n) for n in bad_pages)}...")
+            page_texts = _ocr_pages(file_bytes, bad_pages, log)
+            merged = [
+                _better_page_text(native, page_texts.get(n)) if n in page_texts else (native or "")
+                for n, native in enumerate(pages, start=1)
+            ]
+            final_text = clean_extracted_text("".join(p + "\n" for p in merged if p))
             log(f"OCR Complete. Final Score: {calculate_text_quality(final_text)}/100")
             return final_text
         except Exception as e:
@@ -0,0 +1,374 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+
+def _env_number(name, default):
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return float(default)
+
+
+class LLMGovernor:
+    """
+    Admission control for LLM requests: a concurrency ceiling plus token buckets
+    for requests/minute and estimated tokens/minute (0 disables a bucket).
+
+    The effective concurrency adapts AIMD-style: it halves and a cooldown starts
+    on 429/5xx/timeouts, and it grows back by one after a run of successes. A 429
+    is retried after the cooldown since the server never processed the request.
+    All admission state is touched only from the LLM loop thread; the lock exists
+    so that stats() and configure() can be called from anywhere.
+    """
+
+    MIN_BACKOFF_SEC = 1.0
+    MAX_BACKOFF_SEC = 60.0
+
+    def __init__(self, max_concurrency=None, rpm=None, tpm=None, rate_limit_retries=None):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._changed = None
+        self.max_concurrency = 1
+        self.effective_concurrency = 1
+        self.rpm = 0
+        self.tpm = 0
+        self._req_bucket = 0.0
+        self._tok_bucket = 0.0
+        self._last_refill = time.monotonic()
+        self._cooldown_until = 0.0
+        self._backoff_sec = 0.0
+        self._success_streak = 0
+        self.rate_limit_retries = max(0, int(
+            rate_limit_retries
+            if rate_limit_retries is not None
+            else _env_number("RESUME_MATCHER_LLM_RATE_LIMIT_RETRIES", 2)
+        ))
+        self.configure(
+            max_concurrency=max_concurrency
+            if max_concurrency is not None
+            else _env_number("RESUME_MATCHER_LLM_MAX_INFLIGHT", 8),
+            rpm=rpm if rpm is not None else _env_number("RESUME_MATCHER_LLM_RPM", 0),
+            tpm=tpm if tpm is not None else _env_number("RESUME_MATCHER_LLM_TPM", 0),
+        )
+        self._recent = deque()  # (monotonic start time, tokens) over the last minute
+        self._inflight = 0
+        self._waiting = 0
+        self._peak_inflight = 0
+        self._counters = {
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "timeouts": 0,
+            "backoffs": 0,
+            "retries": 0,
+            "tokens_used": 0,
+        }
+        self._wait_sec_total = 0.0
+
+    def bind(self, loop):
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def configure(self, max_concurrency=None, rpm=None, tpm=None):
+        with self._lock:
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, int(max_concurrency))
+                if self._backoff_sec:
+                    # Backing off: never raise the adaptive limit here, only clamp it.
+                    self.effective_concurrency = min(self.effective_concurrency, self.max_concurrency)
+                else:
+                    self.effective_concurrency = self.max_concurrency
+            if rpm is not None and max(0, int(rpm)) != self.rpm:
+                self.rpm = max(0, int(rpm))
+                self._req_bucket = float(self.rpm)
+            if tpm is not None and max(0, int(tpm)) != self.tpm:
+                self.tpm = max(0, int(tpm))
+                self._tok_bucket = float(self.tpm)
+        self._wake_threadsafe()
+
+    def _wake_threadsafe(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    @staticmethod
+    def estimate_tokens(messages, max_tokens=None):
+        chars = sum(len(str(m.get("content") or "")) for m in (messages or []))
+        # ~4 chars/token for English prompts; completions are budgeted at max_tokens.
+        return int(chars / 4) + int(max_tokens or 512)
+
+    @staticmethod
+    def estimate_used_tokens(messages, completion_text):
+        """Same ~4 chars/token rule, for a finished call whose server sent no usage."""
+        chars = sum(len(str(m.get("content") or "")) for m in (messages or []))
+        return int(chars / 4) + int(len(completion_text or "") / 4)
+
+    def _refill_locked(self, now):
+        elapsed = max(0.0, now - self._last_refill)
+        self._last_refill = now
+        if self.rpm:
+            self._req_bucket = min(float(self.rpm), self._req_bucket + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tok_bucket = min(float(self.tpm), self._tok_bucket + elapsed * self.tpm / 60.0)
+
+    def _admit_delay(self, est_tokens):
+        """0 = admitted (slot and budget taken); None = wait for a release; else seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            self._refill_locked(now)
+            if now < self._cooldown_until:
+                return self._cooldown_until - now
+            if self._inflight >= self.effective_concurrency:
+                return None
+            if self.rpm and self._req_bucket < 1.0:
+                return (1.0 - self._req_bucket) * 60.0 / self.rpm
+            need = min(float(est_tokens), float(self.tpm)) if self.tpm else 0.0
+            if self.tpm and self._tok_bucket < need:
+                return (need - self._tok_bucket) * 60.0 / self.tpm
+            if self.rpm:
+                self._req_bucket -= 1.0
+            self._tok_bucket -= need
+            self._inflight += 1
+            self._peak_inflight = max(self._peak_inflight, self._inflight)
+            self._counters["started"] += 1
+            self._recent.append([now, int(est_tokens)])
+            return 0
+
+    async def _acquire(self, est_tokens):
+        started = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                delay = self._admit_delay(est_tokens)
+                if delay == 0:
+                    return
+                changed = self._changed
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                self._wait_sec_total += time.monotonic() - started
+
+    @staticmethod
+    def classify_error(exc):
+        if isinstance(exc, asyncio.CancelledError):
+            return "cancelled"
+        status = getattr(exc, "status_code", None)
+        name = type(exc).__name__
+        if status == 429 or "RateLimit" in name:
+            return "rate_limited"
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or "Timeout" in name:
+            return "timeout"
+        if (isinstance(status, int) and status >= 500) or name == "APIConnectionError":
+            return "server_error"
+        return "error"
+
+    @staticmethod
+    def _retry_after(exc):
+        try:
+            headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+            return max(0.0, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _release(self, outcome, est_tokens=0, actual_tokens=None, exc=None):
+        now = time.monotonic()
+        with self._lock:
+            self._inflight -= 1
+            if outcome == "ok":
+                self._counters["completed"] += 1
+                used = int(actual_tokens or est_tokens or 0)
+                self._counters["tokens_used"] += used
+                if actual_tokens and self.tpm:
+                    # Settle the estimate against what the server reported.
+                    self._tok_bucket -= float(actual_tokens) - min(float(est_tokens), float(self.tpm))
+                if actual_tokens and self._recent:
+                    self._recent[-1][1] = int(actual_tokens)
+                self._backoff_sec = 0.0
+                self._success_streak += 1
+                if (
+                    self.effective_concurrency < self.max_concurrency
+                    and self._success_streak >= self.effective_concurrency
+                ):
+                    self.effective_concurrency += 1
+                    self._success_streak = 0
+            elif outcome in ("rate_limited", "server_error", "timeout"):
+                key = {"rate_limited": "rate_limited", "server_error": "server_errors", "timeout": "timeouts"}[outcome]
+                self._counters[key] += 1
+                self._counters["failed"] += 1
+                self._counters["backoffs"] += 1
+                self._success_streak = 0
+                self.effective_concurrency = max(1, self.effective_concurrency // 2)
+                self._backoff_sec = min(self.MAX_BACKOFF_SEC, max(self.MIN_BACKOFF_SEC, self._backoff_sec * 2))
+                pause = max(self._backoff_sec, self._retry_after(exc) if exc is not None else 0.0)
+                self._cooldown_until = max(self._cooldown_until, now + pause)
+            elif outcome != "cancelled":
+                self._counters["failed"] += 1
+        self._wake()
+
+    async def run(self, call_factory, est_tokens=0):
+        """Await call_factory() under the governor; 429s are retried after backoff."""
+        attempt = 0
+        while True:
+            await self._acquire(est_tokens)
+            try:
+                result = await call_factory()
+            except BaseException as exc:
+                outcome = self.classify_error(exc)
+                self._release(outcome, est_tokens, exc=exc)
+                if outcome == "rate_limited" and attempt < self.rate_limit_retries:
+                    attempt += 1
+                    with self._lock:
+                        self._counters["retries"] += 1
+                    continue
+                raise
+            usage = getattr(result, "usage", None)
+            actual = getattr(usage, "total_tokens", None) if usage is not None else None
+            self._release("ok", est_tokens, actual_tokens=actual if isinstance(actual, int) else None)
+            return result
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0][0] > 60.0:
+                self._recent.popleft()
+            requests_last_min = len(self._recent)
+            tokens_last_min = sum(t for _, t in self._recent)
+            out = dict(self._counters)
+            out.update(
+                {
+                    "max_concurrency": self.max_concurrency,
+                    "effective_concurrency": self.effective_concurrency,
+                    "inflight": self._inflight,
+                    "waiting": self._waiting,
+                    "peak_inflight": self._peak_inflight,
+                    "rpm_limit": self.rpm,
+                    "tpm_limit": self.tpm,
+                    "requests_last_min": requests_last_min,
+                    "tokens_last_min": tokens_last_min,
+                    "concurrency_utilization": round(self._inflight / max(1, self.effective_concurrency), 3),
+                    "rpm_utilization": round(requests_last_min / self.rpm, 3) if self.rpm else None,
+                    "tpm_utilization": round(tokens_last_min / self.tpm, 3) if self.tpm else None,
+                    "cooldown_remaining_sec": round(max(0.0, self._cooldown_until - now), 2),
+                    "wait_sec_total": round(self._wait_sec_total, 3),
+                }
+            )
+            return out
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent requests into one: the first caller for a key
+    starts the work and later callers await the same task until it finishes.
+    Only used from the LLM loop thread.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key, factory):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _t, k=key: self._tasks.pop(k, None))
+            with self._lock:
+                self._leaders += 1
+        else:
+            with self._lock:
+                self._coalesced += 1
+        # shield: one caller giving up must not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "inflight_keys": len(self._tasks),
+            }
+
+
+class LLMEventLoop:
+    """
+    One background asyncio loop that carries every LLM request in the process.
+
+    Synchronous callers (job runner threads, the API) hand coroutines to it and
+    block on the result; fan-out callers submit many and collect futures. The
+    loop's governor decides when each request may start, however many runs or
+    deep scans are active at once.
+    """
+
+    def __init__(self, max_inflight=None, governor=None):
+        self.governor = governor or LLMGovernor(max_concurrency=max_inflight)
+        self.single_flight = SingleFlight()
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _run():
+                    asyncio.set_event_loop(loop)
+                    self.governor.bind(loop)
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_run, name="llm-event-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def in_loop_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """Schedule *coro* on the loop; returns a concurrent.futures.Future."""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro):
+        """Run *coro* on the loop and block the calling thread until it finishes."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("LLMEventLoop.run() called from the LLM loop thread; await the coroutine instead.")
+        return self.submit(coro).result()
+
+    def stats(self):
+        return self.governor.stats()
+
+
+_default_loop = None
+_default_loop_lock = threading.Lock()
+
+
+def get_llm_loop():
+    """Process-wide loop shared by every AIEngine (engines are rebuilt on settings changes)."""
+    global _default_loop
+    with _default_loop_lock:
+        if _default_loop is None:
+            _default_loop = LLMEventLoop()
+        return _default_loop
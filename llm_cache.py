@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_CACHE_PATH = str(Path(__file__).resolve().parent / "llm_cache.db")
+
+
+def _env_flag(name, default):
+    value = str(os.getenv(name, "") or "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+class LLMResponseCache:
+    """
+    Persistent, content-addressed store of raw chat completion text.
+
+    Keys are a SHA-256 over (model, prompt template version, request inputs), so
+    any change in prompt wording, model or sampling parameters misses naturally.
+    Lives in its own SQLite file rather than the main DB: the main DB is synced
+    to GitHub and cache rows are disposable.
+    """
+
+    def __init__(self, path=None, max_bytes=None, ttl_sec=None, enabled=None):
+        self.path = str(path or os.getenv("RESUME_MATCHER_LLM_CACHE_PATH", "") or DEFAULT_CACHE_PATH)
+        self.enabled = bool(enabled if enabled is not None else _env_flag("RESUME_MATCHER_LLM_CACHE", True))
+        self.max_bytes = max(0, int(
+            max_bytes
+            if max_bytes is not None
+            else float(os.getenv("RESUME_MATCHER_LLM_CACHE_MAX_MB", "256") or 256) * 1024 * 1024
+        ))
+        self.ttl_sec = max(0, int(
+            ttl_sec
+            if ttl_sec is not None
+            else float(os.getenv("RESUME_MATCHER_LLM_CACHE_TTL_DAYS", "30") or 30) * 86400
+        ))
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = None
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "bypassed": 0, "evicted": 0, "expired": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(model, template_version, payload):
+        blob = json.dumps(
+            {"model": str(model), "template": str(template_version), "payload": payload},
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                tag TEXT,
+                response TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hit_count INTEGER DEFAULT 0
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used_at)")
+        conn.commit()
+        row = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM llm_responses").fetchone()
+        self._total_bytes = int(row[0] or 0)
+        self._conn = conn
+        return conn
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response, size_bytes, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                response, size_bytes, created_at = row
+                if self.ttl_sec and now - float(created_at) > self.ttl_sec:
+                    conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self._total_bytes -= int(size_bytes or 0)
+                    self._stats["expired"] += 1
+                    self._stats["misses"] += 1
+                    return None
+                conn.execute(
+                    "UPDATE llm_responses SET last_used_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                    (now, key),
+                )
+                conn.commit()
+                self._stats["hits"] += 1
+                return response
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                return None
+
+    def put(self, key, response, model=None, tag=None):
+        if not self.enabled or response is None:
+            return
+        response = str(response)
+        size = len(response.encode("utf-8"))
+        if self.max_bytes and size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                old = conn.execute("SELECT size_bytes FROM llm_responses WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    """INSERT OR REPLACE INTO llm_responses
+                       (key, model, tag, response, size_bytes, created_at, last_used_at, hit_count)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, 0)""",
+                    (key, model, tag, response, size, now, now),
+                )
+                self._total_bytes += size - (int(old[0] or 0) if old else 0)
+                self._stats["writes"] += 1
+                if self.max_bytes and self._total_bytes > self.max_bytes:
+                    self._evict_locked(conn, now)
+                conn.commit()
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+
+    def _evict_locked(self, conn, now):
+        # Drop expired rows first, then least-recently-used ones down to ~90% of the cap
+        # so that a full cache doesn't evict on every single write.
+        if self.ttl_sec:
+            cutoff = now - self.ttl_sec
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                cur = conn.execute("DELETE FROM llm_responses WHERE created_at < ? RETURNING size_bytes", (cutoff,))
+                freed = [int(r[0] or 0) for r in cur.fetchall()]
+            else:
+                # No RETURNING before SQLite 3.35; same connection under our lock, so the
+                # rows read are exactly the rows deleted.
+                freed = [
+                    int(r[0] or 0)
+                    for r in conn.execute("SELECT size_bytes FROM llm_responses WHERE created_at < ?", (cutoff,))
+                ]
+                conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (cutoff,))
+            self._total_bytes -= sum(freed)
+            self._stats["expired"] += len(freed)
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = conn.execute(
+                "SELECT key, size_bytes FROM llm_responses ORDER BY last_used_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size_bytes in rows:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._total_bytes -= int(size_bytes or 0)
+                self._stats["evicted"] += 1
+                if self._total_bytes <= target:
+                    break
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def clear(self):
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM llm_responses")
+                conn.commit()
+                self._total_bytes = 0
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            lookups = out["hits"] + out["misses"]
+            out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+            out["enabled"] = self.enabled
+            out["path"] = self.path
+            out["max_bytes"] = self.max_bytes
+            out["ttl_sec"] = self.ttl_sec
+            out["size_bytes"] = self._total_bytes if self._total_bytes is not None else None
+            if self._conn is not None:
+                try:
+                    out["entries"] = int(self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0])
+                except sqlite3.Error:
+                    out["entries"] = None
+            else:
+                out["entries"] = None
+            return out
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide cache shared by every AIEngine (engines are rebuilt on settings changes)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
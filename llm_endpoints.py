@@ -0,0 +1,208 @@
+import os
+import re
+import threading
+import time
+
+
+def parse_endpoint_spec(spec):
+    """
+    Parse an lm_base_url value into [(url, weight), ...].
+
+    A single URL keeps working as before; a pool is written as comma- or
+    newline-separated URLs with an optional "|weight" suffix, e.g.
+    "http://box1:1234/v1|2, http://box2:1234/v1".
+    """
+    endpoints = []
+    for part in re.split(r"[,\n]", str(spec or "")):
+        part = part.strip()
+        if not part:
+            continue
+        url, _, weight_raw = part.partition("|")
+        try:
+            weight = float(weight_raw) if weight_raw.strip() else 1.0
+        except ValueError:
+            weight = 1.0
+        if weight > 0:
+            endpoints.append((url.strip(), weight))
+    return endpoints
+
+
+class LLMEndpoint:
+    def __init__(self, url, weight, client=None, async_client=None):
+        self.url = url
+        self.weight = float(weight)
+        self.client = client
+        self.async_client = async_client
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.probing = False
+        self.ewma_latency_sec = None
+        self.last_error = None
+
+
+class EndpointPool:
+    """
+    Routes each LLM request to one of several OpenAI-compatible servers.
+
+    Selection picks the healthy endpoint with the lowest expected wait,
+    (inflight + 1) * latency / weight, using an EWMA of observed latency.
+    Health checks are passive: consecutive server errors or timeouts eject an
+    endpoint for a cooldown that doubles per ejection. When the cooldown ends
+    the endpoint takes one probe request at a time until a request succeeds.
+    """
+
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self, endpoints, eject_after=None, eject_sec=None, max_eject_sec=300.0):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint.")
+        self.endpoints = list(endpoints)
+        self.eject_after = max(1, int(
+            eject_after
+            if eject_after is not None
+            else (os.getenv("RESUME_MATCHER_LLM_ENDPOINT_EJECT_AFTER", "3") or 3)
+        ))
+        self.eject_sec = max(0.0, float(
+            eject_sec
+            if eject_sec is not None
+            else (os.getenv("RESUME_MATCHER_LLM_ENDPOINT_EJECT_SEC", "30") or 30)
+        ))
+        self.max_eject_sec = float(max_eject_sec)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec, api_key, openai_module=None, **kwargs):
+        endpoints = []
+        for url, weight in parse_endpoint_spec(spec):
+            client = async_client = None
+            if openai_module is not None:
+                client = openai_module.OpenAI(base_url=url, api_key=api_key)
+                async_client = openai_module.AsyncOpenAI(base_url=url, api_key=api_key)
+            endpoints.append(LLMEndpoint(url, weight, client=client, async_client=async_client))
+        return cls(endpoints, **kwargs)
+
+    @property
+    def primary(self):
+        return self.endpoints[0]
+
+    def _available_locked(self, endpoint, now):
+        if endpoint.ejected_until > now:
+            return False
+        if endpoint.probing and endpoint.inflight > 0:
+            return False
+        return True
+
+    def acquire(self, exclude=None):
+        """Pick an endpoint and count the request against it; pair with release()."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                e for e in self.endpoints
+                if e is not exclude and self._available_locked(e, now)
+            ]
+            if not candidates:
+                if exclude is not None and len(self.endpoints) > 1:
+                    candidates = [e for e in self.endpoints if e is not exclude]
+                else:
+                    candidates = list(self.endpoints)
+                # Everything is ejected: use whichever comes back first rather than fail.
+                chosen = min(candidates, key=lambda e: e.ejected_until)
+            else:
+                known = [e.ewma_latency_sec for e in candidates if e.ewma_latency_sec is not None]
+                # Unmeasured endpoints are assumed as fast as the best one so they get traffic.
+                default_latency = min(known) if known else 1.0
+                chosen = min(
+                    candidates,
+                    key=lambda e: (
+                        (e.inflight + 1)
+                        * (e.ewma_latency_sec if e.ewma_latency_sec is not None else default_latency)
+                        / e.weight,
+                        e.inflight,
+                    ),
+                )
+            if chosen.ejected_until and chosen.ejected_until <= now:
+                chosen.ejected_until = 0.0
+                chosen.probing = True
+            chosen.inflight += 1
+            chosen.requests += 1
+            return chosen
+
+    def release(self, endpoint, outcome, latency_sec=None, error=None):
+        """Record the result of a request; outcome follows LLMGovernor.classify_error()."""
+        now = time.monotonic()
+        with self._lock:
+            endpoint.inflight = max(0, endpoint.inflight - 1)
+            if outcome == "ok":
+                endpoint.consecutive_failures = 0
+                endpoint.probing = False
+                if latency_sec is not None:
+                    if endpoint.ewma_latency_sec is None:
+                        endpoint.ewma_latency_sec = float(latency_sec)
+                    else:
+                        endpoint.ewma_latency_sec += self.LATENCY_ALPHA * (
+                            float(latency_sec) - endpoint.ewma_latency_sec
+                        )
+                return
+            if outcome == "cancelled":
+                return
+            endpoint.errors += 1
+            endpoint.last_error = str(error)[:200] if error is not None else outcome
+            if outcome not in ("server_error", "timeout"):
+                return
+            endpoint.consecutive_failures += 1
+            if endpoint.probing or endpoint.consecutive_failures >= self.eject_after:
+                endpoint.ejections += 1
+                endpoint.probing = False
+                endpoint.ejected_until = now + min(
+                    self.max_eject_sec, self.eject_sec * (2 ** (endpoint.ejections - 1))
+                )
+
+    def healthy_count(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for e in self.endpoints if e.ejected_until <= now)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            rows = []
+            for e in self.endpoints:
+                ejected_for = max(0.0, e.ejected_until - now)
+                rows.append(
+                    {
+                        "url": e.url,
+                        "weight": e.weight,
+                        "state": "ejected" if ejected_for > 0 else ("probing" if e.probing else "healthy"),
+                        "inflight": e.inflight,
+                        "requests": e.requests,
+                        "errors": e.errors,
+                        "consecutive_failures": e.consecutive_failures,
+                        "ejections": e.ejections,
+                        "ejected_for_sec": round(ejected_for, 1),
+                        "latency_ms": round(e.ewma_latency_sec * 1000.0, 1) if e.ewma_latency_sec is not None else None,
+                        "last_error": e.last_error,
+                    }
+                )
+            return rows
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(spec, api_key, openai_module):
+    """
+    Pools are shared per (spec, api_key) so rebuilding AIEngine on a settings
+    save keeps health and latency history for unchanged endpoints.
+    """
+    key = (str(spec), str(api_key))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = EndpointPool.from_spec(spec, api_key, openai_module=openai_module)
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,90 @@
+import os
+import threading
+from collections import deque
+from os.path import commonprefix
+
+
+def _env_flag(name, default):
+    value = str(os.getenv(name, "") or "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+def flatten_messages(messages):
+    """Approximate the rendered chat prompt: role markers and contents in order."""
+    return "".join(f"<{m.get('role', '')}>\n{m.get('content', '')}\n" for m in (messages or []))
+
+
+class PromptPrefixTracker:
+    """
+    Instrumentation for server-side prefix (KV) cache reuse.
+
+    For every prompt sent to an endpoint, measures the longest prefix it shares
+    with any of the last `window` prompts sent to that same endpoint, which is
+    roughly what a vLLM / llama.cpp / LM Studio prefix cache can skip. Off by
+    default (RESUME_MATCHER_LLM_PREFIX_STATS) since it keeps recent prompts in
+    memory and compares each new one against them.
+    """
+
+    def __init__(self, enabled=None, window=None):
+        self.enabled = bool(enabled if enabled is not None else _env_flag("RESUME_MATCHER_LLM_PREFIX_STATS", False))
+        self.window = max(1, int(
+            window
+            if window is not None
+            else (os.getenv("RESUME_MATCHER_LLM_PREFIX_WINDOW", "32") or 32)
+        ))
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._by_tag = {}
+
+    def record(self, endpoint_key, tag, messages):
+        if not self.enabled:
+            return 0
+        prompt = flatten_messages(messages)
+        with self._lock:
+            recent = self._recent.setdefault(endpoint_key, deque(maxlen=self.window))
+            shared = 0
+            for previous in recent:
+                if shared == len(prompt):
+                    break
+                shared = max(shared, len(commonprefix([previous, prompt])))
+            recent.append(prompt)
+            row = self._by_tag.setdefault(str(tag), {"requests": 0, "prompt_chars": 0, "reused_chars": 0})
+            row["requests"] += 1
+            row["prompt_chars"] += len(prompt)
+            row["reused_chars"] += shared
+        return shared
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            by_tag = {}
+            totals = {"requests": 0, "prompt_chars": 0, "reused_chars": 0}
+            for tag, row in sorted(self._by_tag.items()):
+                out = dict(row)
+                out["reuse_ratio"] = round(row["reused_chars"] / row["prompt_chars"], 4) if row["prompt_chars"] else 0.0
+                by_tag[tag] = out
+                for k in totals:
+                    totals[k] += row[k]
+            totals["reuse_ratio"] = (
+                round(totals["reused_chars"] / totals["prompt_chars"], 4) if totals["prompt_chars"] else 0.0
+            )
+            return {"enabled": self.enabled, "window": self.window, **totals, "by_tag": by_tag}
+
+
+_default_tracker = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_prefix_tracker():
+    """Process-wide tracker shared by every AIEngine, like the response cache."""
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = PromptPrefixTracker()
+        return _default_tracker
@@ -0,0 +1,132 @@
+import json
+import re
+import threading
+
+
+class JsonStreamScanner:
+    """
+    Incremental scanner that spots the end of the first complete top-level JSON
+    object or array in a token stream.
+
+    Text before the value (prose, a markdown fence) is skipped, as is anything
+    inside a leading <think>...</think> block. A bracket run that closes but is
+    not valid JSON (e.g. "[note]" in prose) is discarded and scanning resumes
+    after its opening bracket, so the result matches what a full parse would find.
+    """
+
+    _THINK_OPEN = "<think>"
+    _THINK_CLOSE = re.compile(r"</think>", re.IGNORECASE)
+
+    def __init__(self):
+        self.buffer = ""
+        self.end = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._think_scan = 0
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    def text(self):
+        """Everything received, cut right after the JSON value once one is complete."""
+        return self.buffer[: self.end] if self.end is not None else self.buffer
+
+    def feed(self, chunk):
+        """Append streamed text; returns True once a complete value has been seen."""
+        if self.end is not None:
+            return True
+        if chunk:
+            self.buffer += chunk
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._start is None:
+                if ch == "<":
+                    head = buf[i:i + len(self._THINK_OPEN)].lower()
+                    if head == self._THINK_OPEN:
+                        # Only rescan the tail on each chunk; long reasoning blocks stay linear.
+                        close = self._THINK_CLOSE.search(buf, max(i + len(self._THINK_OPEN), self._think_scan))
+                        if close is None:
+                            self._think_scan = max(0, len(buf) - len("</think>") + 1)
+                            break
+                        i = close.end()
+                        continue
+                    if self._THINK_OPEN.startswith(head):
+                        # Could still become "<think>"; wait for more text.
+                        break
+                elif ch in "{[":
+                    self._start = i
+                    self._depth = 1
+                    self._in_string = False
+                    self._escaped = False
+                i += 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        json.loads(buf[self._start:i + 1])
+                    except ValueError:
+                        i = self._start + 1
+                        self._start = None
+                        continue
+                    self.end = i + 1
+                    self._pos = self.end
+                    return True
+            i += 1
+        self._pos = i
+        return False
+
+
+_stats = {"streamed": 0, "closed_early": 0}
+_stats_lock = threading.Lock()
+
+
+def stream_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+async def read_json_stream(stream):
+    """
+    Consume a streamed chat completion until its first complete JSON value and
+    close the stream there, so the server stops generating trailing prose.
+    Returns (text, closed_early, usage); usage is the server's token count from
+    the final chunk (stream_options include_usage), or None when the stream was
+    closed before it arrived.
+    """
+    scanner = JsonStreamScanner()
+    closed_early = False
+    usage = None
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            choices = getattr(chunk, "choices", None) or []
+            delta = getattr(choices[0], "delta", None) if choices else None
+            if scanner.feed(getattr(delta, "content", None) or ""):
+                closed_early = True
+                break
+    finally:
+        close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+        if close is not None:
+            await close()
+        with _stats_lock:
+            _stats["streamed"] += 1
+            _stats["closed_early"] += int(closed_early)
+    return scanner.text(), closed_early, usage
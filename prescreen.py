@@ -0,0 +1,624 @@
+import datetime
+import functools
+import importlib
+import os
+import re
+import threading
+
+
+def _env_flag(name, default):
+    value = str(os.getenv(name, "") or "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+SKILL_CATEGORIES = ("must_have_skills", "nice_to_have_skills")
+
+# Canonical skill -> spellings that count as the same skill (matched on word boundaries).
+SKILL_ALIASES = {
+    "python": ["python", "python3"],
+    "java": ["java"],
+    "javascript": ["javascript", "js", "ecmascript", "es6"],
+    "typescript": ["typescript"],
+    "react": ["react", "react.js", "reactjs"],
+    "react-query": ["react-query", "react query", "tanstack query"],
+    "react-table": ["react-table", "react table", "tanstack table"],
+    "node.js": ["node.js", "nodejs", "node js"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "vite": ["vite"],
+    "bun": ["bun"],
+    "c#": ["c#", "csharp"],
+    "c++": ["c++", "cpp"],
+    "golang": ["golang"],
+    "rust": ["rust"],
+    "ruby": ["ruby"],
+    "rails": ["rails", "ruby on rails", "ror"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "pydantic": ["pydantic"],
+    "sqlmodel": ["sqlmodel"],
+    "asyncio": ["asyncio"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "docker": ["docker"],
+    "terraform": ["terraform"],
+    "ansible": ["ansible"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "sql": ["sql"],
+    "graphql": ["graphql"],
+    "grpc": ["grpc"],
+    "protobuf": ["protobuf", "protocol buffers"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi", "powerbi"],
+    "jira": ["jira"],
+    "figma": ["figma"],
+    "git": ["git"],
+    "linux": ["linux"],
+}
+
+# Requirement phrases satisfied by any member skill (same equivalences the prompts describe).
+SKILL_GROUPS = {
+    "cloud platform": ["aws", "azure", "gcp"],
+}
+
+# Words that carry no meaning of their own around a skill list ("strong experience with X and Y").
+_FILLER_WORDS = {
+    "a", "an", "and", "or", "the", "with", "in", "of", "on", "for", "using", "including",
+    "experience", "experienced", "hands", "on", "hands-on", "knowledge", "proficiency", "proficient",
+    "strong", "solid", "good", "excellent", "deep", "working", "familiarity", "familiar",
+    "expertise", "expert", "skills", "skill", "understanding", "ability", "to", "use", "tools",
+    "frameworks", "framework", "languages", "language", "such", "as", "like", "e.g", "eg",
+    "etc", "plus", "+", "/", "years", "year", "yrs", "minimum", "at", "least", "is", "required",
+    "preferred", "must", "have", "be", "able", "development", "programming",
+}
+
+_DEGREE_PATTERNS = [
+    # (level, pattern); matched case-insensitively unless the pattern sets its own flags.
+    (3, r"\bph\.?\s?d\b|\bdoctorate\b|\bdoctoral\b"),
+    # A bare "Master" is a title too ("Certified Scrum Master in agile"): require
+    # the possessive/plural form or a "Master of <field>" degree name.
+    (2, r"\bmaster'?s\b|\bmaster\s+(?:degree|of\s+(?:science|arts|engineering|technology|business|computer|commerce|education|laws|philosophy|public|fine|information|applied|data))\b|\bm\.?\s?tech\b|\bm\.e\.|\bm\.s\.|\bm\.?sc\b|\bmba\b|(?-i:\bM\.?S\b)(?=\s+(?:in|of)\b)|(?-i:\bME\b)(?=\s+(?:in|of)\b)"),
+    (1, r"\bbachelor'?s?\b|\bb\.?\s?tech\b|\bb\.e\.|\bb\.s\.|\bb\.?sc\b|\bundergraduate degree\b|(?-i:\bB\.?S\b)(?=\s+(?:in|of)\b)|(?-i:\bBE\b)(?=\s+(?:in|of)\b)"),
+]
+
+_MONTHS = {
+    m: i for i, m in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+    )
+}
+_DATE = r"(?:(?P<{p}m>[a-z]{{3}})[a-z]*\.?\s+|(?P<{p}n>\d{{1,2}})\s*/\s*)?(?P<{p}y>(?:19|20)\d{{2}})"
+_RANGE_RE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|until)\s*(?:" + _DATE.format(p="e") + r"|(?P<present>present|current|now|date))",
+    re.IGNORECASE,
+)
+_EDUCATION_LINE_RE = re.compile(
+    r"universit|college|school|institute|academy|bachelor|master|degree|b\.?\s?tech|m\.?\s?tech|ph\.?\s?d",
+    re.IGNORECASE,
+)
+_YEARS_CLAIM_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+# Resume claims only count when phrased as experience ("8+ years of backend experience",
+# "experience: 8 years"); "migrated 20 years of customer data" is not one.
+_EXPERIENCE_CLAIM_RE = re.compile(
+    r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)'?[^\S\n]+(?:(?:of|in)[^\S\n]+)?(?:[a-z0-9+#./-]+[^\S\n]+){0,3}?experience\b"
+    r"|\bexperience[^\S\n]*(?:of|:|-)?[^\S\n]*(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b",
+    re.IGNORECASE,
+)
+
+# Cues that a mention is not a claim: negated ("No AWS experience"), wished for
+# ("want to learn Kubernetes") or unfinished ("Pursuing Bachelor's degree").
+_HEDGE_BEFORE_RE = re.compile(
+    r"\b(?:no|not|never|without|lacks?|lacking|want(?:s|ed|ing)?\s+to|would\s+like\s+to|"
+    r"hop(?:e|es|ing)\s+to|plan(?:s|ned|ning)?\s+to|looking\s+to|eager\s+to|aim(?:s|ing)?\s+to|"
+    r"aspir\w*|interested\s+in|to\s+learn|(?:currently|now|still)\s+learning|pursuing|studying|enrolled)\b",
+    re.IGNORECASE,
+)
+_HEDGE_AFTER_RE = re.compile(r"\W{0,3}(?:learning|in\s+progress|expected|ongoing|pursuing|planned)\b", re.IGNORECASE)
+_CLAUSE_BREAK_RE = re.compile(r"[.!?](?=\s|$)|[;\n•|]")
+_DEGREE_IN_PROGRESS_RE = re.compile(
+    r"\b(?:expected|pursuing|ongoing|in\s+progress|anticipated|candidate|currently\s+enrolled)\b", re.IGNORECASE
+)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# Aliases that are everyday words ("react quickly", "Spring 2019 semester"): a bare
+# hit only counts when its line shows the skill's ecosystem or is a skills list.
+_SKILL_CONTEXT = {
+    "react": (
+        ("react",),
+        re.compile(r"javascript|typescript|\bjsx\b|\btsx\b|redux|next\.?js|front[- ]?end|\bhooks\b|\bcomponents?\b|\bhtml\b|\bcss\b", re.IGNORECASE),
+    ),
+    "spring": (
+        ("spring",),
+        re.compile(r"\bjava\b|kotlin|\bboot\b|\bmvc\b|hibernate|microservices?|\bjpa\b|maven|gradle", re.IGNORECASE),
+    ),
+}
+
+
+def _line_at(text, pos):
+    start = text.rfind("\n", 0, pos) + 1
+    end = text.find("\n", pos)
+    return text[start:end if end >= 0 else len(text)]
+
+
+def _hedged(text, start, end):
+    """True when text[start:end] sits in a negated, aspirational or unfinished clause."""
+    before = text[max(0, start - 80):start]
+    breaks = list(_CLAUSE_BREAK_RE.finditer(before))
+    if breaks:
+        before = before[breaks[-1].end():]
+    after = text[end:end + 40]
+    cut = _CLAUSE_BREAK_RE.search(after)
+    if cut:
+        after = after[:cut.start()]
+    return bool(_HEDGE_BEFORE_RE.search(before) or _HEDGE_AFTER_RE.match(after))
+
+
+def _alias_pattern(alias):
+    return re.compile(r"(?<![a-z0-9+#.])" + re.escape(alias) + r"(?![a-z0-9+#])", re.IGNORECASE)
+
+
+_ALIAS_RES = {skill: [_alias_pattern(a) for a in aliases] for skill, aliases in SKILL_ALIASES.items()}
+
+
+def find_skills(text):
+    """Canonical skills mentioned in text, in order of first appearance."""
+    found = []
+    for skill, patterns in _ALIAS_RES.items():
+        positions = [m.start() for p in patterns for m in [p.search(text)] if m]
+        if positions:
+            found.append((min(positions), skill))
+    return [skill for _, skill in sorted(found)]
+
+
+def skill_mention(skill, text):
+    """
+    "clear" when text claims skill, "hedged" when it only names it in a negated,
+    aspirational or context-free way ("No AWS experience", "react quickly"), else None.
+    """
+    bare, context = _SKILL_CONTEXT.get(skill, ((), None))
+    seen = None
+    for alias, pattern in zip(SKILL_ALIASES[skill], _ALIAS_RES[skill]):
+        for m in pattern.finditer(text):
+            if alias in bare:
+                line = _line_at(text, m.start())
+                if not context.search(line) and len(set(find_skills(line)) - {skill}) < 2:
+                    seen = "hedged"
+                    continue
+            if _hedged(text, m.start(), m.end()):
+                seen = "hedged"
+                continue
+            return "clear"
+    return seen
+
+
+def _degree_in_progress(text, m):
+    line = _line_at(text, m.start())
+    if _hedged(text, m.start(), m.end()) or _DEGREE_IN_PROGRESS_RE.search(line):
+        return True
+    ranges = list(_RANGE_RE.finditer(line))
+    if any(r.group("present") for r in ranges):
+        return True
+    return any(int(y) > datetime.date.today().year for y in _YEAR_RE.findall(line))
+
+
+def degree_level(text):
+    """Highest completed degree level named in text: 3 doctorate, 2 master's, 1 bachelor's, 0 none."""
+    for level, pattern in _DEGREE_PATTERNS:
+        for m in re.finditer(pattern, text, re.IGNORECASE):
+            # "Pursuing Bachelor's degree (expected 2027)" is not a bachelor's yet.
+            if not _degree_in_progress(text, m):
+                return level
+    return 0
+
+
+@functools.lru_cache(maxsize=64)
+def estimate_years(text):
+    """
+    Years of experience from a resume, as (years, basis).
+
+    Extends AIEngine._estimate_years (first "N years" mention) with the largest
+    explicit experience claim and the union of dated employment ranges
+    ("Jan 2018 - Present"), so overlapping roles are not double counted. basis is
+    "claim", "ranges" or "".
+    """
+    text = str(text or "")
+    claims = []
+    for m in _EXPERIENCE_CLAIM_RE.finditer(text):
+        years = int(m.group(1) or m.group(2))
+        # "Looking to reach 5 years of experience" is a goal, not a claim.
+        if 0 < years <= 50 and not _hedged(text, m.start(), m.end()):
+            claims.append(years)
+    today = datetime.date.today()
+    spans = []
+    for m in _RANGE_RE.finditer(text):
+        # Study periods are dated the same way as jobs; don't count them as experience.
+        if _EDUCATION_LINE_RE.search(_line_at(text, m.start())):
+            continue
+        start = _month_index(m.group("sy"), m.group("sm"), m.group("sn"), default_month=1)
+        if m.group("present"):
+            end = today.year * 12 + today.month
+        else:
+            end = _month_index(m.group("ey"), m.group("em"), m.group("en"), default_month=12)
+        if start is not None and end is not None and start <= end <= today.year * 12 + today.month:
+            spans.append((start, end))
+    months = 0
+    cur_start = cur_end = None
+    for start, end in sorted(spans):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                months += cur_end - cur_start + 1
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        months += cur_end - cur_start + 1
+    range_years = months / 12.0
+    claim_years = max(claims) if claims else 0
+    if claim_years >= range_years and claim_years:
+        return float(claim_years), "claim"
+    if range_years:
+        return round(range_years, 1), "ranges"
+    return 0.0, ""
+
+
+def _month_index(year, month_name, month_num, default_month):
+    if not year:
+        return None
+    month = default_month
+    if month_name:
+        month = _MONTHS.get(month_name[:3].lower(), default_month)
+    elif month_num and 1 <= int(month_num) <= 12:
+        month = int(month_num)
+    return int(year) * 12 + month
+
+
+class PrescreenContext:
+    def __init__(self, resume_text, category, value):
+        self.resume_text = str(resume_text or "")
+        self.resume_lower = self.resume_text.lower()
+        self.category = str(category or "").strip().lower().replace(" ", "_")
+        self.value = str(value or "").strip()
+        self.value_lower = self.value.lower()
+
+
+class PrescreenRule:
+    """
+    Base class for deterministic requirement checks.
+
+    evaluate() returns (status, evidence, confidence) when the rule has an
+    opinion, or None. `categories` limits which requirement categories the rule
+    sees; None means all of them.
+    """
+
+    name = "rule"
+    categories = None
+
+    def applies(self, ctx):
+        return self.categories is None or ctx.category in self.categories
+
+    def evaluate(self, ctx):
+        raise NotImplementedError
+
+
+class SkillAliasRule(PrescreenRule):
+    """
+    Skill requirements decided by explicit mentions, with aliases (k8s = Kubernetes).
+    Must-haves are never inferred from adjacent tools: no explicit mention is Missing.
+    That verdict is only confident for requirements naming two or more skills; a
+    lone "SQL" or "Git" is often shown through MySQL or GitHub, so the model decides.
+    A skill the resume only names hedged (see skill_mention) is left to the model too.
+    """
+
+    name = "skill_alias"
+    categories = SKILL_CATEGORIES
+
+    def evaluate(self, ctx):
+        for phrase, members in SKILL_GROUPS.items():
+            if phrase in ctx.value_lower and not find_skills(ctx.value_lower.replace(phrase, " ")):
+                hits = [s for s in members if skill_mention(s, ctx.resume_text) == "clear"]
+                if hits:
+                    return "Met", f"Explicitly matched: {', '.join(hits)}", 0.9
+                return None
+        required = find_skills(ctx.value)
+        if not required:
+            return None
+        mentions = {s: skill_mention(s, ctx.resume_text) for s in required}
+        matched = [s for s in required if mentions[s] == "clear"]
+        verdict = self._verdict(ctx, required, matched)
+        if verdict and "hedged" in mentions.values():
+            return verdict[0], verdict[1], min(verdict[2], 0.8)
+        return verdict
+
+    def _verdict(self, ctx, required, matched):
+        # Anything left after removing skill names and filler is nuance the model should weigh.
+        residual = ctx.value_lower
+        for skill in required:
+            for alias in SKILL_ALIASES[skill]:
+                residual = _alias_pattern(alias).sub(" ", residual)
+        residual_words = [w for w in re.findall(r"[a-z0-9.+#'-]+", residual) if w not in _FILLER_WORDS and not w.isdigit()]
+        any_of = len(required) > 1 and bool(re.search(r"\bor\b|/", ctx.value_lower))
+        strict = ctx.category == "must_have_skills"
+        if matched and (any_of or len(matched) == len(required)):
+            return "Met", f"Explicitly matched: {', '.join(matched)}", 0.8 if residual_words else 0.95
+        if matched:
+            return "Partial", f"Explicitly matched: {', '.join(matched)}", 0.9 if strict else 0.8
+        if re.search(r"equivalent|similar|related|alternative|other", residual):
+            # "Java or an equivalent JVM language": an unnamed substitute may be present.
+            return "Missing", "None", 0.7
+        if len(required) < 2:
+            return "Missing", "None", 0.8
+        return "Missing", "None", 0.95 if strict else 0.85
+
+
+class DegreeRule(PrescreenRule):
+    """Degree level with the equivalences the prompts use (B.Tech/BE/BS = Bachelor's, ...)."""
+
+    name = "degree"
+    categories = ("education_requirements",)
+
+    def evaluate(self, ctx):
+        levels = [level for level, pattern in _DEGREE_PATTERNS if re.search(pattern, ctx.value, re.IGNORECASE)]
+        if not levels:
+            return None
+        required = min(levels)
+        have = degree_level(ctx.resume_text)
+        if not have:
+            return "Missing", "None", 0.7
+        if have < required:
+            return "Partial", "Lower degree level than required", 0.85
+        field_match = re.search(r"\b(?:in|of)\s+([a-z][a-z &/,-]+)", ctx.value_lower)
+        lenient = re.search(r"related|equivalent|similar|relevant|any\b", ctx.value_lower)
+        if field_match and not lenient:
+            words = [
+                w for w in re.findall(r"[a-z]{3,}", field_match.group(1))
+                if w not in ("and", "the", "degree", "field", "from", "university")
+            ]
+            if words and not all(w in ctx.resume_lower for w in words):
+                return None
+        return "Met", "Degree level meets requirement", 0.95
+
+
+class YearsRule(PrescreenRule):
+    """Minimum-years requirements checked against estimate_years()."""
+
+    name = "years_experience"
+
+    def applies(self, ctx):
+        return ctx.category in ("experience", "min_years_experience") or (
+            "experience" in ctx.value_lower and _YEARS_CLAIM_RE.search(ctx.value_lower) is not None
+        )
+
+    def evaluate(self, ctx):
+        m = _YEARS_CLAIM_RE.search(ctx.value_lower)
+        if not m:
+            return None
+        required = int(m.group(1))
+        # A requirement naming a skill ("5 years of Python") is about more than total tenure.
+        if find_skills(ctx.value) or required <= 0:
+            return None
+        years, basis = estimate_years(ctx.resume_text)
+        if not years:
+            return None
+        evidence = f"Explicit years in resume: {years:g}" if basis == "claim" else f"Dated roles span ~{years:g} years"
+        if years >= required:
+            confidence = 0.95 if basis == "claim" or years >= required + 1 else 0.8
+            return "Met", evidence, confidence
+        return "Partial", f"{evidence} (below {required})", 0.9 if years < required * 0.75 else 0.75
+
+
+class KeywordRule(PrescreenRule):
+    """
+    Short requirements that appear verbatim in the resume. A bare hit cannot tell
+    "led a team, strong leadership" from "no leadership experience", so the verdict
+    stays below the default threshold and only feeds stats and the agreement report.
+    """
+
+    name = "keyword"
+    max_words = 5
+
+    def applies(self, ctx):
+        return ctx.category not in ("experience", "min_years_experience", "education_requirements")
+
+    def evaluate(self, ctx):
+        phrase = re.sub(r"\s+", " ", ctx.value_lower).strip(" .;,:")
+        if not phrase or len(phrase) < 3 or len(phrase.split()) > self.max_words:
+            return None
+        pattern = r"(?<![a-z0-9])" + re.escape(phrase).replace(r"\ ", r"\s+") + r"(?![a-z0-9])"
+        if re.search(pattern, ctx.resume_lower):
+            return "Met", ctx.value, 0.8
+        return None
+
+
+class HRComplianceRule(PrescreenRule):
+    """India HR ops / statutory compliance earns Partial when payroll/HR policy work is shown."""
+
+    name = "hr_compliance"
+    categories = ("domain_knowledge",)
+    _TRIGGERS = ("statutory compliance", "india hr operations", "labor laws")
+    _SIGNALS = ("payroll", "hr policies", "employee relations", "compensation", "benefits")
+
+    def evaluate(self, ctx):
+        if not any(t in ctx.value_lower for t in self._TRIGGERS):
+            return None
+        signals = [kw for kw in self._SIGNALS if kw in ctx.resume_lower]
+        if signals:
+            return "Partial", f"Matched keywords in resume: {', '.join(signals[:4])}", 0.9
+        return None
+
+
+DEFAULT_RULES = (SkillAliasRule, DegreeRule, YearsRule, KeywordRule, HRComplianceRule)
+
+
+def _load_plugin_rules(spec):
+    """RESUME_MATCHER_PRESCREEN_PLUGINS="pkg.module:RuleClass,other.module:Rule"."""
+    rules = []
+    for item in str(spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        module_name, _, attr = item.partition(":")
+        rule = getattr(importlib.import_module(module_name), attr)
+        rules.append(rule() if isinstance(rule, type) else rule)
+    return rules
+
+
+class PrescreenEngine:
+    """
+    Runs deterministic rules before any LLM call for a requirement.
+
+    Rules run in order and the first verdict at or above `min_confidence` wins;
+    that requirement never reaches the model. Lower-confidence verdicts are only
+    counted, so the threshold can be tuned from the stats and agreement report.
+    """
+
+    def __init__(self, rules=None, min_confidence=None, enabled=None):
+        self.enabled = bool(enabled if enabled is not None else _env_flag("RESUME_MATCHER_PRESCREEN", True))
+        self.min_confidence = float(
+            min_confidence
+            if min_confidence is not None
+            else (os.getenv("RESUME_MATCHER_PRESCREEN_MIN_CONFIDENCE", "0.9") or 0.9)
+        )
+        if rules is None:
+            rules = [cls() for cls in DEFAULT_RULES]
+            rules.extend(_load_plugin_rules(os.getenv("RESUME_MATCHER_PRESCREEN_PLUGINS", "")))
+        self.rules = list(rules)
+        self._lock = threading.Lock()
+        self._stats = {"evaluated": 0, "decided": 0, "below_threshold": 0, "errors": 0}
+        self._by_rule = {}
+
+    def register(self, rule, first=False):
+        with self._lock:
+            if first:
+                self.rules.insert(0, rule)
+            else:
+                self.rules.append(rule)
+
+    def _verdict(self, ctx):
+        """(rule_name, status, evidence, confidence) from the first confident rule, else the best guess."""
+        best = None
+        for rule in list(self.rules):
+            if not rule.applies(ctx):
+                continue
+            try:
+                out = rule.evaluate(ctx)
+            except Exception:
+                with self._lock:
+                    self._stats["errors"] += 1
+                continue
+            if not out:
+                continue
+            status, evidence, confidence = out
+            if status not in ("Met", "Partial", "Missing"):
+                continue
+            candidate = (rule.name, status, str(evidence or "None"), float(confidence))
+            if candidate[3] >= self.min_confidence:
+                return candidate
+            if best is None or candidate[3] > best[3]:
+                best = candidate
+        return best
+
+    def evaluate(self, resume_text, category, value, record=True):
+        """A criterion result dict when the rules decide, else None (ask the model)."""
+        if not self.enabled:
+            return None
+        verdict = self._verdict(PrescreenContext(resume_text, category, value))
+        decided = verdict is not None and verdict[3] >= self.min_confidence
+        if record:
+            with self._lock:
+                self._stats["evaluated"] += 1
+                if decided:
+                    self._stats["decided"] += 1
+                    self._by_rule[verdict[0]] = self._by_rule.get(verdict[0], 0) + 1
+                elif verdict is not None:
+                    self._stats["below_threshold"] += 1
+        if not decided:
+            return None
+        rule, status, evidence, confidence = verdict
+        return {
+            "requirement": value,
+            "category": category,
+            "status": status,
+            "evidence": evidence,
+            "prescreen": {"rule": rule, "confidence": confidence},
+        }
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["skip_rate"] = round(out["decided"] / out["evaluated"], 4) if out["evaluated"] else 0.0
+            out["by_rule"] = dict(self._by_rule)
+            out["enabled"] = self.enabled
+            out["min_confidence"] = self.min_confidence
+            out["rules"] = [rule.name for rule in self.rules]
+            return out
+
+    def agreement(self, samples):
+        """
+        Compare rule verdicts with labeled ones: samples are
+        (resume_text, category, value, label_status) tuples, typically earlier LLM
+        verdicts. Reports how many the rules would skip and how often they agree,
+        both at the configured threshold and for every verdict the rules produce.
+        """
+        report = {"labeled": 0, "decided": 0, "agreed": 0, "opinions": 0, "opinions_agreed": 0}
+        by_rule = {}
+        disagreements = {}
+        for resume_text, category, value, label in samples:
+            label = str(label or "")
+            if label not in ("Met", "Partial", "Missing"):
+                continue
+            report["labeled"] += 1
+            verdict = self._verdict(PrescreenContext(resume_text, category, value))
+            if verdict is None:
+                continue
+            rule, status, _, confidence = verdict
+            agreed = status == label
+            report["opinions"] += 1
+            report["opinions_agreed"] += int(agreed)
+            if confidence < self.min_confidence:
+                continue
+            report["decided"] += 1
+            report["agreed"] += int(agreed)
+            row = by_rule.setdefault(rule, {"decided": 0, "agreed": 0})
+            row["decided"] += 1
+            row["agreed"] += int(agreed)
+            if not agreed:
+                key = f"{status}->{label}"
+                disagreements[key] = disagreements.get(key, 0) + 1
+        report["skip_rate"] = round(report["decided"] / report["labeled"], 4) if report["labeled"] else 0.0
+        report["agreement"] = round(report["agreed"] / report["decided"], 4) if report["decided"] else None
+        report["opinion_agreement"] = (
+            round(report["opinions_agreed"] / report["opinions"], 4) if report["opinions"] else None
+        )
+        for row in by_rule.values():
+            row["agreement"] = round(row["agreed"] / row["decided"], 4) if row["decided"] else None
+        report["by_rule"] = by_rule
+        report["disagreements"] = disagreements
+        report["min_confidence"] = self.min_confidence
+        return report
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_prescreen_engine():
+    """Process-wide engine so skip-rate stats survive AIEngine rebuilds."""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = PrescreenEngine()
+        return _default_engine
@@ -1,6 +1,10 @@
 """Tests for ai_engine.py — mock mode."""
 
+import asyncio
+import json
+
 from ai_engine import AIEngine
+from llm_endpoints import EndpointPool, LLMEndpoint
 from document_utils import clean_json_response
 
 
@@ -78,3 +82,291 @@ def test_clean_json_response_malformed():
     assert clean_json_response("not json at all") is None
     assert clean_json_response("") is None
     assert clean_json_response(None) is None
+
+
+class _FakeCompletions:
+    def __init__(self, content, delay=0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.active -= 1
+        message = type("Msg", (), {"content": self.content})()
+        choice = type("Choice", (), {"message": message})()
+        return type("Resp", (), {"choices": [choice]})()
+
+
+def _fake_client(completions):
+    return type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+
+
+def _cached_engine(tmp_path, content, delay=0.0, **cache_kwargs):
+    from llm_cache import LLMResponseCache
+    from prescreen import PrescreenEngine
+
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"), enabled=True, **cache_kwargs)
+    engine = AIEngine(
+        base_url="http://127.0.0.1:9/v1",
+        api_key="test-key",
+        preferred_model="test-model",
+        response_cache=cache,
+        # These tests exercise the transport; keep every requirement on the model path.
+        prescreen=PrescreenEngine(enabled=False),
+    )
+    completions = _FakeCompletions(content, delay=delay)
+    engine.endpoints = EndpointPool([LLMEndpoint("http://fake/v1", 1.0, async_client=_fake_client(completions))])
+    return engine, completions
+
+
+def test_response_cache_serves_repeat_calls(tmp_path):
+    content = '{"requirement": "Python", "status": "Met", "evidence": "Python"}'
+    engine, completions = _cached_engine(tmp_path, content)
+    first = engine.evaluate_criterion("I know Python.", "soft_skills", "Python")
+    second = engine.evaluate_criterion("I know Python.", "soft_skills", "Python")
+    assert first == second
+    assert completions.calls == 1
+    stats = engine.cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["writes"] == 1
+
+    # Different inputs miss; the bypass flag always goes to the model.
+    engine.evaluate_criterion("I know Python and SQL.", "soft_skills", "Python")
+    engine.evaluate_criterion("I know Python.", "soft_skills", "Python", use_cache=False)
+    assert completions.calls == 3
+    assert engine.cache_stats()["bypassed"] == 1
+
+
+def test_response_cache_skips_unparseable_output(tmp_path):
+    engine, completions = _cached_engine(tmp_path, "sorry, I cannot help")
+    engine.evaluate_criterion("text", "soft_skills", "Python")
+    engine.evaluate_criterion("text", "soft_skills", "Python")
+    assert completions.calls == 2
+    assert engine.cache_stats()["writes"] == 0
+
+
+def test_response_cache_skips_invalid_answers_and_stays_off_loop_thread(tmp_path):
+    import threading
+
+    engine, completions = _cached_engine(tmp_path, '{"status": "Probably", "evidence": "x"}')
+    engine.evaluate_criterion("text", "soft_skills", "Python")
+    engine.evaluate_criterion("text", "soft_skills", "Python")
+    assert completions.calls == 2
+    assert engine.cache_stats()["writes"] == 0
+
+    threads = []
+    cache = engine.response_cache
+    real_get = cache.get
+    cache.get = lambda key: threads.append(threading.current_thread()) or real_get(key)
+    completions.content = '{"status": "Met", "evidence": "x"}'
+    engine.evaluate_criterion("text", "soft_skills", "Go")
+    assert threads and engine.llm_loop._thread not in threads
+    assert engine.cache_stats()["writes"] == 1
+
+
+def test_response_cache_ttl_and_size_eviction(tmp_path):
+    from llm_cache import LLMResponseCache
+
+    cache = LLMResponseCache(path=str(tmp_path / "c.db"), enabled=True, max_bytes=1000, ttl_sec=60)
+    for i in range(10):
+        cache.put(f"k{i}", "x" * 200)
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 1000
+    assert stats["evicted"] > 0
+    assert cache.get("k0") is None
+    assert cache.get("k9") == "x" * 200
+
+    cache.ttl_sec = 1
+    cache._conn.execute("UPDATE llm_responses SET created_at = created_at - 10")
+    assert cache.get("k9") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_response_cache_eviction_without_returning_support(tmp_path, monkeypatch):
+    import llm_cache
+
+    monkeypatch.setattr(llm_cache.sqlite3, "sqlite_version_info", (3, 31, 1))
+    cache = llm_cache.LLMResponseCache(path=str(tmp_path / "c.db"), enabled=True, max_bytes=1000, ttl_sec=60)
+    cache.put("old", "x" * 200)
+    cache._conn.execute("UPDATE llm_responses SET created_at = created_at - 120")
+    for i in range(5):
+        cache.put(f"k{i}", "y" * 200)
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["size_bytes"] <= 1000
+    assert stats["size_bytes"] == sum(len(v) for v in [cache.get(f"k{i}") or "" for i in range(5)])
+
+
+def test_global_inflight_limit_bounds_fan_out(tmp_path):
+    from llm_async import LLMEventLoop
+
+    engine, completions = _cached_engine(tmp_path, '{"status": "Met", "evidence": "x"}', delay=0.02)
+    engine.llm_loop = LLMEventLoop(max_inflight=2)
+
+    items = [("soft_skills", f"Skill {i}") for i in range(8)]
+    futures = engine.submit_criteria("resume text", items, concurrency=8, use_cache=False)
+    results = [f.result(timeout=5) for f in futures]
+    assert [r["status"] for r in results] == ["Met"] * 8
+    assert completions.peak == 2
+    stats = engine.governor_stats()
+    assert stats["peak_inflight"] == 2 and stats["completed"] == 8 and stats["inflight"] == 0
+
+
+def test_server_error_fails_over_to_another_endpoint(tmp_path):
+    class Unavailable(Exception):
+        status_code = 503
+
+    class DownCompletions:
+        async def create(self, **kwargs):
+            raise Unavailable("bad gateway")
+
+    engine, completions = _cached_engine(tmp_path, '{"status": "Met", "evidence": "x"}')
+    engine.endpoints = EndpointPool(
+        [
+            LLMEndpoint("http://down/v1", 5.0, async_client=_fake_client(DownCompletions())),
+            LLMEndpoint("http://up/v1", 1.0, async_client=_fake_client(completions)),
+        ]
+    )
+    result = engine.evaluate_criterion("resume", "soft_skills", "Teamwork", use_cache=False)
+    assert result["status"] == "Met"
+    down, up = engine.endpoint_stats()
+    assert down["errors"] == 1 and down["consecutive_failures"] == 1
+    assert up["requests"] == 1 and up["errors"] == 0
+
+
+def test_identical_inflight_calls_are_coalesced(tmp_path):
+    from llm_async import LLMEventLoop
+
+    engine, completions = _cached_engine(tmp_path, '{"status": "Met", "evidence": "x"}', delay=0.05)
+    engine.llm_loop = LLMEventLoop(max_inflight=8)
+    same = [("soft_skills", "Teamwork")] * 4
+    futures = engine.submit_criteria("resume text", same + [("soft_skills", "Focus")], concurrency=5)
+    results = [f.result(timeout=5) for f in futures]
+    assert all(r["status"] == "Met" for r in results)
+    assert completions.calls == 2
+    stats = engine.coalescing_stats()
+    assert stats["leaders"] == 2 and stats["coalesced"] == 3 and stats["inflight_keys"] == 0
+
+
+def test_standard_batch_matches_by_id_then_unique_name(tmp_path, monkeypatch):
+    content = json.dumps(
+        [
+            {"candidate_id": "r2", "candidate_name": "Bo", "match_score": 40, "decision": "Reject"},
+            {"candidate_name": "Al", "match_score": 85, "decision": "Strong Match"},
+            {"candidate_id": "zz", "candidate_name": "Unknown", "match_score": 70},
+        ]
+    )
+    engine, completions = _cached_engine(tmp_path, content)
+    # The unknown "zz" row is logged as a parse failure; keep it out of the working tree.
+    monkeypatch.setattr(engine, "_log_parse_failure", lambda *args, **kwargs: None)
+    candidates = [
+        {"candidate_id": "r1", "profile": {"candidate_name": "Al"}, "resume_text": "Al resume"},
+        {"candidate_id": "r2", "profile": {"candidate_name": "Bo"}, "resume_text": "Bo resume"},
+        {"candidate_id": "r3", "profile": {"candidate_name": "Cy"}, "resume_text": "Cy resume"},
+    ]
+    results = engine.evaluate_standard_batch({"must_have_skills": ["Python"]}, candidates)
+    assert completions.calls == 1
+    assert set(results) == {"r1", "r2"}
+    assert results["r1"]["match_score"] == 85
+    assert results["r2"]["decision"] == "Reject"
+
+
+def test_criterion_prompts_share_resume_prefix(tmp_path):
+    from llm_prefix import PromptPrefixTracker
+
+    engine, _ = _cached_engine(tmp_path, '{"status": "Met", "evidence": "x"}')
+    engine.prefix_tracker = PromptPrefixTracker(enabled=True)
+    resume = "Senior engineer. " * 200
+    for value in ("Kubernetes", "Terraform", "Go"):
+        engine.evaluate_criterion(resume, "soft_skills", value, use_cache=False)
+    row = engine.prefix_stats()["by_tag"]["evaluate_criterion"]
+    assert row["requests"] == 3
+    # Only the trailing requirement line differs between the three prompts.
+    assert row["reused_chars"] > 0.6 * row["prompt_chars"]
+
+
+def test_criterion_verdict_carries_the_requested_requirement(tmp_path):
+    engine, _ = _cached_engine(tmp_path, '{"requirement": "K8s", "status": "Met", "evidence": "x"}')
+    sync = engine.evaluate_criterion("Runs Kubernetes clusters.", "must_have_skills", "Kubernetes", use_cache=False)
+    assert (sync["requirement"], sync["category"]) == ("Kubernetes", "must_have_skills")
+
+    engine, _ = _cached_engine(tmp_path, '{"status": "Partial", "evidence": "x"}')
+    coro = engine.aevaluate_criterion("Some Terraform.", "nice_to_have_skills", "Terraform", use_cache=False)
+    result = engine.llm_loop.run(coro)
+    assert (result["requirement"], result["status"]) == ("Terraform", "Partial")
+
+
+def test_governor_settles_reported_or_estimated_usage(tmp_path):
+    from llm_async import LLMGovernor
+
+    class UsageCompletions(_FakeCompletions):
+        async def create(self, **kwargs):
+            resp = await super().create(**kwargs)
+            resp.usage = type("Usage", (), {"total_tokens": 321})()
+            return resp
+
+    engine, _ = _cached_engine(tmp_path, "")
+    engine.endpoints = EndpointPool(
+        [LLMEndpoint("http://fake/v1", 1.0, async_client=_fake_client(UsageCompletions('{"status": "Met"}')))]
+    )
+    governor = engine.llm_loop.governor
+    before = governor.stats()["tokens_used"]
+    engine.evaluate_criterion("resume", "soft_skills", "Teamwork", use_cache=False)
+    assert governor.stats()["tokens_used"] - before == 321
+
+    class StreamingCompletions:
+        def __init__(self):
+            self.kwargs = None
+
+        async def create(self, stream=False, **kwargs):
+            self.kwargs = kwargs
+
+            async def gen():
+                for part in ('{"status": "Met",', ' "evidence": "x"}', " and some prose"):
+                    delta = type("Delta", (), {"content": part})()
+                    yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})()], "usage": None})()
+
+            return gen()
+
+    streaming = StreamingCompletions()
+    engine.stream_json = True
+    engine.endpoints = EndpointPool([LLMEndpoint("http://fake/v1", 1.0, async_client=_fake_client(streaming))])
+    before = governor.stats()["tokens_used"]
+    engine.evaluate_criterion("resume", "soft_skills", "Teamwork", use_cache=False)
+    assert streaming.kwargs["stream_options"] == {"include_usage": True}
+    # Closed before the usage chunk: settled on the prompt plus the text received.
+    expected = LLMGovernor.estimate_used_tokens(streaming.kwargs["messages"], '{"status": "Met", "evidence": "x"}')
+    assert governor.stats()["tokens_used"] - before == expected
+
+
+def test_streaming_mode_stops_at_complete_json(tmp_path):
+    class StreamingCompletions:
+        def __init__(self):
+            self.streamed = []
+
+        async def create(self, stream=False, **kwargs):
+            assert stream
+            parts = ['<think>checking', '</think>{"status": ', '"Met", "evidence": "x"}', "\n\nExplanation: ..."]
+            consumed = self.streamed
+
+            async def gen():
+                for part in parts:
+                    consumed.append(part)
+                    delta = type("Delta", (), {"content": part})()
+                    yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})()]})()
+
+            return gen()
+
+    engine, _ = _cached_engine(tmp_path, "")
+    engine.stream_json = True
+    completions = StreamingCompletions()
+    engine.endpoints = EndpointPool([LLMEndpoint("http://fake/v1", 1.0, async_client=_fake_client(completions))])
+    result = engine.evaluate_criterion("resume", "soft_skills", "Teamwork", use_cache=False)
+    assert result["status"] == "Met"
+    assert len(completions.streamed) == 3
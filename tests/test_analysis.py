@@ -0,0 +1,269 @@
+"""Tests for AnalysisService deep-scan helpers."""
+
+import json
+import re
+
+
+def _count_criterion_calls(analysis):
+    # Both the sequential path and the async fan-out end up in the mock evaluator.
+    calls = []
+    original = analysis.llm._mock_evaluate_criterion
+
+    def counting(resume_text, category, value):
+        calls.append((category, value))
+        return original(resume_text, category, value)
+
+    analysis.llm._mock_evaluate_criterion = counting
+    return calls
+
+
+def _deep_scan(analysis, resume_text, items, concurrency=1):
+    return analysis._run_per_requirement_deep_scan(
+        resume_content=resume_text,
+        remaining_items=items,
+        resume_from=0,
+        total_reqs=len(items),
+        deep_details=[],
+        deep_ai_concurrency=concurrency,
+        log_fn=None,
+        progress_fn=None,
+    )
+
+
+def test_evidence_cache_reuses_verdicts_across_jds(analysis):
+    calls = _count_criterion_calls(analysis)
+    resume_text = "Backend engineer. Python, AWS, PostgreSQL."
+
+    first = _deep_scan(analysis, resume_text, [("must_have_skills", "Python"), ("must_have_skills", "AWS")])
+    assert len(calls) == 2
+
+    # Same requirement with different casing/whitespace in another JD is served from the cache.
+    second = _deep_scan(
+        analysis,
+        resume_text,
+        [("Must Have Skills", " python "), ("must_have_skills", "Kubernetes")],
+        concurrency=4,
+    )
+    assert calls[2:] == [("must_have_skills", "Kubernetes")]
+    assert second[0]["status"] == first[0]["status"] == "Met"
+    assert second[0]["requirement"] == " python "
+    assert second[1]["status"] == "Missing"
+
+    # A different resume text never shares verdicts.
+    _deep_scan(analysis, resume_text + " Go.", [("must_have_skills", "Python")])
+    assert len(calls) == 4
+
+
+def test_evidence_cache_covers_bulk_fallback(analysis):
+    calls = _count_criterion_calls(analysis)
+    resume_text = "Data analyst with SQL and Tableau."
+    _deep_scan(analysis, resume_text, [("must_have_skills", "SQL")])
+    assert len(calls) == 1
+
+    bulk_calls = []
+    analysis.llm.evaluate_bulk_criteria = lambda text, subset, **kw: bulk_calls.append(list(subset)) or []
+    details = analysis._run_bulk_deep_scan(
+        resume_content=resume_text,
+        remaining_items=[("must_have_skills", "SQL"), ("must_have_skills", "Tableau")],
+        resume_from=0,
+        total_reqs=2,
+        deep_details=[],
+        deep_ai_concurrency=1,
+        deep_single_prompt=True,
+        debug_bulk_log=False,
+        debug_run_id=None,
+        job_id=1,
+        resume_id=1,
+        log_fn=None,
+        progress_fn=None,
+    )
+    assert bulk_calls == [[("must_have_skills", "Tableau")]]
+    assert calls[1:] == [("must_have_skills", "Tableau")]
+    assert [d["status"] for d in details] == ["Met", "Met"]
+
+
+def test_evidence_cache_can_be_disabled(analysis):
+    analysis.evidence_cache_enabled = False
+    calls = _count_criterion_calls(analysis)
+    _deep_scan(analysis, "Python", [("must_have_skills", "Python")])
+    _deep_scan(analysis, "Python", [("must_have_skills", "Python")])
+    assert len(calls) == 2
+
+
+def test_force_rerun_deep_bypasses_evidence_cache(analysis, repo):
+    calls = _count_criterion_calls(analysis)
+    job = repo.add_job("jd.txt", "Python developer", {"must_have_skills": ["Python", "AWS"]}, tags=[])
+    resume = repo.add_resume("cv.txt", "Backend engineer. Python, AWS.", {"candidate_name": "A"}, tags=[])
+    _deep_scan(analysis, resume["content"], [("must_have_skills", "Python"), ("must_have_skills", "AWS")])
+    assert len(calls) == 2
+
+    analysis.score_match(job["id"], resume["id"], threshold=0, force_rerun_deep=True)
+    analysis.score_match(job["id"], resume["id"], threshold=0, force_rerun_deep=True)
+    assert len(calls) == 6
+    # Forced reruns neither read nor rewrite the cached verdicts.
+    hits = repo.db.fetch_all("SELECT SUM(hit_count), COUNT(*) FROM requirement_evidence")
+    assert tuple(hits[0]) == (0, 2)
+
+
+def test_batched_pass1_hands_results_to_queued_runs(analysis, repo):
+    job = repo.add_job("jd.txt", "Python developer", {"must_have_skills": ["Python"]}, tags=[])
+    resumes = [
+        repo.add_resume(f"cv{i}.txt", f"Candidate {i} writes Python daily.", {"name": f"C{i}"}, tags=[])
+        for i in range(3)
+    ]
+    batch_id, _ = repo.enqueue_run_batch(
+        "score_match", [{"job_id": job["id"], "resume_id": r["id"]} for r in resumes]
+    )
+
+    calls = {"batch": 0, "single": 0}
+    batch_original = analysis.llm.evaluate_standard_batch
+    single_original = analysis.llm.evaluate_standard
+
+    def counting_batch(*args, **kwargs):
+        calls["batch"] += 1
+        return batch_original(*args, **kwargs)
+
+    def counting_single(*args, **kwargs):
+        calls["single"] += 1
+        return single_original(*args, **kwargs)
+
+    analysis.llm.evaluate_standard_batch = counting_batch
+    analysis.llm.evaluate_standard = counting_single
+
+    for r in resumes:
+        analysis.score_match(job["id"], r["id"], pass1_batch_size=3, batch_id=batch_id)
+    assert calls == {"batch": 1, "single": 0}
+    # Hand-offs are one-shot: a later rerun of the same pair scores afresh.
+    analysis.score_match(job["id"], resumes[1]["id"], force_rerun_pass1=True, pass1_batch_size=3)
+    assert calls == {"batch": 1, "single": 1}
+
+
+def _handoff_rows(repo, batch_id):
+    rows = repo.db.fetch_all("SELECT resume_id FROM pass1_handoff WHERE batch_id = ? ORDER BY resume_id", (batch_id,))
+    return [row[0] for row in rows]
+
+
+def test_pass1_handoffs_stay_in_their_batch_and_are_purged_when_runs_end(analysis, repo):
+    job = repo.add_job("jd.txt", "Python developer", {"must_have_skills": ["Python"]}, tags=[])
+    resumes = [
+        repo.add_resume(f"cv{i}.txt", f"Candidate {i} writes Python daily.", {"name": f"C{i}"}, tags=[])
+        for i in range(3)
+    ]
+    batch_id, run_ids = repo.enqueue_run_batch(
+        "score_match", [{"job_id": job["id"], "resume_id": r["id"]} for r in resumes]
+    )
+    analysis.score_match(job["id"], resumes[0]["id"], pass1_batch_size=3, batch_id=batch_id)
+    assert _handoff_rows(repo, batch_id) == [resumes[1]["id"], resumes[2]["id"]]
+
+    # A forced rerun outside the batch scores afresh and leaves the hand-off alone.
+    single = {"calls": 0}
+    original = analysis.llm.evaluate_standard
+
+    def counting_single(*args, **kwargs):
+        single["calls"] += 1
+        return original(*args, **kwargs)
+
+    analysis.llm.evaluate_standard = counting_single
+    analysis.score_match(job["id"], resumes[2]["id"], force_rerun_pass1=True, pass1_batch_size=3)
+    assert single["calls"] == 1
+    assert _handoff_rows(repo, batch_id) == [resumes[1]["id"], resumes[2]["id"]]
+
+    # Canceling a queued peer drops its own hand-off only.
+    assert repo.cancel_run(run_ids[1])
+    assert _handoff_rows(repo, batch_id) == [resumes[2]["id"]]
+
+    # Once nothing in the batch is left to run, every leftover row goes.
+    repo.db.save_pass1_handoffs(batch_id, [(job["id"], 999, "c", "r", "m", {"match_score": 1})])
+    claimed = {run["id"] for run in repo.claim_next_runs(limit=2, max_running=3)}
+    assert claimed == {run_ids[0], run_ids[2]}
+    repo.complete_run(run_ids[0], {"match_id": 1})
+    assert _handoff_rows(repo, batch_id) == [resumes[2]["id"], 999]
+    repo.fail_run(run_ids[2], "boom")
+    assert _handoff_rows(repo, batch_id) == []
+
+
+def test_pop_pass1_handoff_without_returning_support(repo, monkeypatch):
+    import database
+
+    monkeypatch.setattr(database.sqlite3, "sqlite_version_info", (3, 31, 1))
+    repo.save_pass1_handoffs(7, [(1, 2, "crit", "res", "model", {"match_score": 80})])
+    assert repo.pop_pass1_handoff(8, "crit", "res", "model") is None
+    assert repo.pop_pass1_handoff(7, "crit", "res", "model") == {"match_score": 80}
+    assert repo.pop_pass1_handoff(7, "crit", "res", "model") is None
+
+
+class _RoutedCompletions:
+    """Answers Pass 1 (single or batched) and criterion prompts validly, counting each request."""
+
+    def __init__(self):
+        self.calls = {"standard": 0, "criterion": 0}
+
+    async def create(self, **kwargs):
+        prompt = " ".join(str(m.get("content")) for m in kwargs["messages"])
+        if "Verify if the resume meets the requirement" in prompt:
+            self.calls["criterion"] += 1
+            content = '{"status": "Met", "evidence": "Python"}'
+        elif "SEVERAL candidates" in prompt:
+            self.calls["standard"] += 1
+            ids = sorted(set(re.findall(r"\br\d+\b", prompt)))
+            content = json.dumps([{"candidate_id": cid, "match_score": 90, "decision": "Move Forward"} for cid in ids])
+        else:
+            self.calls["standard"] += 1
+            content = '{"match_score": 90, "decision": "Move Forward", "reasoning": "ok", "missing_skills": []}'
+        message = type("Msg", (), {"content": content})()
+        return type("Resp", (), {"choices": [type("Choice", (), {"message": message})()]})()
+
+
+def _model_backed_analysis(repo, tmp_path):
+    from ai_engine import AIEngine
+    from backend.services.analysis import AnalysisService
+    from llm_cache import LLMResponseCache
+    from llm_endpoints import EndpointPool, LLMEndpoint
+    from prescreen import PrescreenEngine
+
+    engine = AIEngine(
+        base_url="http://127.0.0.1:9/v1",
+        api_key="test-key",
+        preferred_model="test-model",
+        response_cache=LLMResponseCache(path=str(tmp_path / "llm_cache.db"), enabled=True),
+        prescreen=PrescreenEngine(enabled=False),
+    )
+    completions = _RoutedCompletions()
+    client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+    engine.endpoints = EndpointPool([LLMEndpoint("http://fake/v1", 1.0, async_client=client)])
+    return AnalysisService(repo=repo, llm=engine), completions
+
+
+def test_force_rerun_deep_asks_the_model_again(repo, tmp_path):
+    analysis, completions = _model_backed_analysis(repo, tmp_path)
+    job = repo.add_job("jd.txt", "Python developer", {"must_have_skills": ["Python", "AWS"]}, tags=[])
+    resume = repo.add_resume("cv.txt", "Backend engineer. Python, AWS.", {"candidate_name": "A"}, tags=[])
+
+    for _ in range(3):
+        analysis.score_match(
+            job["id"], resume["id"], threshold=0, auto_deep=True, force_rerun_pass1=True, force_rerun_deep=True
+        )
+    # Neither the evidence cache nor the response cache replays a forced Deep Scan.
+    assert completions.calls["criterion"] == 6
+
+
+def test_force_rerun_pass1_asks_the_model_again(repo, tmp_path):
+    analysis, completions = _model_backed_analysis(repo, tmp_path)
+    job = repo.add_job("jd.txt", "Python developer", {"must_have_skills": ["Python"]}, tags=[])
+    resumes = [
+        repo.add_resume(f"cv{i}.txt", f"Candidate {i} writes Python daily.", {"name": f"C{i}"}, tags=[])
+        for i in range(2)
+    ]
+    for _ in range(3):
+        analysis.score_match(job["id"], resumes[0]["id"], force_rerun_pass1=True)
+    assert completions.calls["standard"] == 3
+
+    # The batched request is not replayed either.
+    for _ in range(2):
+        batch_id, _ = repo.enqueue_run_batch(
+            "score_match", [{"job_id": job["id"], "resume_id": r["id"]} for r in resumes]
+        )
+        analysis.score_match(
+            job["id"], resumes[0]["id"], force_rerun_pass1=True, pass1_batch_size=2, batch_id=batch_id
+        )
+    assert completions.calls["standard"] == 5
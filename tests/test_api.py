@@ -111,3 +111,91 @@ def test_create_run_invalid_type(client):
         "payload": {},
     })
     assert resp.status_code == 400
+
+
+def test_create_matrix_runs(client):
+    job_ids = [
+        client.post("/v1/jobs", json={"filename": f"j{i}.pdf", "content": "JD text", "tags": ["eng"]}).json()["id"]
+        for i in range(2)
+    ]
+    tagged = client.post("/v1/resumes", json={"filename": "a.pdf", "content": "Resume A", "tags": ["eng"]}).json()["id"]
+    other = client.post("/v1/resumes", json={"filename": "b.pdf", "content": "Resume B", "tags": ["ops"]}).json()["id"]
+
+    resp = client.post("/v1/runs/matrix", json={
+        "job_ids": job_ids,
+        "resume_ids": [tagged, other],
+        "threshold": 60,
+        "legacy_run_ids": {str(job_ids[0]): 7},
+    })
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["queued"] == 4 and len(data["run_ids"]) == 4
+    first = client.get(f"/v1/runs/{data['run_ids'][0]}").json()
+    assert first["job_type"] == "score_match"
+    assert first["payload"]["batch_id"] == data["batch_id"]
+    assert first["payload"]["threshold"] == 60
+    assert first["payload"]["legacy_run_id"] == 7
+    assert first["payload"]["batch_total_for_job"] == 2
+    last = client.get(f"/v1/runs/{data['run_ids'][-1]}").json()
+    assert (last["payload"]["job_id"], last["payload"]["resume_id"]) == (job_ids[1], other)
+    assert last["payload"]["legacy_run_id"] is None
+
+    # Tag selection plus JD/resume tag matching keeps only the shared-tag resume.
+    resp = client.post("/v1/runs/matrix", json={"job_tags": ["eng"], "resume_tags": ["eng", "ops"], "match_tags": True})
+    assert resp.status_code == 200
+    assert resp.json()["queued"] == 2
+
+
+def test_create_matrix_runs_validation(client):
+    job_id = client.post("/v1/jobs", json={"filename": "j.pdf", "content": "JD text"}).json()["id"]
+    assert client.post("/v1/runs/matrix", json={"job_ids": [job_id]}).status_code == 400
+    assert client.post("/v1/runs/matrix", json={"job_ids": [job_id], "resume_ids": [999]}).status_code == 404
+
+
+def test_create_upload_run_batch(client):
+    payloads = [
+        {"filename": f"cv{i}.txt", "content_b64": "UHl0aG9uIGRldmVsb3Blcg==", "tags": ["eng"]} for i in range(3)
+    ]
+    resp = client.post("/v1/runs/batch", json={"job_type": "ingest_resume_file", "payloads": payloads})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["queued"] == 3 and len(data["run_ids"]) == 3
+    run = client.get(f"/v1/runs/{data['run_ids'][0]}").json()
+    assert run["job_type"] == "ingest_resume_file"
+    assert run["payload"]["batch_id"] == data["batch_id"]
+    batch = client.get(f"/v1/batches/{data['batch_id']}").json()
+    assert (batch["total"], batch["job_type"], batch["label"]) == (3, "ingest_resume_file", "Upload 3 file(s)")
+
+    assert client.post("/v1/runs/batch", json={"job_type": "score_match", "payloads": payloads}).status_code == 400
+    assert client.post("/v1/runs/batch", json={"job_type": "ingest_auto_file", "payloads": []}).status_code == 400
+
+
+def test_get_batch(client):
+    job_id = client.post("/v1/jobs", json={"filename": "j.pdf", "content": "JD text"}).json()["id"]
+    resume_id = client.post("/v1/resumes", json={"filename": "r.pdf", "content": "Resume text"}).json()["id"]
+    batch_id = client.post("/v1/runs/matrix", json={"job_ids": [job_id], "resume_ids": [resume_id]}).json()["batch_id"]
+
+    resp = client.get(f"/v1/batches/{batch_id}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["id"] == batch_id and data["total"] == 1
+    assert client.get("/v1/batches/999999").status_code == 404
+
+
+def test_event_stream_replays_from_last_event_id(client):
+    job_id = client.post("/v1/jobs", json={"filename": "j.pdf", "content": "JD text"}).json()["id"]
+    resume_id = client.post("/v1/resumes", json={"filename": "r.pdf", "content": "Resume text"}).json()["id"]
+    client.post("/v1/runs/matrix", json={"job_ids": [job_id], "resume_ids": [resume_id]})
+
+    resp = client.get("/v1/events", params={"max_seconds": 0.3}, headers={"Last-Event-ID": "0"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert "event: batch" in resp.text
+
+
+def test_prescreen_report(client):
+    resp = client.get("/v1/prescreen/report?sample=50")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["labeled"] == 0 and data["agreement"] is None
+    assert "skip_rate" in data["live"]
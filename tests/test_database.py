@@ -3,6 +3,8 @@
 import json
 import sqlite3
 
+import pytest
+
 
 def test_tables_created(db):
     """All expected tables exist after init."""
@@ -140,3 +142,55 @@ def test_save_match_update(db):
     assert mid2 == mid
     row = db.get_match_if_exists(job["id"], resume["id"])
     assert row["match_score"] == 90
+
+
+def test_connection_pool_reuses_connections(db):
+    first = db.get_connection()
+    first.close()
+    second = db.get_connection()
+    second.close()
+    assert first is second
+
+
+def test_connection_pool_rolls_back_uncommitted_work(db):
+    conn = db.get_connection()
+    conn.execute("INSERT INTO tags (name) VALUES ('pending')")
+    conn.close()
+    assert db.list_tags() == []
+
+
+def test_close_pool_drops_idle_connections(db):
+    conn = db.get_connection()
+    conn.close()
+    db.close_pool()
+    fresh = db.get_connection()
+    fresh.close()
+    assert fresh is not conn
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_pool_disabled_closes_connections(tmp_db):
+    from database import DBManager
+    unpooled = DBManager(db_path=tmp_db, pool_size=0)
+    conn = unpooled.get_connection()
+    conn.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_import_does_not_load_pandas():
+    """pandas is only imported when a caller asks for a DataFrame."""
+    import os
+    import subprocess
+    import sys
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, database, document_utils; print('pandas' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_fetch_dataframe_still_available(db):
+    db.add_tag("export")
+    df = db.fetch_dataframe("SELECT name FROM tags WHERE name = ?", params=("export",))
+    assert list(df["name"]) == ["export"]
@@ -50,3 +50,120 @@ def test_clean_json_response_with_surrounding_text():
     raw = 'Here is the result:\n{"score": 42}\nEnd of output.'
     result = clean_json_response(raw)
     assert result == {"score": 42}
+
+
+def _blank_pdf(pages):
+    import pypdf
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def test_pdf_ocr_fallback_runs_page_by_page(monkeypatch):
+    import document_utils
+
+    rendered = []
+
+    def fake_ocr_page(pdf_path, page_no, settings=None):
+        rendered.append(page_no)
+        return {"text": f"Page {page_no}: experienced engineer with Python and SQL background.", "dpi": 200}
+
+    monkeypatch.setattr(document_utils, "PDF2IMAGE_AVAILABLE", True)
+    monkeypatch.setattr(document_utils, "_ocr_page", fake_ocr_page)
+    monkeypatch.setenv("RESUME_MATCHER_OCR_WORKERS", "1")
+    text = document_utils.extract_text_from_pdf(_blank_pdf(3), use_ocr=True)
+    assert rendered == [1, 2, 3]
+    assert text.index("Page 1:") < text.index("Page 2:") < text.index("Page 3:")
+
+
+def test_pdf_ocr_only_bad_pages_and_merges_in_order(monkeypatch):
+    import document_utils
+
+    good = "Experienced backend engineer building Python services and SQL data pipelines for payments."
+    native = [f"Page one. {good}", "", f"Page three. {good}", None]
+    rendered = []
+
+    def fake_ocr_page(pdf_path, page_no, settings=None):
+        rendered.append(page_no)
+        return {"text": f"Scanned page {page_no}. {good}", "dpi": 200}
+
+    monkeypatch.setattr(document_utils, "PDF2IMAGE_AVAILABLE", True)
+    monkeypatch.setattr(document_utils, "_native_pages", lambda file_bytes, log: (list(native), False))
+    monkeypatch.setattr(document_utils, "_ocr_page", fake_ocr_page)
+    monkeypatch.setenv("RESUME_MATCHER_OCR_WORKERS", "1")
+    text = document_utils.extract_text_from_pdf(b"%PDF", use_ocr=True)
+    assert sorted(rendered) == [2, 4]
+    order = [text.index(marker) for marker in ("Page one.", "Scanned page 2.", "Page three.", "Scanned page 4.")]
+    assert order == sorted(order)
+
+
+def test_ocr_page_escalates_dpi_only_while_confidence_is_low(monkeypatch):
+    import types
+
+    from PIL import Image
+
+    import document_utils
+
+    rendered = []
+
+    def fake_convert(pdf_path, dpi, first_page, last_page):
+        rendered.append(dpi)
+        img = Image.new("RGB", (40, 40), "white")
+        img.putpixel((5, 5), (0, 0, 0))
+        return [img]
+
+    def fake_image_to_data(img, config=None, output_type=None):
+        conf = {200: 40, 300: 82, 400: 95}[rendered[-1]]
+        return {
+            "text": ["Senior", "Engineer", "Python"],
+            "conf": [conf, conf, conf],
+            "block_num": [1, 1, 1],
+            "par_num": [1, 1, 1],
+            "line_num": [1, 1, 2],
+        }
+
+    fake_tesseract = types.SimpleNamespace(
+        image_to_data=fake_image_to_data, Output=types.SimpleNamespace(DICT="dict")
+    )
+    monkeypatch.setattr(document_utils, "convert_from_path", fake_convert)
+    monkeypatch.setattr(document_utils, "_load_pytesseract", lambda: fake_tesseract)
+
+    settings = {"dpi_steps": (200, 300, 400), "min_confidence": 75.0, "preprocess": ("grayscale",)}
+    detail = document_utils._ocr_page("unused.pdf", 1, settings)
+    assert rendered == [200, 300]
+    assert detail["dpi"] == 300
+    assert detail["attempts"] == 2
+    assert detail["text"] == "Senior Engineer\nPython"
+
+
+def test_ocr_settings_and_preprocessing(monkeypatch):
+    from PIL import Image, ImageDraw
+
+    import document_utils
+
+    monkeypatch.setenv("RESUME_MATCHER_OCR_DPI", "250")
+    monkeypatch.delenv("RESUME_MATCHER_OCR_DPI_STEPS", raising=False)
+    monkeypatch.setenv("RESUME_MATCHER_OCR_PREPROCESS", "binarize, bogus,deskew")
+    settings = document_utils._ocr_settings()
+    assert settings["dpi_steps"] == (250,)
+    assert settings["preprocess"] == ("binarize", "deskew")
+
+    monkeypatch.delenv("RESUME_MATCHER_OCR_DPI")
+    assert document_utils._ocr_settings()["dpi_steps"] == (300,)
+    monkeypatch.setenv("RESUME_MATCHER_OCR_DPI_STEPS", "adaptive")
+    assert document_utils._ocr_settings()["dpi_steps"] == (200, 300, 400)
+
+    img = Image.new("RGB", (200, 120), (235, 235, 235))
+    draw = ImageDraw.Draw(img)
+    for y in range(20, 110, 20):
+        draw.rectangle([20, y, 180, y + 6], fill=(40, 40, 40))
+    skewed = img.rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=(235, 235, 235))
+
+    assert abs(document_utils._estimate_skew(skewed.convert("L")) + 3) <= 1.0
+    out = document_utils.preprocess_page_image(skewed, ("binarize",))
+    assert out.mode == "L"
+    assert {i for i, n in enumerate(out.histogram()) if n} <= {0, 255}
+    assert document_utils.preprocess_page_image(img, ()) is img
@@ -0,0 +1,114 @@
+"""Tests for GitHubSyncService DB snapshot handling (no network)."""
+
+import base64
+import sqlite3
+import types
+
+from backend.services.github_sync_service import GitHubSyncService
+from database import DBManager
+
+
+def _fake_remote(file_bytes):
+    contents = types.SimpleNamespace(content=base64.b64encode(file_bytes).decode("ascii"), sha="remote-sha")
+    return types.SimpleNamespace(get_contents=lambda name: contents)
+
+
+def _rows(db_bytes, tmp_path, query):
+    path = tmp_path / "inspect.db"
+    path.write_bytes(db_bytes)
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+        path.unlink()
+
+
+def test_push_bytes_include_writes_still_in_wal(tmp_path):
+    db = DBManager(db_path=str(tmp_path / "local.db"), pool_size=4)
+    for i in range(20):
+        db.add_tag(f"tag-{i}")
+    sync = GitHubSyncService(db_path=db.db_path, close_pool=db.close_pool)
+
+    pushed = sync._build_sanitized_db_bytes_for_push()
+
+    assert _rows(pushed, tmp_path, "SELECT COUNT(*) FROM tags") == [(20,)]
+    assert sync._local_blob_sha() == sync._blob_sha_from_bytes(pushed)
+    # The local DB keeps working through the pool afterwards.
+    db.add_tag("after-push")
+    assert len(db.list_tags()) == 21
+
+
+def test_pull_replaces_db_through_backup_api(tmp_path, monkeypatch):
+    remote = DBManager(db_path=str(tmp_path / "remote.db"), pool_size=0)
+    remote.add_tag("remote-only")
+    remote_sync = GitHubSyncService(db_path=remote.db_path)
+    remote_bytes = remote_sync._build_sanitized_db_bytes_for_push()
+
+    db = DBManager(db_path=str(tmp_path / "local.db"), pool_size=4)
+    db.add_tag("local-only")
+    sync = GitHubSyncService(db_path=db.db_path, close_pool=db.close_pool)
+    monkeypatch.setattr(sync, "_client", lambda: (None, _fake_remote(remote_bytes), None))
+
+    ok, msg = sync.pull_db()
+
+    assert ok, msg
+    assert db.list_tags() == ["remote-only"]
+    conn = sqlite3.connect(db.db_path)
+    assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    conn.close()
+
+
+def test_pull_preserves_local_batches_and_run_batch_ids(tmp_path, monkeypatch):
+    from backend.services.repository import Repository
+
+    remote = DBManager(db_path=str(tmp_path / "remote.db"), pool_size=0)
+    remote_repo = Repository(db=remote)
+    remote_repo.enqueue_run_batch("score_match", [{"n": 99}], label="remote batch")
+    remote_bytes = GitHubSyncService(db_path=remote.db_path)._build_sanitized_db_bytes_for_push()
+
+    db = DBManager(db_path=str(tmp_path / "local.db"), pool_size=4)
+    repo = Repository(db=db)
+    batch_id, run_ids = repo.enqueue_run_batch("ingest_resume_file", [{"n": 1}, {"n": 2}, {"n": 3}], label="local")
+    first, second = repo.claim_next_runs(limit=2, max_running=3)
+    repo.complete_run(first["id"], {"resume_id": 1, "skipped": True})
+    repo.complete_run(second["id"], {"resume_id": 2})
+    before = repo.get_batch(batch_id)
+
+    sync = GitHubSyncService(db_path=db.db_path, close_pool=db.close_pool)
+    monkeypatch.setattr(sync, "_client", lambda: (None, _fake_remote(remote_bytes), None))
+    ok, msg = sync.pull_db()
+    assert ok, msg
+    db._init_db()
+
+    after = repo.get_batch(batch_id)
+    for key in ("total", "queued", "completed", "skipped", "label"):
+        assert after[key] == before[key]
+    assert (after["total"], after["completed"], after["queued"], after["skipped"]) == (3, 2, 1, 1)
+    batch_ids = db.fetch_all(f"SELECT batch_id FROM job_runs WHERE id IN ({','.join('?' * len(run_ids))})", run_ids)
+    assert [row[0] for row in batch_ids] == [batch_id] * 3
+
+    # Trigger-maintained counters keep tracking the restored runs.
+    (third,) = repo.claim_next_runs(limit=1, max_running=3)
+    repo.complete_run(third["id"], {"resume_id": 3, "skipped": True})
+    final = repo.get_batch(batch_id)
+    assert (final["completed"], final["queued"], final["skipped"], final["status"]) == (3, 0, 2, "completed")
+
+
+def test_evidence_cache_is_not_pushed_and_survives_pull(tmp_path, monkeypatch):
+    remote = DBManager(db_path=str(tmp_path / "remote.db"), pool_size=0)
+    remote.add_tag("remote-only")
+    remote_bytes = GitHubSyncService(db_path=remote.db_path)._build_sanitized_db_bytes_for_push()
+
+    db = DBManager(db_path=str(tmp_path / "local.db"), pool_size=4)
+    db.save_requirement_evidence("r" * 64, "model", [("must_have_skills", "python", "Met", "Python")])
+    sync = GitHubSyncService(db_path=db.db_path, close_pool=db.close_pool)
+
+    pushed = sync._build_sanitized_db_bytes_for_push()
+    assert _rows(pushed, tmp_path, "SELECT COUNT(*) FROM requirement_evidence") == [(0,)]
+
+    monkeypatch.setattr(sync, "_client", lambda: (None, _fake_remote(remote_bytes), None))
+    ok, msg = sync.pull_db()
+    assert ok, msg
+    assert db.list_tags() == ["remote-only"]
+    assert db.get_requirement_evidence("r" * 64, "model", [("must_have_skills", "python")])
@@ -28,10 +28,11 @@ def test_runner_start_stop(repo, mock_llm):
     analysis = AnalysisService(repo=repo, llm=mock_llm)
     runner = JobRunner(repo=repo, analysis=analysis, poll_seconds=0.1, worker_pool_size=1)
     runner.start()
-    assert any(t.is_alive() for t in runner._threads)
+    threads = list(runner._threads)
+    assert any(t.is_alive() for t in threads)
     runner.stop()
     # After stop, threads should no longer be alive.
-    assert all(not t.is_alive() for t in runner._threads)
+    assert all(not t.is_alive() for t in threads)
 
 
 def test_claim_next_run(repo):
@@ -69,3 +70,265 @@ def test_runner_processes_ingest_job(repo, mock_llm):
     row = repo.get_run(run_id)
     assert row is not None
     assert row["status"] == "completed"
+
+
+def test_idle_runner_wakes_on_enqueue(repo, mock_llm):
+    """An idle worker is woken by enqueue instead of waiting for the fallback poll."""
+    from backend.services.analysis import AnalysisService
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    runner = JobRunner(repo=repo, analysis=analysis, idle_poll_seconds=30.0, worker_pool_size=2)
+    runner.start()
+    time.sleep(0.3)  # let workers find the queue empty and block
+
+    run_id = repo.enqueue_run(
+        job_type="ingest_job",
+        payload={"filename": "wake_jd.pdf", "content": "Engineer\nmust have: Go", "tags": []},
+    )
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        row = repo.get_run(run_id)
+        if row and row["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    threads = list(runner._threads)
+    assert len(threads) == 4  # 2 workers, dispatcher, queue normalizer
+    started = time.time()
+    runner.stop()
+
+    assert repo.get_run(run_id)["status"] == "completed"
+    # stop() must wake blocked workers rather than waiting out idle_poll_seconds.
+    assert time.time() - started < 5
+    assert all(not t.is_alive() for t in threads)
+
+
+def test_queue_signal_keeps_token_without_waiter():
+    from backend.services.repository import RunQueueSignal
+    signal = RunQueueSignal(max_pending=2)
+    for _ in range(5):
+        signal.notify()
+    assert signal.wait(timeout=0) is True
+    assert signal.wait(timeout=0) is True
+    assert signal.wait(timeout=0) is False
+
+
+def test_claim_next_runs_batch(repo):
+    ids = [repo.enqueue_run(job_type="score_match", payload={"n": i}) for i in range(5)]
+
+    claimed = repo.claim_next_runs(limit=3, max_running=4)
+    assert [r["id"] for r in claimed] == ids[:3]
+    assert all(r["status"] == "running" and r["current_step"] == "started" for r in claimed)
+    assert claimed[0]["payload"] == {"n": 0}
+
+    # Only one running slot left under max_running=4.
+    more = repo.claim_next_runs(limit=3, max_running=4)
+    assert [r["id"] for r in more] == ids[3:4]
+    assert repo.claim_next_runs(limit=3, max_running=4) == []
+
+
+def test_runner_dispatches_batch_to_workers(repo, mock_llm):
+    from backend.services.analysis import AnalysisService
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    runner = JobRunner(repo=repo, analysis=analysis, worker_pool_size=3, max_running_getter=3)
+
+    run_ids = [
+        repo.enqueue_run(
+            job_type="ingest_job",
+            payload={"filename": f"batch_{i}.pdf", "content": f"Engineer {i}\nmust have: Go", "tags": []},
+        )
+        for i in range(6)
+    ]
+    runner.start()
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        statuses = [repo.get_run(rid)["status"] for rid in run_ids]
+        if all(s in ("completed", "failed") for s in statuses):
+            break
+        time.sleep(0.05)
+    runner.stop()
+
+    assert [repo.get_run(rid)["status"] for rid in run_ids] == ["completed"] * 6
+
+
+def test_normalize_queue_demotes_extra_running_and_counts(repo):
+    ids = [repo.enqueue_run(job_type="score_match", payload={}) for _ in range(3)]
+    assert len(repo.claim_next_runs(limit=3, max_running=3)) == 3
+
+    before = repo.queue_normalization_stats()
+    assert repo.normalize_queue(max_running=3) == 0
+    assert repo.normalize_queue(max_running=1) == 2
+
+    assert [repo.get_run(rid)["status"] for rid in ids] == ["running", "queued", "queued"]
+    stats = repo.queue_normalization_stats()
+    assert stats["runs"] == before["runs"] + 2
+    assert stats["runs_with_fixes"] == before["runs_with_fixes"] + 1
+    assert stats["rows_fixed"] == before["rows_fixed"] + 2
+    assert stats["last_fixed_at"]
+
+    # The claim path no longer repairs state, so it only respects the live counts.
+    assert repo.claim_next_runs(limit=2, max_running=1) == []
+    assert [r["id"] for r in repo.claim_next_runs(limit=2, max_running=3)] == ids[1:]
+
+
+def test_file_ingest_dedupes_by_content_hash(repo, mock_llm, monkeypatch, tmp_path):
+    import base64
+
+    from backend.services.analysis import AnalysisService
+    from text_cache import ExtractedTextCache
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    runner = JobRunner(repo=repo, analysis=analysis, text_cache=ExtractedTextCache(path=str(tmp_path / "text.db")))
+    analyzed = []
+    real_analyze = mock_llm.analyze_resume
+    monkeypatch.setattr(
+        mock_llm, "analyze_resume", lambda text, **kwargs: analyzed.append(text) or real_analyze(text, **kwargs)
+    )
+
+    def upload(filename, text, tags):
+        return {
+            "filename": filename,
+            "content_b64": base64.b64encode(text.encode("utf-8")).decode("ascii"),
+            "tags": tags,
+        }
+
+    resume = "Jane Doe\nSenior Engineer\nPython, SQL, AWS"
+    batch_id, run_ids = repo.enqueue_run_batch(
+        "ingest_resume_file",
+        [
+            upload("jane.txt", resume, ["referral"]),
+            upload("jane_copy.txt", resume, ["linkedin"]),
+            upload("jane_reformatted.txt", "JANE DOE  Senior Engineer\n\nPython, SQL, AWS\n", []),
+        ],
+    )
+    results = []
+    for run in repo.claim_next_runs(limit=3, max_running=3):
+        result = runner._execute(run["id"], run["job_type"], run["payload"])
+        repo.complete_run(run["id"], result)
+        results.append(result)
+
+    assert len(analyzed) == 1
+    first_id = results[0]["resume_id"]
+    assert "skipped" not in results[0]
+    assert results[1]["skipped"] and results[1]["resume_id"] == first_id
+    assert results[1]["duplicate_of"]["matched_on"] == "file_sha256"
+    assert results[2]["duplicate_of"]["matched_on"] == "content_sha256"
+    assert repo.get_resume(first_id)["tags"] == ["referral", "linkedin"]
+    assert repo.get_batch(batch_id)["skipped"] == 2
+
+
+def test_failed_extractions_are_not_deduped_by_content_hash(repo, mock_llm, tmp_path):
+    import base64
+
+    from backend.services.analysis import AnalysisService
+    from text_cache import ExtractedTextCache
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    runner = JobRunner(repo=repo, analysis=analysis, text_cache=ExtractedTextCache(path=str(tmp_path / "text.db")))
+
+    def upload(filename, raw):
+        return {"filename": filename, "content_b64": base64.b64encode(raw).decode("ascii"), "tags": []}
+
+    # Different bytes, same "Error reading DOCX: File is not a zip file" placeholder.
+    _, run_ids = repo.enqueue_run_batch(
+        "ingest_resume_file",
+        [upload("alice.docx", b"not a zip"), upload("bob.docx", b"also not a zip"), upload("blank.txt", b"  \n")],
+    )
+    results = []
+    for run in repo.claim_next_runs(limit=3, max_running=3):
+        result = runner._execute(run["id"], run["job_type"], run["payload"])
+        repo.complete_run(run["id"], result)
+        results.append(result)
+
+    assert all("duplicate_of" not in result for result in results)
+    assert len({result["resume_id"] for result in results}) == 3
+    assert repo.get_resume(results[0]["resume_id"])["content"].startswith("Error reading DOCX")
+    rows = repo.db.fetch_all("SELECT content_sha256 FROM resumes")
+    assert [row[0] for row in rows] == [None, None, None]
+
+    # Fingerprints stored for placeholders by earlier builds are cleared on startup.
+    repo.db.execute_query("UPDATE resumes SET content_sha256 = 'stale' WHERE id = ?", (results[0]["resume_id"],))
+    repo.db._init_db()
+    assert repo.db.find_resume_by_hash(content_sha256="stale") is None
+
+
+def test_force_reparse_reuses_cached_extracted_text(repo, mock_llm, monkeypatch, tmp_path):
+    import base64
+
+    from backend.services.analysis import AnalysisService
+    from text_cache import ExtractedTextCache
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    cache = ExtractedTextCache(path=str(tmp_path / "text.db"))
+    runner = JobRunner(repo=repo, analysis=analysis, text_cache=cache)
+    extracted = []
+    real_extract = runner._extract_uploaded_text
+    monkeypatch.setattr(
+        runner, "_extract_uploaded_text", lambda **kw: extracted.append(kw["filename"]) or real_extract(**kw)
+    )
+
+    payload = {
+        "filename": "jd.txt",
+        "content_b64": base64.b64encode(b"Backend Engineer\nmust have: Go, Postgres").decode("ascii"),
+        "tags": [],
+    }
+    first = runner._execute(repo.enqueue_run("ingest_job_file", payload), "ingest_job_file", payload)
+    rerun = dict(payload, force_reparse=True)
+    second = runner._execute(repo.enqueue_run("ingest_job_file", rerun), "ingest_job_file", rerun)
+
+    assert second["job_id"] == first["job_id"]
+    assert extracted == ["jd.txt"]
+    assert cache.stats()["hits"] == 1
+    assert repo.get_job(first["job_id"])["content"] == "Backend Engineer\nmust have: Go, Postgres"
+
+    # A different normalization/OCR version misses instead of serving stale text.
+    monkeypatch.setattr(runner, "_extraction_version", lambda file_type: "changed")
+    runner._execute(repo.enqueue_run("ingest_job_file", rerun), "ingest_job_file", rerun)
+    assert extracted == ["jd.txt", "jd.txt"]
+
+
+def test_text_cache_evicts_least_recently_used(tmp_path):
+    from text_cache import ExtractedTextCache
+
+    cache = ExtractedTextCache(path=str(tmp_path / "text.db"), max_bytes=250)
+    cache.put("a", "pdf", "v1", "a" * 100)
+    cache.put("b", "pdf", "v1", "b" * 100)
+    assert cache.get("a", "pdf", "v1") == "a" * 100
+    cache.put("c", "pdf", "v1", "c" * 100)
+
+    assert cache.get("b", "pdf", "v1") is None
+    assert cache.get("a", "pdf", "v1") == "a" * 100
+    assert cache.get("a", "pdf", "v2") is None
+    assert cache.stats()["evicted"] == 1
+
+
+def test_forced_reparse_and_reprocess_bypass_the_response_cache(repo, mock_llm, monkeypatch, tmp_path):
+    import base64
+
+    from backend.services.analysis import AnalysisService
+    from text_cache import ExtractedTextCache
+    analysis = AnalysisService(repo=repo, llm=mock_llm)
+    runner = JobRunner(repo=repo, analysis=analysis, text_cache=ExtractedTextCache(path=str(tmp_path / "text.db")))
+    seen = []
+    for name in ("analyze_resume", "analyze_jd"):
+        real = getattr(mock_llm, name)
+        monkeypatch.setattr(
+            mock_llm, name, lambda text, _real=real, _name=name, **kwargs: seen.append((_name, kwargs)) or _real(text)
+        )
+
+    def upload(filename, text, force_reparse):
+        content_b64 = base64.b64encode(text.encode("utf-8")).decode("ascii")
+        return {"filename": filename, "content_b64": content_b64, "tags": [], "force_reparse": force_reparse}
+
+    def execute(job_type, payload):
+        return runner._execute(repo.enqueue_run(job_type, payload), job_type, payload)
+
+    resume_text = "Jane Doe\nSenior Engineer\nPython, SQL, AWS"
+    first = execute("ingest_resume_file", upload("jane.txt", resume_text, False))
+    execute("ingest_resume_file", upload("jane.txt", resume_text, True))
+    execute("reprocess_resume", {"resume_id": first["resume_id"]})
+    job = execute("ingest_job_file", upload("jd.txt", "Backend Engineer\nmust have: Python", True))
+    execute("reprocess_job", {"job_id": job["job_id"]})
+
+    assert [(name, kwargs.get("use_cache")) for name, kwargs in seen] == [
+        ("analyze_resume", True),
+        ("analyze_resume", False),
+        ("analyze_resume", False),
+        ("analyze_jd", False),
+        ("analyze_jd", False),
+    ]
@@ -0,0 +1,80 @@
+"""Tests for llm_async.py — governor admission, backoff and the shared loop."""
+
+import pytest
+
+from llm_async import LLMEventLoop, LLMGovernor
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+class _Usage:
+    total_tokens = 42
+
+
+class _Resp:
+    usage = _Usage()
+
+
+def test_rpm_bucket_delays_after_burst():
+    gov = LLMGovernor(max_concurrency=10, rpm=2, tpm=0)
+    assert gov._admit_delay(10) == 0
+    assert gov._admit_delay(10) == 0
+    delay = gov._admit_delay(10)
+    assert delay is not None and 25 < delay <= 30
+
+
+def test_tpm_bucket_and_concurrency_ceiling():
+    gov = LLMGovernor(max_concurrency=2, rpm=0, tpm=1000)
+    assert gov._admit_delay(600) == 0
+    assert gov._admit_delay(600) > 0  # only 400 tokens left in the bucket
+
+    gov = LLMGovernor(max_concurrency=1, rpm=0, tpm=0)
+    assert gov._admit_delay(10) == 0
+    assert gov._admit_delay(10) is None  # waits for a release, not a timer
+    gov._release("ok", 10)
+    assert gov._admit_delay(10) == 0
+
+
+def test_rate_limit_backs_off_retries_and_recovers():
+    gov = LLMGovernor(max_concurrency=4, rpm=0, tpm=0, rate_limit_retries=1)
+    gov.MIN_BACKOFF_SEC = 0.01
+    loop = LLMEventLoop(governor=gov)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise _RateLimited("slow down")
+        return _Resp()
+
+    assert isinstance(loop.run(gov.run(flaky, est_tokens=10)), _Resp)
+    stats = gov.stats()
+    assert len(calls) == 2
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1 and stats["backoffs"] == 1
+    assert stats["effective_concurrency"] == 2
+    assert stats["tokens_used"] == 42
+
+    # Successes grow the adaptive limit back towards the configured ceiling.
+    async def ok():
+        return _Resp()
+
+    for _ in range(6):
+        loop.run(gov.run(ok))
+    assert gov.stats()["effective_concurrency"] == 4
+
+
+def test_non_retryable_errors_propagate():
+    gov = LLMGovernor(max_concurrency=2, rpm=0, tpm=0, rate_limit_retries=0)
+    gov.MIN_BACKOFF_SEC = 0.01
+    loop = LLMEventLoop(governor=gov)
+
+    async def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        loop.run(gov.run(broken))
+    stats = gov.stats()
+    assert stats["failed"] == 1 and stats["backoffs"] == 0 and stats["inflight"] == 0
+    assert LLMGovernor.classify_error(TimeoutError()) == "timeout"
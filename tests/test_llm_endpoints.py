@@ -0,0 +1,51 @@
+"""Tests for llm_endpoints.py — pool parsing, routing and passive health checks."""
+
+import time
+
+from llm_endpoints import EndpointPool, LLMEndpoint, parse_endpoint_spec
+
+
+def _pool(*weights, **kwargs):
+    return EndpointPool([LLMEndpoint(f"http://box{i}/v1", w) for i, w in enumerate(weights)], **kwargs)
+
+
+def test_parse_endpoint_spec():
+    assert parse_endpoint_spec("http://127.0.0.1:1234/v1") == [("http://127.0.0.1:1234/v1", 1.0)]
+    assert parse_endpoint_spec("http://a/v1|3, http://b/v1\nhttp://c/v1|0") == [
+        ("http://a/v1", 3.0),
+        ("http://b/v1", 1.0),
+    ]
+
+
+def test_routing_follows_weight_and_latency():
+    pool = _pool(2, 1)
+    picks = [pool.acquire().url for _ in range(3)]
+    # box0 has twice the weight, so it absorbs two of the first three in-flight requests.
+    assert picks.count("http://box0/v1") == 2
+
+    pool = _pool(1, 1)
+    slow, fast = pool.endpoints
+    for endpoint, latency in ((slow, 4.0), (fast, 1.0)):
+        pool.release(pool.acquire(exclude=fast if endpoint is slow else slow), "ok", latency)
+    assert pool.acquire() is fast
+
+
+def test_ejection_and_probe_readmission():
+    pool = _pool(1, 1, eject_after=2, eject_sec=0.05)
+    bad, good = pool.endpoints
+    for _ in range(2):
+        pool.release(pool.acquire(exclude=good), "server_error", 0.1, error="502")
+    assert pool.stats()[0]["state"] == "ejected"
+    assert all(pool.acquire() is good for _ in range(3))
+
+    time.sleep(0.06)
+    for e in pool.endpoints:
+        e.inflight = 0
+    probe = pool.acquire(exclude=good)
+    assert probe is bad and bad.probing
+    pool.release(probe, "ok", 0.1)
+    assert pool.stats()[0]["state"] == "healthy"
+
+    # Client errors do not count against endpoint health.
+    pool.release(pool.acquire(exclude=good), "error", 0.1, error="400")
+    assert bad.consecutive_failures == 0 and bad.errors == 3
@@ -0,0 +1,80 @@
+"""Tests for the incremental JSON stream scanner."""
+
+import asyncio
+
+from llm_stream import JsonStreamScanner, read_json_stream
+
+
+def _feed_chunks(text, size):
+    scanner = JsonStreamScanner()
+    for i in range(0, len(text), size):
+        if scanner.feed(text[i:i + size]):
+            break
+    return scanner
+
+
+def test_scanner_stops_after_first_complete_object():
+    text = '{"a": {"b": [1, 2]}, "s": "brace } in \\" string"} and then some prose {"x": 1}'
+    for size in (1, 3, 7, len(text)):
+        scanner = _feed_chunks(text, size)
+        assert scanner.complete
+        assert scanner.text() == '{"a": {"b": [1, 2]}, "s": "brace } in \\" string"}'
+
+
+def test_scanner_skips_think_blocks_and_prose_brackets():
+    text = '<think>maybe {"draft": true}</think>Note [see below]:\n```json\n[{"ok": 1}]\n```'
+    for size in (1, 2, 5, len(text)):
+        scanner = _feed_chunks(text, size)
+        assert scanner.complete
+        assert scanner.text().endswith('[{"ok": 1}]')
+
+
+def test_scanner_waits_for_unterminated_value():
+    scanner = JsonStreamScanner()
+    assert not scanner.feed('{"a": [1, 2')
+    assert not scanner.feed(', "<think>"')
+    assert scanner.feed("]}")
+    assert scanner.text() == '{"a": [1, 2, "<think>"]}'
+
+
+def test_read_json_stream_closes_early():
+    class Chunk:
+        def __init__(self, content):
+            delta = type("Delta", (), {"content": content})()
+            self.choices = [type("Choice", (), {"delta": delta})()]
+
+    class Stream:
+        def __init__(self, parts):
+            self.parts = parts
+            self.read = 0
+            self.closed = False
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if self.read >= len(self.parts):
+                raise StopAsyncIteration
+            self.read += 1
+            return Chunk(self.parts[self.read - 1])
+
+        async def close(self):
+            self.closed = True
+
+    stream = Stream(['{"score"', ": 80}", " trailing", " explanation"])
+    text, closed_early, usage = asyncio.run(read_json_stream(stream))
+    assert text == '{"score": 80}'
+    assert closed_early and stream.closed and stream.read == 2
+    assert usage is None
+
+
+def test_read_json_stream_returns_final_usage_chunk():
+    usage = type("Usage", (), {"total_tokens": 57})()
+
+    async def stream():
+        delta = type("Delta", (), {"content": "no json here"})()
+        yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})()], "usage": None})()
+        yield type("Chunk", (), {"choices": [], "usage": usage})()
+
+    text, closed_early, got = asyncio.run(read_json_stream(stream()))
+    assert (text, closed_early, got) == ("no json here", False, usage)
@@ -0,0 +1,120 @@
+"""Tests for prescreen.py — deterministic requirement rules."""
+
+from prescreen import PrescreenEngine, PrescreenRule, estimate_years
+
+RESUME = """Jane Doe
+Skills: Python, K8s, Docker, AWS, PostgreSQL
+B.Tech in Computer Science, State University 2008 - 2012
+Senior Engineer, Acme    Jan 2015 - Dec 2020
+Engineer, Foo    03/2012 - 12/2014
+Certified Scrum Master
+"""
+
+
+def _status(engine, category, value):
+    verdict = engine.evaluate(RESUME, category, value)
+    return verdict["status"] if verdict else None
+
+
+def test_skill_aliases_and_must_have_gate():
+    engine = PrescreenEngine(rules=None, enabled=True, min_confidence=0.9)
+    assert _status(engine, "must_have_skills", "Kubernetes and Docker") == "Met"
+    assert _status(engine, "must_have_skills", "Python, Golang and gRPC") == "Partial"
+    assert _status(engine, "must_have_skills", "Rust and Golang") == "Missing"
+    assert _status(engine, "nice_to_have_skills", "Experience with cloud platforms") == "Met"
+    # Nuance beyond the skill names, or an unnamed substitute, goes to the model.
+    assert _status(engine, "must_have_skills", "Python for large-scale data pipelines") is None
+    assert _status(engine, "nice_to_have_skills", "Java or an equivalent JVM language") is None
+
+
+def test_degree_and_years_rules():
+    engine = PrescreenEngine(rules=None, enabled=True, min_confidence=0.9)
+    assert _status(engine, "education_requirements", "Bachelor's degree in Computer Science") == "Met"
+    assert _status(engine, "education_requirements", "Master's degree or PhD") is None
+    # Study years are not experience: 2012-03..2020-12 is 8.8 years of work.
+    assert estimate_years(RESUME) == (8.8, "ranges")
+    assert _status(engine, "experience", "Minimum 5 years relevant experience") == "Met"
+    assert _status(engine, "experience", "Minimum 15 years relevant experience") == "Partial"
+    assert _status(engine, "must_have_skills", "Rust") is None
+
+    stats = engine.stats()
+    assert stats["evaluated"] == 5 and stats["decided"] == 3
+    assert stats["skip_rate"] == 0.6 and stats["below_threshold"] == 2
+
+
+def test_rules_defer_where_a_confident_verdict_would_be_wrong():
+    engine = PrescreenEngine(rules=None, enabled=True, min_confidence=0.9)
+
+    def status(resume, category, value):
+        verdict = engine.evaluate(resume, category, value)
+        return verdict["status"] if verdict else None
+
+    # A Scrum Master certification is not a master's degree.
+    scrum = "B.Sc in Physics\nCertified Scrum Master in agile delivery"
+    assert status(scrum, "education_requirements", "Master's degree in Physics") is None
+    assert status("Master of Science in Physics", "education_requirements", "Master's degree in Physics") == "Met"
+
+    # Only experience phrasing counts as a years claim.
+    data = "Migrated 20 years of customer data to Postgres.\nEngineer, Acme    Jan 2020 - Dec 2021"
+    assert estimate_years(data) == (2.0, "ranges")
+    assert status(data, "experience", "Minimum 8 years relevant experience") == "Partial"
+    assert estimate_years("10+ years of backend engineering experience") == (10.0, "claim")
+
+    # A single skill shown through a related product is for the model to judge.
+    tools = "Built services on MySQL and PostgreSQL, code on GitHub and GitLab."
+    assert status(tools, "must_have_skills", "SQL") is None
+    assert status(tools, "must_have_skills", "Git") is None
+
+    # A verbatim hit can't see negation.
+    assert status("I have no leadership experience.", "soft_skills", "Leadership") is None
+
+
+def test_plugin_rules_and_agreement_report():
+    class AlwaysMissing(PrescreenRule):
+        name = "always_missing"
+        categories = ("soft_skills",)
+
+        def evaluate(self, ctx):
+            return "Missing", "None", 1.0
+
+    engine = PrescreenEngine(rules=[], enabled=True)
+    engine.register(AlwaysMissing())
+    samples = [
+        (RESUME, "soft_skills", "Mentoring", "Missing"),
+        (RESUME, "soft_skills", "Communication", "Met"),
+        (RESUME, "domain_knowledge", "Fintech", "Partial"),
+    ]
+    report = engine.agreement(samples)
+    assert report["labeled"] == 3 and report["decided"] == 2 and report["agreed"] == 1
+    assert report["agreement"] == 0.5
+    assert report["by_rule"]["always_missing"]["decided"] == 2
+    assert report["disagreements"] == {"Missing->Met": 1}
+    # The report does not count towards live skip-rate stats.
+    assert engine.stats()["evaluated"] == 0
+
+
+def test_hedged_or_ambiguous_mentions_are_left_to_the_model():
+    engine = PrescreenEngine(rules=None, enabled=True, min_confidence=0.9)
+
+    def status(resume, category, value):
+        verdict = engine.evaluate(resume, category, value)
+        return verdict["status"] if verdict else None
+
+    gcp_only = "No AWS experience; worked on GCP only."
+    assert status(gcp_only, "must_have_skills", "AWS") is None
+    assert status(gcp_only, "nice_to_have_skills", "Experience with cloud platforms") == "Met"
+    assert status("I want to learn Kubernetes next year.", "must_have_skills", "Kubernetes") is None
+    # Everyday words only count as skills next to their ecosystem or in a skills list.
+    assert status("Able to react quickly to production incidents.", "must_have_skills", "React") is None
+    assert status("Skills: React, Redux, TypeScript", "must_have_skills", "React") == "Met"
+    assert status("Spring 2019 semester teaching assistant", "must_have_skills", "Spring") is None
+    assert status("Built Java microservices with Spring", "must_have_skills", "Spring") == "Met"
+    assert status("Used async/await in JavaScript", "must_have_skills", "asyncio") is None
+
+    goal = "Looking to reach 5 years of experience in backend work."
+    assert estimate_years(goal) == (0.0, "")
+    assert status(goal, "experience", "Minimum 5 years relevant experience") is None
+
+    student = "Pursuing Bachelor's degree in Computer Science, State University (expected 2027)"
+    assert status(student, "education_requirements", "Bachelor's degree in Computer Science") is None
+    assert status("B.Sc in Computer Science, 2024 - Present", "education_requirements", "Bachelor's degree") is None
@@ -0,0 +1,85 @@
+"""Tests for backend/services/repository.py — row-based read paths."""
+
+
+def _match_data(score):
+    return {
+        "candidate_name": "Dana",
+        "match_score": score,
+        "decision": "Review",
+        "reasoning": "ok",
+        "missing_skills": [],
+        "match_details": [],
+    }
+
+
+def test_get_job_and_resume(repo):
+    job = repo.add_job("jd.pdf", "JD text", {"must_have_skills": ["Python"]}, ["eng"])
+    resume = repo.add_resume("cv.pdf", "Resume text", {"candidate_name": "Dana"}, [])
+    assert repo.get_job(job["id"])["tags"] == ["eng"]
+    assert repo.get_resume(resume["id"])["filename"] == "cv.pdf"
+    assert repo.get_job(9999) is None
+    assert repo.get_resume(9999) is None
+
+
+def test_list_matches_returns_latest_per_pair(repo):
+    job = repo.add_job("jd.pdf", "JD text", {}, [])
+    r1 = repo.add_resume("a.pdf", "A", {"candidate_name": "Ann"}, [])
+    r2 = repo.add_resume("b.pdf", "B", {}, [])
+    repo.save_match(job["id"], r1["id"], _match_data(10))
+    newest_r1 = repo.save_match(job["id"], r1["id"], _match_data(70))
+    only_r2 = repo.save_match(job["id"], r2["id"], _match_data(40))
+
+    rows = repo.list_matches(limit=10)
+    assert [row["id"] for row in rows] == [only_r2, newest_r1]
+    assert rows[1]["candidate_name"] == "Ann"
+    assert rows[1]["match_score"] == 70
+
+
+def test_legacy_run_results_and_counts(repo):
+    job = repo.add_job("jd.pdf", "JD text", {}, [])
+    resume = repo.add_resume("cv.pdf", "CV", {}, [])
+    run_id = repo.create_run("batch", threshold=50)
+    match_id = repo.save_match(job["id"], resume["id"], _match_data(55), standard_score=55)
+    repo.link_run_match(run_id, match_id)
+
+    results = repo.list_legacy_run_results(run_id)
+    assert len(results) == 1
+    assert results[0]["job_name"] == "jd.pdf"
+    assert results[0]["standard_score"] == 55
+    assert repo.count_legacy_run_matches_for_job(run_id, job["id"]) == 1
+
+    counts = repo.table_counts()
+    assert counts == {"jobs": 1, "resumes": 1, "matches": 1, "job_runs": 0, "runs": 1}
+
+
+def test_batch_counters_follow_run_transitions(repo):
+    batch_id, run_ids = repo.enqueue_run_batch("score_match", [{"job_id": 1, "resume_id": r} for r in range(4)])
+    batch = repo.get_batch(batch_id)
+    assert (batch["total"], batch["queued"], batch["status"], batch["eta_seconds"]) == (4, 4, "queued", None)
+
+    claimed = repo.claim_next_runs(limit=3, max_running=3)
+    repo.complete_run(claimed[0]["id"], result={})
+    repo.fail_run(claimed[1]["id"], error="boom")
+    repo.cancel_run(run_ids[3])
+    # Runs enqueued one by one with a batch_id (deep-cap waves) count toward the batch.
+    repo.enqueue_run("score_match", {"job_id": 1, "resume_id": 9, "batch_id": batch_id})
+
+    batch = repo.get_batch(batch_id)
+    assert batch["total"] == 5
+    assert (batch["queued"], batch["running"], batch["completed"], batch["failed"], batch["canceled"]) == (1, 1, 1, 1, 1)
+    assert batch["done"] == 3 and batch["progress"] == 60
+    assert batch["status"] == "running" and batch["started_at"]
+    assert repo.get_batch(batch_id + 100) is None
+
+
+def test_run_logs_cursor_and_keyset_pages(repo):
+    run_id = repo.enqueue_run("score_match", {})
+    ids = [repo.add_run_log(run_id, "info", f"line {i}") for i in range(10)]
+
+    tail = repo.list_run_logs(run_id, limit=4)
+    assert [r["id"] for r in tail] == ids[-4:]
+    assert [r["id"] for r in repo.list_run_logs(run_id, after_id=ids[6])] == ids[7:]
+    assert repo.list_run_logs(run_id, after_id=ids[-1]) == []
+    # Scroll back from the oldest line we have.
+    older = repo.list_run_logs(run_id, limit=4, before_id=tail[0]["id"])
+    assert [r["id"] for r in older] == ids[2:6]
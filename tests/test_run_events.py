@@ -0,0 +1,62 @@
+"""Tests for the in-process run event bus."""
+
+import asyncio
+
+from backend.services.run_events import RunEventBus, format_sse
+
+
+def test_repository_publishes_run_and_log_events(repo):
+    async def scenario():
+        sub = repo.events.subscribe()
+        run_id = repo.enqueue_run("score_match", {"job_id": 1, "resume_id": 2})
+        repo.claim_next_run()
+        repo.add_run_log(run_id, "info", "hello")
+        repo.update_run_progress(run_id, 40, "scoring")
+        repo.complete_run(run_id, result={})
+        events = []
+        while True:
+            event = await sub.get(timeout=0.2)
+            if event is None:
+                break
+            events.append(event)
+        repo.events.unsubscribe(sub)
+        return run_id, events
+
+    run_id, events = asyncio.run(scenario())
+    assert [e["type"] for e in events] == ["run", "run", "log", "run", "run"]
+    assert [e["data"].get("status") for e in events if e["type"] == "run"] == ["queued", "running", None, "completed"]
+    assert events[2]["data"]["message"] == "hello" and events[2]["data"]["run_id"] == run_id
+    assert events[3]["data"]["progress"] == 40
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+
+
+def test_replay_filter_and_overflow():
+    bus = RunEventBus(history_size=3, subscriber_buffer=2)
+
+    async def scenario():
+        for i in range(3):
+            bus.publish_log(i + 1, run_id=1 if i < 2 else 2, level="info", message=f"m{i}")
+        # Replay from the ring buffer, filtered to run 2's logs.
+        replay = bus.subscribe(last_event_id=0, log_run_id=2)
+        first = await replay.get(timeout=0.2)
+        # Too old for the ring buffer -> resync.
+        bus.publish("run", {"run_id": 3})
+        stale = bus.subscribe(last_event_id=0)
+        resync = await stale.get(timeout=0.2)
+        # Slow consumer overflow -> resync.
+        slow = bus.subscribe()
+        for i in range(5):
+            bus.publish("run", {"run_id": i})
+        await asyncio.sleep(0)
+        overflow = await slow.get(timeout=0.2)
+        return first, resync, overflow
+
+    first, resync, overflow = asyncio.run(scenario())
+    assert first["data"]["message"] == "m2"
+    assert resync["type"] == "resync"
+    assert overflow["type"] == "resync"
+
+
+def test_format_sse():
+    text = format_sse({"id": 7, "type": "run", "data": {"run_id": 1}})
+    assert text == 'id: 7\nevent: run\ndata: {"run_id":1}\n\n'
@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+DEFAULT_TEXT_CACHE_PATH = str(Path(__file__).resolve().parent / "text_cache.db")
+
+
+def _env_flag(name, default):
+    value = str(os.getenv(name, "") or "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+class ExtractedTextCache:
+    """
+    Persistent map from uploaded file bytes to their extracted, normalized text.
+
+    Rows are keyed by (SHA-256 of the file, file type, extraction version). The
+    version changes whenever the cleaning/normalization code or the OCR settings
+    change, so stale text simply misses and ages out. Lives in its own SQLite
+    file like the LLM response cache; size-bounded with least-recently-used
+    eviction (RESUME_MATCHER_TEXT_CACHE_MAX_MB).
+    """
+
+    def __init__(self, path=None, max_bytes=None, enabled=None):
+        self.path = str(path or os.getenv("RESUME_MATCHER_TEXT_CACHE_PATH", "") or DEFAULT_TEXT_CACHE_PATH)
+        self.enabled = bool(enabled if enabled is not None else _env_flag("RESUME_MATCHER_TEXT_CACHE", True))
+        self.max_bytes = max(0, int(
+            max_bytes
+            if max_bytes is not None
+            else float(os.getenv("RESUME_MATCHER_TEXT_CACHE_MAX_MB", "128") or 128) * 1024 * 1024
+        ))
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = None
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0, "errors": 0}
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS extracted_text (
+                file_sha256 TEXT NOT NULL,
+                file_type TEXT NOT NULL,
+                version TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hit_count INTEGER DEFAULT 0,
+                PRIMARY KEY (file_sha256, file_type, version)
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_extracted_text_last_used ON extracted_text(last_used_at)")
+        conn.commit()
+        row = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM extracted_text").fetchone()
+        self._total_bytes = int(row[0] or 0)
+        self._conn = conn
+        return conn
+
+    def get(self, file_sha256, file_type, version):
+        if not self.enabled:
+            return None
+        key = (str(file_sha256), str(file_type), str(version))
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT text FROM extracted_text WHERE file_sha256 = ? AND file_type = ? AND version = ?", key
+                ).fetchone()
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                conn.execute(
+                    """UPDATE extracted_text SET last_used_at = ?, hit_count = hit_count + 1
+                       WHERE file_sha256 = ? AND file_type = ? AND version = ?""",
+                    (time.time(), *key),
+                )
+                conn.commit()
+                self._stats["hits"] += 1
+                return row[0]
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                return None
+
+    def put(self, file_sha256, file_type, version, text):
+        if not self.enabled or text is None:
+            return
+        text = str(text)
+        size = len(text.encode("utf-8"))
+        if self.max_bytes and size > self.max_bytes:
+            return
+        now = time.time()
+        key = (str(file_sha256), str(file_type), str(version))
+        with self._lock:
+            try:
+                conn = self._connect()
+                old = conn.execute(
+                    "SELECT size_bytes FROM extracted_text WHERE file_sha256 = ? AND file_type = ? AND version = ?",
+                    key,
+                ).fetchone()
+                conn.execute(
+                    """INSERT OR REPLACE INTO extracted_text
+                       (file_sha256, file_type, version, text, size_bytes, created_at, last_used_at, hit_count)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, 0)""",
+                    (*key, text, size, now, now),
+                )
+                self._total_bytes += size - (int(old[0] or 0) if old else 0)
+                self._stats["writes"] += 1
+                if self.max_bytes and self._total_bytes > self.max_bytes:
+                    self._evict_locked(conn)
+                conn.commit()
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+
+    def _evict_locked(self, conn):
+        # Least-recently-used rows first, down to ~90% of the cap.
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = conn.execute(
+                "SELECT rowid, size_bytes FROM extracted_text ORDER BY last_used_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for rowid, size_bytes in rows:
+                conn.execute("DELETE FROM extracted_text WHERE rowid = ?", (rowid,))
+                self._total_bytes -= int(size_bytes or 0)
+                self._stats["evicted"] += 1
+                if self._total_bytes <= target:
+                    break
+
+    def clear(self):
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM extracted_text")
+                conn.commit()
+                self._total_bytes = 0
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            lookups = out["hits"] + out["misses"]
+            out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+            out["enabled"] = self.enabled
+            out["path"] = self.path
+            out["max_bytes"] = self.max_bytes
+            out["size_bytes"] = self._total_bytes
+            return out
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_text_cache = None
+_default_text_cache_lock = threading.Lock()
+
+
+def get_text_cache():
+    """Process-wide extracted-text cache shared by every JobRunner worker."""
+    global _default_text_cache
+    with _default_text_cache_lock:
+        if _default_text_cache is None:
+            _default_text_cache = ExtractedTextCache()
+        return _default_text_cache